@@ -0,0 +1,864 @@
+"""
+Flask API for Bulk WhatsApp Sender
+Stateless: only accepts requests and enqueues jobs - the worker process sends
+"""
+
+from flask import Flask, render_template, request, jsonify, send_file
+import os
+import time
+import hashlib
+import threading
+from werkzeug.utils import secure_filename
+from flask_cors import CORS
+
+from message_queue.queue_manager import QueueManager
+from message_queue.exporter import ResultExporter
+from worker.simulator import CampaignSimulator, forecast_job
+from utils.csv_parser import read_contacts_from_file, normalize_phone_number, remove_duplicates
+from utils.logger import logger
+from utils.runtime_settings import SettingsWatcher
+import config
+
+app = Flask(__name__)
+CORS(app)  # Allows all localhost access from browser
+
+app.config['UPLOAD_FOLDER'] = config.UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = config.MAX_CONTENT_LENGTH
+app.config['SECRET_KEY'] = config.SECRET_KEY
+app.config['API_KEY'] = config.API_KEY
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
+app.url_map.strict_slashes = False
+
+# Ensure upload directory exists
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+queue_manager = QueueManager()
+# Runtime settings stored by earlier PUT /settings calls (retry limit, default delays)
+SettingsWatcher(queue_manager).refresh(force=True)
+exporter = ResultExporter(queue_manager.job_store)
+
+def check_api_key():
+    """Middleware to check API key for protected endpoints"""
+    api_key = request.headers.get("X-API-KEY")
+    if api_key != app.config['API_KEY']:
+        return jsonify({"error": "Unauthorized"}), 403
+    return None
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in config.ALLOWED_EXTENSIONS
+
+def save_uploaded_file(file):
+    """
+    Save an uploaded file into the upload folder
+
+    Returns:
+        Absolute path of the saved file
+    """
+    original_filename = file.filename
+    filename = secure_filename(file.filename)
+
+    # If secure_filename removed everything, use a timestamp-based name
+    if not filename:
+        file_ext = original_filename.rsplit('.', 1)[1] if '.' in original_filename else 'csv'
+        filename = f"upload_{int(time.time())}.{file_ext}"
+
+    upload_dir = app.config['UPLOAD_FOLDER']
+    os.makedirs(upload_dir, exist_ok=True)
+
+    filepath = os.path.abspath(os.path.join(upload_dir, filename))
+    file.save(filepath)
+    return filepath
+
+def normalize_numbers(numbers):
+    """
+    Normalize and dedupe a list of raw phone numbers
+
+    Returns:
+        Tuple of (normalized numbers, unique numbers)
+    """
+    normalized_numbers = []
+    for num in numbers:
+        normalized = normalize_phone_number(num)
+        if normalized:
+            normalized_numbers.append(normalized)
+    return normalized_numbers, remove_duplicates(normalized_numbers)
+
+def resolve_attachment(attachments):
+    """
+    Resolve the first attachment path from a /send payload
+
+    Returns:
+        Tuple of (attachment_path, error response or None)
+    """
+    if not attachments:
+        return None, None
+
+    attachment_path = attachments[0] if isinstance(attachments[0], str) else None
+    if not attachment_path:
+        return None, None
+
+    if not os.path.isabs(attachment_path):
+        attachment_path = os.path.abspath(attachment_path)
+
+    if not os.path.exists(attachment_path):
+        return None, (jsonify({
+            "error": f"Attachment file not found: {attachment_path}",
+            "hint": "Please upload the attachment first using /upload_attachment endpoint"
+        }), 400)
+
+    return attachment_path, None
+
+# Add request logging middleware
+@app.before_request
+def log_request_info():
+    """Log all incoming requests for debugging"""
+    logger.debug(f"[REQUEST] {request.method} {request.path} from {request.remote_addr}")
+
+# ---- Health Check ----
+@app.route("/", methods=["GET"])
+def home():
+    return jsonify({"status": "OK", "message": "Server is running"}), 200
+
+@app.route('/index')
+@app.route('/index.html')
+@app.route('/app')
+def index():
+    """Serve the web interface"""
+    try:
+        template_path = os.path.join('templates', 'index.html')
+        if not os.path.exists(template_path):
+            return jsonify({"error": "Template not found"}), 404
+        return render_template('index.html')
+    except Exception as e:
+        return jsonify({"error": f"Error loading template: {str(e)}"}), 500
+
+@app.route('/test')
+def test():
+    """Test route to verify Flask is working"""
+    return jsonify({
+        'status': 'success',
+        'message': 'Flask is working!',
+        'timestamp': time.time()
+    })
+
+@app.errorhandler(403)
+def forbidden(error):
+    return jsonify({'error': 'Access forbidden. Please check your browser settings or try a different browser.'}), 403
+
+@app.errorhandler(404)
+def not_found(error):
+    return jsonify({'error': 'Page not found'}), 404
+
+@app.errorhandler(500)
+def internal_error(error):
+    return jsonify({'error': 'Internal server error'}), 500
+
+# ---- Uploads ----
+@app.route('/upload', methods=['POST'])
+def upload_file():
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Invalid file type. Allowed: CSV, Excel, TXT'}), 400
+
+    try:
+        filepath = save_uploaded_file(file)
+    except Exception as e:
+        return jsonify({'error': f'Error saving file: {str(e)}'}), 500
+
+    # Read and process the file for preview (POST /lists stores a reusable list)
+    try:
+        contacts = read_contacts_from_file(filepath)
+        unique_contacts = remove_duplicates(contacts)
+
+        return jsonify({
+            'success': True,
+            'total': len(contacts),
+            'unique': len(unique_contacts),
+            'duplicates': len(contacts) - len(unique_contacts),
+            'contacts': unique_contacts[:100],  # Return first 100 for preview
+            'filename': os.path.basename(filepath),
+            'filepath': filepath
+        })
+    except Exception as e:
+        # Clean up file if reading failed
+        if os.path.exists(filepath):
+            try:
+                os.remove(filepath)
+            except:
+                pass
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/upload_attachment', methods=['POST'])
+def upload_attachment():
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+
+    if file and allowed_file(file.filename):
+        filepath = save_uploaded_file(file)
+
+        return jsonify({
+            'success': True,
+            'filename': os.path.basename(filepath),
+            'filepath': filepath
+        })
+
+    return jsonify({'error': 'Invalid file type'}), 400
+
+# ---- Job Creation ----
+@app.route("/send", methods=["POST"])
+def send_whatsapp():
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    data = request.get_json()
+
+    if not data:
+        return jsonify({"error": "No JSON data received"}), 400
+
+    numbers = data.get("numbers", [])
+    list_id = data.get("list_id")
+    message = data.get("message", "")
+    attachments = data.get("attachments", [])
+    delay_min = data.get("delay_min") or data.get("delay")
+    delay_max = data.get("delay_max") or data.get("delay")
+    weight = data.get("weight")
+    priority = data.get("priority")
+    quiet_start = data.get("quiet_start")
+    quiet_end = data.get("quiet_end")
+
+    if not numbers and list_id is None:
+        return jsonify({"error": "Numbers or list_id are required"}), 400
+
+    if message == "" and len(attachments) == 0:
+        return jsonify({"error": "Message or attachments are required"}), 400
+
+    attachment_path, attachment_error = resolve_attachment(attachments)
+    if attachment_error:
+        return attachment_error
+
+    try:
+        if list_id is not None:
+            job_id = queue_manager.enqueue_job_from_list(
+                list_id=int(list_id),
+                message_text=message or None,
+                attachment_path=attachment_path,
+                delay_min=int(delay_min) if delay_min else None,
+                delay_max=int(delay_max) if delay_max else None,
+                weight=float(weight) if weight is not None else None,
+                priority=int(priority) if priority is not None else None,
+                quiet_start=quiet_start,
+                quiet_end=quiet_end
+            )
+            total_numbers = queue_manager.get_job_status(job_id)['total_messages']
+            duplicates_removed = 0
+        else:
+            normalized_numbers, unique_numbers = normalize_numbers(numbers)
+            if not unique_numbers:
+                return jsonify({"error": "No valid phone numbers found"}), 400
+
+            job_id = queue_manager.enqueue_job(
+                phone_numbers=unique_numbers,
+                message_text=message or None,
+                attachment_path=attachment_path,
+                delay_min=int(delay_min) if delay_min else None,
+                delay_max=int(delay_max) if delay_max else None,
+                weight=float(weight) if weight is not None else None,
+                priority=int(priority) if priority is not None else None,
+                quiet_start=quiet_start,
+                quiet_end=quiet_end
+            )
+            total_numbers = len(unique_numbers)
+            duplicates_removed = len(normalized_numbers) - len(unique_numbers)
+    except (OverflowError, TypeError, ValueError) as e:
+        # OverflowError: int() of a JSON 1e999, or a value too large for SQLite
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "success": True,
+        "message": "Job created and queued successfully",
+        "job_id": job_id,
+        "total_numbers": total_numbers,
+        "duplicates_removed": duplicates_removed,
+        "note": "Worker process will handle sending. Start worker with: python run_worker.py"
+    }), 200
+
+# ---- Contact Lists ----
+@app.route('/lists', methods=['POST'])
+def create_list():
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    if 'file' in request.files:
+        file = request.files['file']
+        if file.filename == '' or not allowed_file(file.filename):
+            return jsonify({'error': 'Invalid file type. Allowed: CSV, Excel, TXT'}), 400
+        name = request.form.get('name') or file.filename
+        filepath = None
+        try:
+            filepath = save_uploaded_file(file)
+            contacts = read_contacts_from_file(filepath)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 400
+        finally:
+            # The list is stored in the database - the uploaded file is not needed
+            if filepath and os.path.exists(filepath):
+                os.remove(filepath)
+        normalized_numbers, unique_numbers = contacts, remove_duplicates(contacts)
+    else:
+        data = request.get_json() or {}
+        name = data.get('name')
+        normalized_numbers, unique_numbers = normalize_numbers(data.get('numbers', []))
+
+    if not unique_numbers:
+        return jsonify({'error': 'No valid phone numbers found'}), 400
+
+    list_id = queue_manager.create_contact_list(unique_numbers, name=name)
+    return jsonify({
+        'success': True,
+        'list_id': list_id,
+        'total': len(normalized_numbers),
+        'unique': len(unique_numbers),
+        'duplicates': len(normalized_numbers) - len(unique_numbers)
+    })
+
+@app.route('/lists/combine', methods=['POST'])
+def combine_lists():
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    data = request.get_json() or {}
+    try:
+        list_id = queue_manager.combine_contact_lists(
+            operation=data.get('operation', ''),
+            list_ids=[int(list_id) for list_id in data.get('list_ids', [])],
+            name=data.get('name')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'success': True, 'list': queue_manager.get_contact_list(list_id)})
+
+@app.route('/lists', methods=['GET'])
+def get_lists():
+    return jsonify({'lists': queue_manager.get_contact_lists()})
+
+@app.route('/lists/<int:list_id>', methods=['GET'])
+def get_list(list_id):
+    contact_list = queue_manager.get_contact_list(list_id)
+    if not contact_list:
+        return jsonify({'error': f'Contact list {list_id} not found'}), 404
+
+    contact_list['contacts'] = queue_manager.get_contact_list_numbers(list_id, limit=100)
+    return jsonify(contact_list)
+
+@app.route('/lists/<int:list_id>', methods=['DELETE'])
+def delete_list(list_id):
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    if not queue_manager.delete_contact_list(list_id):
+        return jsonify({'error': f'Contact list {list_id} not found'}), 404
+    return jsonify({'success': True})
+
+@app.route('/lists/<int:list_id>/timezones', methods=['PUT'])
+def set_list_timezones(list_id):
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    if not queue_manager.get_contact_list(list_id):
+        return jsonify({'error': f'Contact list {list_id} not found'}), 404
+
+    timezones = (request.get_json() or {}).get('timezones')
+    if not isinstance(timezones, dict) or not timezones:
+        return jsonify({'error': 'timezones must be an object of number -> time zone'}), 400
+
+    normalized = {normalize_phone_number(phone): zone for phone, zone in timezones.items()}
+    try:
+        updated = queue_manager.set_contact_timezones(list_id, normalized)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'updated': updated})
+
+# ---- Job Control ----
+@app.route('/status/<int:job_id>', methods=['GET'])
+def get_job_status(job_id):
+    job = queue_manager.get_job_status(job_id)
+    if not job:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify(job)
+
+@app.route('/pause/<int:job_id>', methods=['POST'])
+def pause_job(job_id):
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    data = request.get_json(silent=True) or {}
+    queue_manager.pause_job(job_id, reason=data.get('reason'))
+    return jsonify({'success': True, 'job_id': job_id, 'status': config.JOB_STATUS_PAUSED})
+
+@app.route('/resume/<int:job_id>', methods=['POST'])
+def resume_job(job_id):
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    queue_manager.resume_job(job_id)
+    job = queue_manager.get_job_status(job_id)
+    return jsonify({'success': True, 'job_id': job_id, 'status': job['status'] if job else None})
+
+@app.route('/stop/<int:job_id>', methods=['POST'])
+def stop_job(job_id):
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    queue_manager.stop_job(job_id)
+    return jsonify({'success': True, 'job_id': job_id, 'status': config.JOB_STATUS_STOPPED})
+
+@app.route('/jobs', methods=['GET'])
+def get_jobs():
+    return jsonify({'jobs': queue_manager.get_active_jobs()})
+
+@app.route('/jobs/<int:job_id>/weight', methods=['POST'])
+def set_job_weight(job_id):
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    data = request.get_json() or {}
+    try:
+        updated = queue_manager.set_job_weight(job_id, float(data.get('weight', 0)))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not updated:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify({'success': True, 'job_id': job_id, 'weight': float(data['weight'])})
+
+@app.route('/jobs/<int:job_id>/delays', methods=['POST'])
+def set_job_delays(job_id):
+    """Change a job's delay bounds; running workers apply them from the next message"""
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    data = request.get_json() or {}
+    try:
+        delay_min = float(data['delay_min'])
+        delay_max = float(data['delay_max'])
+        updated = queue_manager.set_job_delays(job_id, delay_min, delay_max)
+    except KeyError as e:
+        return jsonify({'error': f'{e.args[0]} is required'}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not updated:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify({'success': True, 'job_id': job_id, 'delay_min': delay_min, 'delay_max': delay_max})
+
+# ---- Worker Pool ----
+@app.route('/accounts/<account_id>/cap', methods=['POST'])
+def set_account_cap(account_id):
+    """Set an account's daily send cap (0 = unlimited, null = configured default)"""
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    data = request.get_json() or {}
+    try:
+        updated = queue_manager.set_account_daily_cap(account_id, data.get('daily_cap'))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not updated:
+        return jsonify({'error': f'Account {account_id} not found'}), 404
+    return jsonify({'success': True, 'account_id': account_id, 'daily_cap': data.get('daily_cap')})
+
+@app.route('/pacing', methods=['GET'])
+def get_pacing():
+    limit = request.args.get('limit', 100, type=int)
+    decisions = queue_manager.get_pacing_decisions(request.args.get('account_id'), limit)
+    return jsonify({'decisions': decisions})
+
+@app.route('/settings', methods=['GET'])
+def get_settings():
+    return jsonify(queue_manager.get_settings())
+
+@app.route('/settings', methods=['PUT'])
+def update_settings():
+    """Change runtime settings ({"settings": {name: value or null}, "changed_by": ...})"""
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    data = request.get_json() or {}
+    try:
+        settings = queue_manager.update_settings(
+            data.get('settings'), changed_by=data.get('changed_by') or request.remote_addr
+        )
+    except (OverflowError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(settings)
+
+@app.route('/settings/audit', methods=['GET'])
+def get_settings_audit():
+    limit = request.args.get('limit', 100, type=int)
+    return jsonify({'changes': queue_manager.get_settings_audit(request.args.get('name'), limit)})
+
+@app.route('/circuit', methods=['GET'])
+def get_circuit():
+    return jsonify({
+        'accounts': [
+            {
+                'account_id': account['account_id'],
+                'state': account['circuit_state'] or 'closed',
+                'reason': account['circuit_reason'],
+                'changed_at': account['circuit_changed_at']
+            }
+            for account in queue_manager.get_accounts()
+        ],
+        'paused_jobs': [
+            {'job_id': job['job_id'], 'pause_reason': job['pause_reason']}
+            for job in queue_manager.get_paused_jobs(config.CIRCUIT_PAUSE_REASON)
+        ]
+    })
+
+@app.route('/accounts', methods=['GET'])
+def get_accounts():
+    """Pool size plus per-account health and throughput"""
+    accounts = queue_manager.get_accounts()
+    return jsonify({
+        'pool_size': sum(1 for account in accounts if account['status'] != config.ACCOUNT_STATUS_STOPPED),
+        'accounts': accounts
+    })
+
+@app.route('/workers', methods=['GET'])
+def get_workers():
+    """Worker registry - heartbeats, current job and throughput per worker process"""
+    workers = queue_manager.get_workers()
+    counts = {}
+    for worker in workers:
+        counts[worker['status']] = counts.get(worker['status'], 0) + 1
+    return jsonify({
+        'alive': counts.get(config.WORKER_STATUS_ALIVE, 0),
+        'stale': counts.get(config.WORKER_STATUS_STALE, 0),
+        'heartbeat_interval': config.WORKER_HEARTBEAT_INTERVAL,
+        'stale_after': config.WORKER_STALE_AFTER,
+        'workers': workers
+    })
+
+# ---- Analytics (served from rollup tables) ----
+def rollup_query_args():
+    """Parse common query-string arguments for rollup endpoints"""
+    return {
+        'bucket': request.args.get('bucket', 'hour'),
+        'job_id': request.args.get('job_id', type=int),
+        'since': request.args.get('since'),
+        'until': request.args.get('until')
+    }
+
+@app.route('/stats/throughput', methods=['GET'])
+def get_throughput_stats():
+    try:
+        series = queue_manager.get_throughput_timeseries(**rollup_query_args())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'series': series})
+
+@app.route('/stats/failures', methods=['GET'])
+def get_failure_stats():
+    try:
+        series = queue_manager.get_failure_timeseries(**rollup_query_args())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'series': series})
+
+# ---- ETA Forecasts ----
+@app.route('/jobs/<int:job_id>/forecast', methods=['GET'])
+def get_job_forecast(job_id):
+    inputs = queue_manager.get_forecast_inputs(job_id)
+    if not inputs:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(forecast_job(inputs))
+
+@app.route('/simulate', methods=['POST'])
+def simulate_campaign():
+    """Estimate a hypothetical campaign; "mode": "replay" runs the seeded step simulation"""
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        contacts = int(data.get('contacts', 0))
+        if not 0 < contacts <= config.SIMULATION_MAX_CONTACTS:
+            raise ValueError(f"contacts must be between 1 and {config.SIMULATION_MAX_CONTACTS}")
+        accounts = float(data.get('accounts', 1))
+        if accounts > config.SIMULATION_MAX_ACCOUNTS:
+            raise ValueError(f"accounts must not exceed {config.SIMULATION_MAX_ACCOUNTS}")
+        for name in ('delay_min', 'delay_max', 'send_seconds'):
+            if data.get(name) is not None and float(data[name]) > config.SIMULATION_MAX_SECONDS:
+                raise ValueError(f"{name} must not exceed {config.SIMULATION_MAX_SECONDS} seconds")
+        simulator = CampaignSimulator(
+            delay_min=data.get('delay_min'),
+            delay_max=data.get('delay_max'),
+            failure_rate=float(data.get('failure_rate', 0)),
+            throttle_share=float(data.get('throttle_share', 0)),
+            accounts=accounts,
+            send_seconds=data.get('send_seconds'),
+        )
+        if data.get('mode') == 'replay':
+            result = simulator.simulate(contacts, seed=int(data.get('seed', 0)))
+        else:
+            result = simulator.estimate(contacts)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+# ---- Remote Worker Lease API ----
+# Attachments handed out in claims, by SHA-256 - only these can be downloaded
+served_attachments = {}
+attachment_digests = {}  # (path, mtime, size) -> SHA-256
+
+def attachment_digest(path):
+    """
+    Get the SHA-256 of an attachment, hashing each file version once
+
+    Returns:
+        Hex digest, or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_mtime, stat.st_size)
+    digest = attachment_digests.get(key)
+    if not digest:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        attachment_digests[key] = digest
+    served_attachments[digest] = path
+    return digest
+
+def lease_payload():
+    """Parse a lease request body; every lease call names its account"""
+    data = request.get_json(silent=True) or {}
+    if not data.get('account_id'):
+        raise ValueError("account_id is required")
+    return data
+
+@app.route('/lease/register', methods=['POST'])
+def lease_register():
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    try:
+        data = lease_payload()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(queue_manager.lease_register(
+        data['account_id'], profile_dir=data.get('profile_dir'), pid=data.get('pid')
+    ))
+
+@app.route('/lease/interrupted', methods=['POST'])
+def lease_interrupted():
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    try:
+        data = lease_payload()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'sends': queue_manager.lease_interrupted(data['account_id'])})
+
+@app.route('/lease/resolve', methods=['POST'])
+def lease_resolve():
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    try:
+        data = lease_payload()
+        resolved = queue_manager.lease_resolve(data['account_id'], data.get('resolutions'))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'resolved': resolved})
+
+@app.route('/lease/claim', methods=['POST'])
+def lease_claim():
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    try:
+        data = lease_payload()
+        lease = queue_manager.lease_claim(data['account_id'], limit=data.get('limit', 1))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    for message in lease['messages']:
+        path = message.get('attachment_path')
+        if path:
+            message['attachment_sha256'] = attachment_digest(path)
+            message['attachment_name'] = os.path.basename(path)
+    return jsonify(lease)
+
+@app.route('/lease/heartbeat', methods=['POST'])
+def lease_heartbeat():
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    try:
+        data = lease_payload()
+        result = queue_manager.lease_heartbeat(
+            data['account_id'],
+            message_ids=data.get('message_ids'),
+            status=data.get('status'),
+            circuit=data.get('circuit'),
+            metrics=data.get('metrics'),
+            pacing_state=data.get('pacing_state'),
+            worker=data.get('worker')
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+@app.route('/lease/report', methods=['POST'])
+def lease_report():
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    try:
+        data = lease_payload()
+        result = queue_manager.lease_report(
+            data['account_id'],
+            results=data.get('results'),
+            pacing_decisions=data.get('pacing_decisions'),
+            release_all=bool(data.get('release_all'))
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+@app.route('/lease/attachments/<digest>', methods=['GET'])
+def lease_attachment(digest):
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    path = served_attachments.get(digest)
+    if not path or not os.path.isfile(path):
+        return jsonify({'error': 'Attachment not found'}), 404
+    return send_file(os.path.abspath(path))
+
+# ---- Result Export ----
+@app.route('/export/<int:job_id>', methods=['POST'])
+def start_export(job_id):
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    try:
+        export_id = exporter.create_export(job_id, request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Export runs in the background - poll /exports/<export_id> for progress
+    thread = threading.Thread(target=exporter.run_export, args=(export_id,))
+    thread.daemon = True
+    thread.start()
+
+    return jsonify({'success': True, 'export_id': export_id}), 202
+
+@app.route('/exports/<int:export_id>', methods=['GET'])
+def get_export(export_id):
+    export = queue_manager.job_store.get_export(export_id)
+    if not export:
+        return jsonify({'error': f'Export {export_id} not found'}), 404
+    return jsonify(export)
+
+@app.route('/exports/<int:export_id>/download', methods=['GET'])
+def download_export(export_id):
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    export = queue_manager.job_store.get_export(export_id)
+    if not export:
+        return jsonify({'error': f'Export {export_id} not found'}), 404
+    if export['status'] != config.EXPORT_STATUS_COMPLETED:
+        return jsonify({'error': f"Export {export_id} is {export['status']}"}), 409
+
+    return send_file(export['file_path'], as_attachment=True,
+                     download_name=os.path.basename(export['file_path']))
+
+# ---- Legacy endpoints (used by templates/index.html) ----
+@app.route('/status', methods=['GET'])
+def get_status():
+    """Report the most recent active job in the old sending_status shape"""
+    active_jobs = queue_manager.get_active_jobs()
+    if not active_jobs:
+        return jsonify({'is_sending': False, 'current_index': 0, 'total': 0,
+                        'success_count': 0, 'failed_count': 0,
+                        'current_contact': '', 'error_message': ''})
+
+    job = active_jobs[0]
+    return jsonify({
+        'is_sending': job['status'] != config.JOB_STATUS_PAUSED,
+        'job_id': job['job_id'],
+        'current_index': job['sent_count'] + job['failed_count'],
+        'total': job['total_messages'],
+        'success_count': job['sent_count'],
+        'failed_count': job['failed_count'],
+        'current_contact': '',
+        'error_message': ''
+    })
+
+@app.route('/stop', methods=['POST'])
+def stop_sending():
+    """Stop every active job"""
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    for job in queue_manager.get_active_jobs():
+        queue_manager.stop_job(job['job_id'])
+    return jsonify({'success': True, 'message': 'Stopping...'})
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("WhatsApp Bulk Sender - Flask API Server")
+    print("=" * 60)
+    print("\nServer will be available at:")
+    print(f"  - http://localhost:{config.FLASK_PORT}")
+    print(f"  - http://127.0.0.1:{config.FLASK_PORT}")
+    print(f"\nMain app: http://localhost:{config.FLASK_PORT}/app")
+    print("Worker process sends the messages: python run_worker.py")
+    print("\nPress Ctrl+C to stop the server")
+    print("=" * 60)
+    print("\n")
+
+    app.run(debug=True, host=config.FLASK_HOST, port=config.FLASK_PORT, threaded=True, use_reloader=False)
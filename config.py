@@ -16,14 +16,49 @@ UPLOAD_FOLDER = 'uploads'
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
 ALLOWED_EXTENSIONS = {'txt', 'csv', 'xlsx', 'xls', 'jpg', 'jpeg', 'png', 'pdf', 'doc', 'docx'}
 
+# Export Configuration
+EXPORT_FOLDER = 'exports'
+EXPORT_CHUNK_SIZE = 10000  # Rows fetched and written per chunk
+EXPORT_CSV_COMPRESSLEVEL = 6  # gzip level - favour speed over ratio
+
 # Database Configuration (SQLite)
 DB_PATH = 'whatsapp_queue.db'
 QUEUE_TABLE = 'message_queue'
 JOBS_TABLE = 'jobs'
+CONTACT_LISTS_TABLE = 'contact_lists'
+CONTACT_LIST_MEMBERS_TABLE = 'contact_list_members'
+ROLLUPS_TABLE = 'job_rollups'
+EXPORTS_TABLE = 'exports'
+ACCOUNTS_TABLE = 'accounts'
+PACING_AUDIT_TABLE = 'pacing_decisions'
+WORKERS_TABLE = 'workers'
+ROUTING_TABLE = 'routing_state'
+SEND_JOURNAL_TABLE = 'send_journal'
+RUNTIME_SETTINGS_TABLE = 'runtime_settings'
+SETTINGS_AUDIT_TABLE = 'settings_audit'
+
+# Analytics rollup buckets (name -> SQLite strftime format of the bucket start)
+ROLLUP_BUCKETS = {
+    'minute': '%Y-%m-%d %H:%M:00',
+    'hour': '%Y-%m-%d %H:00:00',
+}
 
 # Chrome/Selenium Configuration
 CHROME_PROFILE_DIR = os.path.abspath("./chrome_profile")
 CHROME_BINARY_PATH = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+CHROME_PROFILE_ROOT = os.path.abspath("./chrome_profiles")  # One sub-directory per pool account
+# Lean mode: headless=new, no extensions/animations, small window (log in once
+# without it - a headless browser cannot show the QR code)
+CHROME_LEAN_MODE = False
+CHROME_WINDOW_SIZE = (1280, 800)  # Window size in lean mode
+# Restart the browser (same profile, no QR rescan) to shed accumulated DOM/memory
+BROWSER_RECYCLE_MESSAGES = 0  # After this many messages (0 = never)
+BROWSER_RECYCLE_HOURS = 0  # After this many hours (0 = never)
+# Watchdog over the Chrome process tree (requires psutil; restart between messages)
+BROWSER_WATCHDOG_INTERVAL = 30  # Seconds between RSS/CPU samples
+BROWSER_RSS_LIMIT_MB = 2048  # Total RSS of the Chrome process tree
+BROWSER_CPU_LIMIT_PERCENT = 150  # Total CPU of the tree (100 = one core)
+BROWSER_CPU_SUSTAIN_SAMPLES = 4  # Consecutive samples over the CPU limit before a restart
 
 # Delay Configuration (in seconds)
 MIN_DELAY = 4
@@ -32,18 +67,100 @@ LONG_PAUSE_INTERVAL = 10  # Every N messages
 LONG_PAUSE_MIN = 20
 LONG_PAUSE_MAX = 40
 
+# Adaptive (AIMD) pacing inside each job's [delay_min, delay_max]
+PACING_ADAPTIVE = False  # Opt-in; off = plain uniform delays in the job bounds (the original pacing)
+PACING_START_POSITION = 0.5  # Initial target: 0 = delay_min, 1 = delay_max
+PACING_DECREASE_STEP = 0.25  # Seconds taken off the target per successful send
+PACING_BACKOFF_FACTOR = 2.0  # Target multiplier on a throttling failure
+PACING_JITTER = 0.2  # Each delay is drawn within +/-20% of the target
+
+# Campaign ETA forecasts (worker/simulator.py)
+FORECAST_SEND_SECONDS = 3  # Browser time per send (chat load + typing); hidden by pacing unless longer
+FORECAST_WINDOW_MINUTES = 60  # Recent rollup minutes used for observed rates
+FORECAST_MIN_ATTEMPTS = 20  # Observed attempts before the measured failure rate is used
+FORECAST_TRUST_ATTEMPTS = 200  # Observed attempts at which the forecast relies fully on the measured rate
+SIMULATION_MAX_MESSAGES = 100000  # Upper bound for step-by-step simulations
+SIMULATION_MAX_CONTACTS = 10000000  # Upper bound for POST /simulate contacts
+SIMULATION_MAX_ACCOUNTS = 1000  # Upper bound for POST /simulate accounts
+SIMULATION_MAX_SECONDS = 3600  # Upper bound for POST /simulate delays and send_seconds
+
+# Recipient time zones (derived from the E.164 prefix unless overridden per contact)
+DEFAULT_RECIPIENT_TIMEZONE = None  # Zone for unknown prefixes (None = quiet hours not applied)
+
 # Retry Configuration
 MAX_RETRY_ATTEMPTS = 3
 RETRY_DELAY = 5  # Seconds to wait before retry
 
 # Session Management
-SESSION_CHECK_INTERVAL = 5  # Check session health every N seconds
+SESSION_CHECK_INTERVAL = 5  # Check session health every N seconds (after failures)
+SESSION_CHECK_INTERVAL_MAX = 120  # Longest gap between checks while sends keep succeeding
+SESSION_PROBE_POLL = 0.5  # Seconds between JS probes while the page is loading
 SESSION_TIMEOUT = 60  # Wait up to 60 seconds for QR scan
 LOGIN_CHECK_TIMEOUT = 15  # Wait up to 15 seconds for login verification
 
 # Worker Configuration
 WORKER_POLL_INTERVAL = 1  # Check queue every N seconds
 WORKER_IDLE_DELAY = 2  # Delay when queue is empty
+WORKER_NOTIFY_HOST = '127.0.0.1'  # API -> worker wake-up notifications (UDP)
+WORKER_NOTIFY_PORT = 8766  # First notification port
+WORKER_NOTIFY_SLOTS = 8  # Consecutive ports, one per local worker
+WORKER_NOTIFY_FALLBACK_POLL = 30  # Idle re-check interval when notifications are active
+DEFAULT_JOB_WEIGHT = 1  # Fair-share weight of a job when none is given
+DEFAULT_JOB_PRIORITY = 0  # Priority lane of a job when none is given (higher is claimed first)
+JOB_CACHE_MAX_AGE = 1  # Seconds a cached job row is trusted before its version is re-checked
+
+# Async worker runtime (run_worker.py --async)
+ASYNC_DB_THREADS = 2  # Executor threads for SQLite writes kept off the send path
+ASYNC_JOB_POLL_INTERVAL = 2  # Seconds between job-control polls of the job being sent
+ASYNC_CHECKPOINT_INTERVAL = 60  # Seconds between pacing-state checkpoints
+ASYNC_PROBE_HEADROOM = 2  # Pacing refill seconds left for a health probe to run between sends
+
+# Worker Pool Configuration (one worker process and WhatsApp account per slot)
+WORKER_POOL_SIZE = 1
+WORKER_ACCOUNTS = []  # Optional account IDs; defaults to account1..accountN
+DEFAULT_ACCOUNT_ID = 'default'  # Account ID of a standalone worker
+CLAIM_LEASE_SECONDS = 300  # Claims of accounts without a live worker return to the queue after this long
+WORKER_RESTART_DELAY = 10  # Seconds before the pool restarts a crashed worker
+
+# Worker registry - every worker heartbeats; silent workers have their work reassigned
+WORKER_HEARTBEAT_INTERVAL = 5  # Seconds between registry heartbeats (each one also reaps)
+WORKER_STALE_AFTER = 15  # Silent this long -> stale; failover within this + one interval
+WORKER_THROUGHPUT_WINDOW = 300  # Seconds averaged by the registry's throughput figure
+WORKER_REGISTRY_RETENTION_HOURS = 24  # Stopped and stale rows are pruned after this
+
+# Runtime settings - delays, long pauses, retries and poll intervals can be
+# overridden through PUT /settings (utils/runtime_settings.py) without a restart
+SETTINGS_REFRESH_INTERVAL = 5  # Seconds between worker checks for changed settings
+
+# Send journal - intent recorded before ENTER, confirmed with the result
+SEND_RECOVERY_VERIFY = True  # After a crash, check the chat's last outgoing message before resolving
+SEND_JOURNAL_RETENTION_DAYS = 7  # Resolved journal entries are pruned after this
+
+# Account routing - recipients are spread over accounts by consistent hashing
+ROUTING_VIRTUAL_NODES = 100  # Ring points per account (more = more even split)
+ACCOUNT_DAILY_CAP = 0  # Sends per account per UTC day, 0 = unlimited
+ACCOUNT_DAILY_CAPS = {}  # Per-account overrides, e.g. {'sales': 500}
+
+# Remote workers (run_worker.py --remote URL) - claim work through the HTTP lease API
+LEASE_CLAIM_MAX = 50  # Most messages the API hands out per claim request
+REMOTE_CLAIM_BATCH = 5  # Messages a remote worker claims per request
+REMOTE_REPORT_BATCH = 10  # Buffered results that trigger a report request
+REMOTE_HEARTBEAT_INTERVAL = 5  # Seconds between lease renewals and result flushes
+REMOTE_TIMEOUT = 15  # HTTP timeout in seconds
+REMOTE_ATTACHMENT_CACHE = 'attachment_cache'  # Attachments fetched from the API, stored by SHA-256
+
+# Circuit Breaker (pauses jobs when one systemic error class dominates recent sends)
+CIRCUIT_WINDOW_SECONDS = 300  # Sliding window of send outcomes
+CIRCUIT_MIN_SAMPLES = 5  # Sends in the window before the circuit can trip
+CIRCUIT_FAILURE_RATIO = 0.8  # Share of one error class that trips the circuit
+CIRCUIT_PROBE_INTERVAL = 120  # Seconds open before a half-open probe send
+CIRCUIT_PROBE_INTERVAL_MAX = 1800  # Probe interval doubles after each failed probe, up to this
+CIRCUIT_PAUSE_REASON = 'circuit_open'  # jobs.pause_reason prefix for breaker pauses
+
+# Circuit states (accounts.circuit_state)
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
 
 # WhatsApp Web URLs
 WHATSAPP_BASE_URL = "https://web.whatsapp.com"
@@ -63,3 +180,31 @@ MESSAGE_STATUS_PENDING = 'pending'
 MESSAGE_STATUS_SENT = 'sent'
 MESSAGE_STATUS_FAILED = 'failed'
 MESSAGE_STATUS_RETRYING = 'retrying'
+MESSAGE_STATUS_CLAIMED = 'claimed'
+MESSAGE_STATUS_SENDING = 'sending'  # Send intent recorded just before ENTER
+MESSAGE_STATUS_DEFERRED = 'deferred'  # Recipient in quiet hours until not_before
+
+# Account Status Values
+ACCOUNT_STATUS_STARTING = 'starting'
+ACCOUNT_STATUS_WAITING_FOR_LOGIN = 'waiting_for_login'
+ACCOUNT_STATUS_ACTIVE = 'active'
+ACCOUNT_STATUS_STOPPED = 'stopped'
+
+# Send Journal States
+JOURNAL_STATE_INTENT = 'intent'  # ENTER may have been pressed - outcome not recorded yet
+JOURNAL_STATE_CONFIRMED = 'confirmed'
+JOURNAL_STATE_FAILED = 'failed'
+JOURNAL_STATE_RECOVERED_SENT = 'recovered_sent'  # Found in the chat after a crash
+JOURNAL_STATE_RECOVERED_UNSENT = 'recovered_unsent'  # Not in the chat - queued again
+JOURNAL_STATE_UNKNOWN = 'unknown'  # Could not be checked - failed as delivery unknown
+
+# Worker Registry Status Values
+WORKER_STATUS_ALIVE = 'alive'
+WORKER_STATUS_STALE = 'stale'  # Missed heartbeats - its claims were reassigned
+WORKER_STATUS_STOPPED = 'stopped'
+
+# Export Status Values
+EXPORT_STATUS_PENDING = 'pending'
+EXPORT_STATUS_RUNNING = 'running'
+EXPORT_STATUS_COMPLETED = 'completed'
+EXPORT_STATUS_FAILED = 'failed'
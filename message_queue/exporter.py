@@ -0,0 +1,182 @@
+"""
+Bulk export of campaign results
+Streams message_queue rows in chunks into gzip CSV or Parquet files
+"""
+
+import csv
+import gzip
+import os
+from utils.logger import logger
+import config
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_FORMAT_CSV = 'csv'
+EXPORT_FORMAT_PARQUET = 'parquet'
+
+# Columns written to every export, in order
+EXPORT_COLUMNS = [
+    'message_id', 'job_id', 'phone_number', 'status', 'retry_count',
+    'last_attempt_at', 'sent_at', 'error_message', 'created_at'
+]
+
+def parquet_available():
+    """
+    Check whether Parquet export is available (pyarrow installed)
+
+    Returns:
+        True if pyarrow can be used
+    """
+    return pq is not None
+
+def default_export_format():
+    """
+    Get the preferred export format for this installation
+
+    Returns:
+        'parquet' when pyarrow is installed, otherwise 'csv'
+    """
+    return EXPORT_FORMAT_PARQUET if parquet_available() else EXPORT_FORMAT_CSV
+
+class ResultExporter:
+    """
+    Writes job results to disk without materialising the whole job in memory
+    """
+
+    def __init__(self, job_store, export_folder=None):
+        """
+        Initialize exporter
+
+        Args:
+            job_store: JobStore used to read messages and track exports
+            export_folder: Directory for export files (default from config)
+        """
+        self.job_store = job_store
+        self.export_folder = export_folder or config.EXPORT_FOLDER
+
+    def create_export(self, job_id, export_format=None):
+        """
+        Record a pending export for a job
+
+        Args:
+            job_id: ID of the job
+            export_format: 'csv' or 'parquet' (default: parquet if available)
+
+        Returns:
+            export_id: ID of the created export
+        """
+        export_format = export_format or default_export_format()
+        if export_format not in (EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET):
+            raise ValueError(f"Unknown export format: {export_format}")
+        if export_format == EXPORT_FORMAT_PARQUET and not parquet_available():
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+        if not self.job_store.get_job_status(job_id):
+            raise ValueError(f"Job {job_id} not found")
+
+        return self.job_store.create_export(job_id, export_format)
+
+    def run_export(self, export_id):
+        """
+        Run a recorded export to completion (intended for a background thread)
+
+        Args:
+            export_id: ID of the export
+
+        Returns:
+            Path of the written file, or None on failure
+        """
+        export = self.job_store.get_export(export_id)
+        if not export:
+            logger.error(f"Export {export_id} not found")
+            return None
+
+        job_id = export['job_id']
+        export_format = export['format']
+        extension = 'csv.gz' if export_format == EXPORT_FORMAT_CSV else 'parquet'
+
+        os.makedirs(self.export_folder, exist_ok=True)
+        file_path = os.path.abspath(
+            os.path.join(self.export_folder, f"job_{job_id}_export_{export_id}.{extension}")
+        )
+        tmp_path = file_path + '.part'
+
+        self.job_store.update_export(export_id, config.EXPORT_STATUS_RUNNING)
+        logger.info(f"Export {export_id} started for job {job_id} ({export_format})")
+
+        try:
+            chunks = self.job_store.iter_job_message_chunks(job_id, EXPORT_COLUMNS)
+            if export_format == EXPORT_FORMAT_CSV:
+                row_count = self._write_csv(chunks, tmp_path)
+            else:
+                row_count = self._write_parquet(chunks, tmp_path)
+
+            # Publish atomically so downloads never see a partial file
+            os.replace(tmp_path, file_path)
+        except Exception as e:
+            logger.error(f"Export {export_id} failed: {str(e)}", exc_info=True)
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            self.job_store.update_export(export_id, config.EXPORT_STATUS_FAILED, error_message=str(e))
+            return None
+
+        self.job_store.update_export(
+            export_id, config.EXPORT_STATUS_COMPLETED, file_path=file_path, row_count=row_count
+        )
+        logger.info(f"Export {export_id} completed: {row_count} rows written to {file_path}")
+        return file_path
+
+    def _write_csv(self, chunks, path):
+        """
+        Write chunks to a gzip-compressed CSV file
+
+        Returns:
+            Number of rows written
+        """
+        row_count = 0
+        with gzip.open(path, 'wt', newline='', encoding='utf-8',
+                       compresslevel=config.EXPORT_CSV_COMPRESSLEVEL) as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for rows in chunks:
+                writer.writerows(rows)
+                row_count += len(rows)
+        return row_count
+
+    def _write_parquet(self, chunks, path):
+        """
+        Write chunks to a Parquet file, one row group per chunk
+
+        Returns:
+            Number of rows written
+        """
+        schema = pa.schema([
+            ('message_id', pa.int64()),
+            ('job_id', pa.int64()),
+            ('phone_number', pa.string()),
+            ('status', pa.string()),
+            ('retry_count', pa.int64()),
+            ('last_attempt_at', pa.string()),
+            ('sent_at', pa.string()),
+            ('error_message', pa.string()),
+            ('created_at', pa.string()),
+        ])
+
+        row_count = 0
+        with pq.ParquetWriter(path, schema, compression='snappy') as writer:
+            for rows in chunks:
+                columns = [
+                    [None if value is None else str(value) for value in column]
+                    if field.type == pa.string() else list(column)
+                    for field, column in zip(schema, zip(*rows))
+                ]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+                row_count += len(rows)
+        return row_count
@@ -3,11 +3,17 @@ SQLite-based persistent storage for jobs and messages
 Handles all database operations for campaign state
 """
 
+import json
 import sqlite3
 import os
 from datetime import datetime
 from contextlib import contextmanager
 from utils.logger import logger
+from utils.error_classifier import classify_error
+from utils.timezones import timezone_for_number, quiet_until
+from utils.message_fingerprint import message_fingerprint
+from utils.runtime_settings import TUNABLE_SETTINGS
+from message_queue.router import AccountRouter, route_hash, daily_cap, is_capped, is_routable
 import config
 
 class JobStore:
@@ -15,6 +21,19 @@ class JobStore:
     Manages persistent storage of jobs and messages using SQLite
     """
     
+    # Error recorded on sends failed because their delivery could not be confirmed
+    _INTERRUPTED_SEND_ERROR = "Interrupted during send - delivery not confirmed"
+    
+    # Jobs whose messages may be claimed by workers
+    _RUNNABLE_STATUSES = (
+        config.JOB_STATUS_PENDING,
+        config.JOB_STATUS_RUNNING,
+        config.JOB_STATUS_WAITING_FOR_LOGIN,
+    )
+    _RUNNABLE_MIN_VTIME_SQL = f'''COALESCE((
+        SELECT MIN(vtime) FROM {config.JOBS_TABLE} WHERE status IN (?, ?, ?)
+    ), 0)'''
+    
     def __init__(self, db_path=None):
         """
         Initialize JobStore with database path
@@ -87,6 +106,32 @@ class JobStore:
                 )
             ''')
             
+            # Columns added after the initial schema (existing databases are migrated)
+            # jobs.version is bumped on every status change so caches can revalidate cheaply
+            # weight/vtime drive weighted fair queuing across runnable jobs
+            # priority (copied onto each message) puts urgent jobs in a lane ahead of bulk
+            self._ensure_columns(cursor, config.JOBS_TABLE, [
+                ('version', 'INTEGER DEFAULT 0'),
+                ('weight', 'REAL DEFAULT 1'),
+                ('vtime', 'REAL DEFAULT 0'),
+                ('priority', 'INTEGER DEFAULT 0'),
+                ('pause_reason', 'TEXT'),
+                ('quiet_start', 'TEXT'),
+                ('quiet_end', 'TEXT'),
+            ])
+            # timezone/not_before: recipients in quiet hours wait as 'deferred'
+            # account_id is the routed account (NULL = any account may claim),
+            # route_hash the recipient's position on the routing ring
+            self._ensure_columns(cursor, config.QUEUE_TABLE, [
+                ('claimed_by', 'TEXT'),
+                ('claimed_at', 'TIMESTAMP'),
+                ('priority', 'INTEGER DEFAULT 0'),
+                ('timezone', 'TEXT'),
+                ('not_before', 'TIMESTAMP'),
+                ('account_id', 'TEXT'),
+                ('route_hash', 'INTEGER'),
+            ])
+            
             # Index for faster queue operations
             cursor.execute(f'''
                 CREATE INDEX IF NOT EXISTS idx_queue_status_job 
@@ -98,9 +143,264 @@ class JobStore:
                 ON {config.QUEUE_TABLE}(status, message_id)
             ''')
             
+            # Per-job claim index - next pending message of one job
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_queue_job_pending 
+                ON {config.QUEUE_TABLE}(job_id, status, message_id)
+            ''')
+            
+            # Priority lane index - highest priority pending message first
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_queue_priority 
+                ON {config.QUEUE_TABLE}(status, priority DESC, message_id)
+            ''')
+            
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_queue_claimed 
+                ON {config.QUEUE_TABLE}(claimed_by, status)
+            ''')
+            
+            # Quiet hours - deferred messages by wake-up time, and the
+            # per-job time-zone groups that are deferred together
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_queue_deferred 
+                ON {config.QUEUE_TABLE}(status, not_before)
+            ''')
+            
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_queue_job_timezone 
+                ON {config.QUEUE_TABLE}(job_id, status, timezone)
+            ''')
+            
+            # Account routing - next message of a job for one account, and
+            # ring ranges moved by a rebalance
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_queue_job_account 
+                ON {config.QUEUE_TABLE}(job_id, status, account_id, message_id)
+            ''')
+            
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_queue_route 
+                ON {config.QUEUE_TABLE}(status, route_hash)
+            ''')
+            
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_queue_account 
+                ON {config.QUEUE_TABLE}(account_id, status)
+            ''')
+            
+            # Accounts table - one row per WhatsApp account/worker in the pool
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.ACCOUNTS_TABLE} (
+                    account_id TEXT PRIMARY KEY,
+                    profile_dir TEXT,
+                    status TEXT NOT NULL,
+                    pid INTEGER,
+                    sent_count INTEGER DEFAULT 0,
+                    failed_count INTEGER DEFAULT 0,
+                    started_at TIMESTAMP,
+                    last_sent_at TIMESTAMP,
+                    last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            # pacing_state holds the DelayGenerator checkpoint written on shutdown
+            # circuit_* mirror the worker's circuit breaker for the API
+            # browser_* hold the latest watchdog sample of the account's Chrome
+            # daily_* count today's (UTC) sends against daily_cap (NULL = config)
+            self._ensure_columns(cursor, config.ACCOUNTS_TABLE, [
+                ('pacing_state', 'TEXT'),
+                ('circuit_state', 'TEXT'),
+                ('circuit_reason', 'TEXT'),
+                ('circuit_changed_at', 'TIMESTAMP'),
+                ('browser_rss_mb', 'REAL'),
+                ('browser_cpu_percent', 'REAL'),
+                ('browser_processes', 'INTEGER'),
+                ('browser_sampled_at', 'TIMESTAMP'),
+                ('daily_cap', 'INTEGER'),
+                ('daily_date', 'TEXT'),
+                ('daily_sent', 'INTEGER DEFAULT 0'),
+            ])
+            
+            # Routing state - the routable accounts the queue was last routed for
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.ROUTING_TABLE} (
+                    routing_id INTEGER PRIMARY KEY CHECK (routing_id = 1),
+                    accounts TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Worker registry - one row per worker process, kept fresh by heartbeats
+            # sent_count/failed_count mirror the account's counters at the last heartbeat
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.WORKERS_TABLE} (
+                    worker_id TEXT PRIMARY KEY,
+                    host TEXT,
+                    account_id TEXT NOT NULL,
+                    pid INTEGER,
+                    status TEXT NOT NULL,
+                    current_job_id INTEGER,
+                    sent_count INTEGER DEFAULT 0,
+                    failed_count INTEGER DEFAULT 0,
+                    throughput_per_min REAL DEFAULT 0,
+                    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    heartbeat_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_workers_status 
+                ON {config.WORKERS_TABLE}(status, heartbeat_at)
+            ''')
+            
+            # Send journal - one entry per send intent, closed with the outcome
+            # Entries left in 'intent' after a crash are the ambiguous sends;
+            # fingerprint + phone_number let recovery check the chat for them
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.SEND_JOURNAL_TABLE} (
+                    journal_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    message_id INTEGER NOT NULL,
+                    account_id TEXT NOT NULL,
+                    phone_number TEXT NOT NULL,
+                    fingerprint TEXT,
+                    state TEXT NOT NULL,
+                    intent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    resolved_at TIMESTAMP
+                )
+            ''')
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_journal_message 
+                ON {config.SEND_JOURNAL_TABLE}(message_id, state)
+            ''')
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_journal_account 
+                ON {config.SEND_JOURNAL_TABLE}(account_id, state)
+            ''')
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_journal_phone 
+                ON {config.SEND_JOURNAL_TABLE}(phone_number, fingerprint)
+            ''')
+            
+            # Pacing audit - every adaptive pacing decision per account
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.PACING_AUDIT_TABLE} (
+                    decision_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    account_id TEXT NOT NULL,
+                    job_id INTEGER,
+                    action TEXT NOT NULL,
+                    error_class TEXT,
+                    delay_before REAL,
+                    delay_after REAL,
+                    position REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_pacing_account 
+                ON {config.PACING_AUDIT_TABLE}(account_id, decision_id)
+            ''')
+            
+            # Runtime settings - overrides of tunable config constants
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.RUNTIME_SETTINGS_TABLE} (
+                    name TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Settings audit - every change; the newest audit_id is the settings version
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.SETTINGS_AUDIT_TABLE} (
+                    audit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    old_value TEXT,
+                    new_value TEXT,
+                    changed_by TEXT,
+                    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_settings_audit_name 
+                ON {config.SETTINGS_AUDIT_TABLE}(name, audit_id)
+            ''')
+            
+            # Contact lists table - reusable audiences referenced by list_id
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.CONTACT_LISTS_TABLE} (
+                    list_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT,
+                    contact_count INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Contact list members - one row per unique number in a list
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.CONTACT_LIST_MEMBERS_TABLE} (
+                    member_id INTEGER PRIMARY KEY,
+                    list_id INTEGER NOT NULL,
+                    phone_number TEXT NOT NULL,
+                    UNIQUE (list_id, phone_number),
+                    FOREIGN KEY (list_id) REFERENCES {config.CONTACT_LISTS_TABLE}(list_id) ON DELETE CASCADE
+                )
+            ''')
+            # Optional per-contact time zone overriding the one derived from the prefix
+            self._ensure_columns(cursor, config.CONTACT_LIST_MEMBERS_TABLE, [
+                ('timezone', 'TEXT'),
+            ])
+            
+            # Time-bucketed rollups - per bucket, job and error class
+            # error_class is '' for successful sends
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.ROLLUPS_TABLE} (
+                    bucket TEXT NOT NULL,
+                    bucket_start TEXT NOT NULL,
+                    job_id INTEGER NOT NULL,
+                    error_class TEXT NOT NULL DEFAULT '',
+                    sent_count INTEGER DEFAULT 0,
+                    failed_count INTEGER DEFAULT 0,
+                    retry_count INTEGER DEFAULT 0,
+                    PRIMARY KEY (bucket, bucket_start, job_id, error_class)
+                ) WITHOUT ROWID
+            ''')
+            
+            # Exports table - background result exports and their files
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {config.EXPORTS_TABLE} (
+                    export_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id INTEGER NOT NULL,
+                    format TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    file_path TEXT,
+                    row_count INTEGER DEFAULT 0,
+                    error_message TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    completed_at TIMESTAMP
+                )
+            ''')
+            
             logger.info(f"Database initialized at {self.db_path}")
     
-    def create_job(self, message_text=None, attachment_path=None, delay_min=None, delay_max=None):
+    def _ensure_columns(self, cursor, table, columns):
+        """
+        Add missing columns to an existing table
+        
+        Args:
+            cursor: Database cursor
+            table: Table name
+            columns: List of (column name, column definition) tuples
+        """
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row['name'] for row in cursor.fetchall()}
+        for name, definition in columns:
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+                logger.info(f"Added column {table}.{name}")
+    
+    def create_job(self, message_text=None, attachment_path=None, delay_min=None, delay_max=None,
+                   weight=None, priority=None, quiet_start=None, quiet_end=None):
         """
         Create a new job/campaign
         
@@ -109,22 +409,34 @@ class JobStore:
             attachment_path: Path to attachment file (optional)
             delay_min: Minimum delay between messages (default from config)
             delay_max: Maximum delay between messages (default from config)
+            weight: Fair-share weight relative to other jobs (default from config)
+            priority: Priority lane, higher is more urgent (default from config)
+            quiet_start: 'HH:MM' recipient-local start of quiet hours (optional)
+            quiet_end: 'HH:MM' recipient-local end of quiet hours (optional)
         
         Returns:
             job_id: ID of the created job
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            # New jobs start at the current virtual time so they neither
+            # jump ahead of nor queue behind the jobs already running
             cursor.execute(f'''
                 INSERT INTO {config.JOBS_TABLE} 
-                (status, message_text, attachment_path, delay_min, delay_max)
-                VALUES (?, ?, ?, ?, ?)
+                (status, message_text, attachment_path, delay_min, delay_max, weight, priority,
+                 quiet_start, quiet_end, vtime)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, {self._RUNNABLE_MIN_VTIME_SQL})
             ''', (
                 config.JOB_STATUS_PENDING,
                 message_text,
                 attachment_path,
                 delay_min or config.MIN_DELAY,
-                delay_max or config.MAX_DELAY
+                delay_max or config.MAX_DELAY,
+                weight or config.DEFAULT_JOB_WEIGHT,
+                priority or config.DEFAULT_JOB_PRIORITY,
+                quiet_start,
+                quiet_end,
+                *self._RUNNABLE_STATUSES
             ))
             job_id = cursor.lastrowid
             logger.info(f"Created job {job_id}")
@@ -145,49 +457,119 @@ class JobStore:
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            router, _ = self._ensure_routes(cursor)
             
-            # Get job defaults if not provided
-            if message_text is None or attachment_path is None:
-                cursor.execute(f'''
-                    SELECT message_text, attachment_path 
-                    FROM {config.JOBS_TABLE} 
-                    WHERE job_id = ?
-                ''', (job_id,))
-                row = cursor.fetchone()
-                if row:
-                    job_message_text = row['message_text']
-                    job_attachment_path = row['attachment_path']
-                    message_text = message_text or job_message_text
-                    attachment_path = attachment_path or job_attachment_path
+            # Get job defaults (messages inherit the job's priority lane)
+            cursor.execute(f'''
+                SELECT message_text, attachment_path, priority 
+                FROM {config.JOBS_TABLE} 
+                WHERE job_id = ?
+            ''', (job_id,))
+            row = cursor.fetchone()
+            priority = config.DEFAULT_JOB_PRIORITY
+            if row:
+                job_message_text = row['message_text']
+                job_attachment_path = row['attachment_path']
+                message_text = message_text or job_message_text
+                attachment_path = attachment_path or job_attachment_path
+                priority = row['priority'] or priority
             
-            # Insert messages
+            # Insert messages, each routed to its recipient's account
             messages = []
             for phone in phone_numbers:
                 messages.append((
                     job_id, phone, message_text, attachment_path,
-                    config.MESSAGE_STATUS_PENDING
+                    config.MESSAGE_STATUS_PENDING, priority, self._recipient_timezone(phone),
+                    router.route(phone), route_hash(phone)
                 ))
             
             cursor.executemany(f'''
                 INSERT INTO {config.QUEUE_TABLE} 
-                (job_id, phone_number, message_text, attachment_path, status)
-                VALUES (?, ?, ?, ?, ?)
+                (job_id, phone_number, message_text, attachment_path, status, priority, timezone,
+                 account_id, route_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', messages)
             
             # Update job total
-            cursor.execute(f'''
-                UPDATE {config.JOBS_TABLE}
-                SET total_messages = (
-                    SELECT COUNT(*) FROM {config.QUEUE_TABLE} WHERE job_id = ?
-                ),
-                updated_at = CURRENT_TIMESTAMP
-                WHERE job_id = ?
-            ''', (job_id, job_id))
+            self._update_job_total(job_id, conn)
             
             count = len(messages)
             logger.info(f"Added {count} messages to job {job_id}")
             return count
     
+    def add_list_messages_to_job(self, job_id, list_id, message_text=None, attachment_path=None):
+        """
+        Add one message per member of a stored contact list to a job
+        Copies the list server-side with a single INSERT ... SELECT
+        
+        Args:
+            job_id: ID of the job
+            list_id: ID of the contact list
+            message_text: Message text for every message
+            attachment_path: Attachment path for every message
+        
+        Returns:
+            Number of messages added
+        """
+        with self._get_connection() as conn:
+            # Per-contact override first, otherwise derived from the number
+            conn.create_function('recipient_timezone', 1, self._recipient_timezone, deterministic=True)
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            router, _ = self._ensure_routes(cursor)
+            conn.create_function('route_account', 1, router.route, deterministic=True)
+            conn.create_function('route_hash', 1, route_hash, deterministic=True)
+            cursor.execute(f'''
+                INSERT INTO {config.QUEUE_TABLE}
+                (job_id, phone_number, message_text, attachment_path, status, priority, timezone,
+                 account_id, route_hash)
+                SELECT ?, phone_number, ?, ?, ?, (
+                    SELECT COALESCE(priority, 0) FROM {config.JOBS_TABLE} WHERE job_id = ?
+                ), COALESCE(timezone, recipient_timezone(phone_number)),
+                route_account(phone_number), route_hash(phone_number)
+                FROM {config.CONTACT_LIST_MEMBERS_TABLE}
+                WHERE list_id = ?
+                ORDER BY member_id ASC
+            ''', (job_id, message_text, attachment_path,
+                  config.MESSAGE_STATUS_PENDING, job_id, list_id))
+            count = cursor.rowcount
+            
+            self._update_job_total(job_id, conn)
+            
+            logger.info(f"Added {count} messages from list {list_id} to job {job_id}")
+            return count
+    
+    def _recipient_timezone(self, phone_number):
+        """
+        Get the time zone of a recipient from its country prefix
+        
+        Args:
+            phone_number: Normalized phone number
+        
+        Returns:
+            IANA zone name, or DEFAULT_RECIPIENT_TIMEZONE if the prefix is unknown
+        """
+        return timezone_for_number(phone_number) or config.DEFAULT_RECIPIENT_TIMEZONE
+    
+    def _update_job_total(self, job_id, conn):
+        """
+        Update job total_messages from the queue
+        
+        Args:
+            job_id: ID of the job
+            conn: Database connection (must be from context manager)
+        """
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            UPDATE {config.JOBS_TABLE}
+            SET total_messages = (
+                SELECT COUNT(*) FROM {config.QUEUE_TABLE} WHERE job_id = ?
+            ),
+            updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+        ''', (job_id, job_id))
+    
     def get_next_pending_message(self, job_id=None):
         """
         Get the next pending message from the queue (FIFO)
@@ -219,228 +601,2031 @@ class JobStore:
             row = cursor.fetchone()
             return dict(row) if row else None
     
-    def mark_message_sent(self, message_id):
+    def claim_next_message(self, account_id, job_id=None):
         """
-        Mark a message as successfully sent
+        Atomically claim the next pending message for an account
+        
+        Without job_id, pending priority-lane messages (priority > 0) of runnable
+        jobs are served first, highest priority then FIFO, so an urgent send
+        waits at most one pacing slot regardless of queue depth. Otherwise jobs
+        are served by weighted fair queuing: the runnable job with the lowest
+        virtual time wins and its virtual time advances by 1/weight per claim,
+        so a small job is not stuck behind a huge one.
+        Within a job, messages are FIFO. Claimed messages are invisible to
+        other workers until sent, failed, released, or the claim lease expires.
+        
+        Quiet hours: a picked message whose recipient is in its job's quiet
+        hours is deferred together with every pending message of that job in
+        the same time zone, and the claim moves on. Deferred messages are not
+        'pending', so they cost nothing in the claim queries until they are
+        woken at not_before
+        
+        Routing: only messages routed to this account (or unrouted ones) are
+        considered, and an account whose sends today plus held claims reach
+        its daily cap claims nothing
         
         Args:
-            message_id: ID of the message
+            account_id: ID of the claiming account
+            job_id: Optional job ID to filter by
+        
+        Returns:
+            Claimed message row as dict, or None if no pending messages
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            # Take the write lock up front so concurrent workers serialise here
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            self._wake_deferred(cursor)
+            _, accounts = self._ensure_routes(cursor)
+            account = accounts.get(account_id)
+            # Claims already held (lease batches) count towards the
+            # cap, under the same lock, so the cap is never exceeded
+            if account and daily_cap(account) > 0 and is_capped(account, self._claims_held(cursor, account_id)):
+                logger.debug(f"Account {account_id} reached its daily cap")
+                return None
+            
+            requested_job_id = job_id
+            while True:
+                row = None
+                job_id = requested_job_id
+                if not job_id:
+                    row = self._next_priority_message(cursor, account_id=account_id)
+                    if row:
+                        job_id = row['job_id']
+                    else:
+                        job_id = self._next_fair_job(cursor, account_id)
+                        if not job_id:
+                            return None
+                
+                if not row:
+                    row = self._next_job_message(cursor, job_id, account_id)
+                    if not row:
+                        return None
+                
+                # Each pass defers at least one time-zone group, so this ends
+                if not self._defer_if_quiet(cursor, row):
+                    break
+            
             cursor.execute(f'''
                 UPDATE {config.QUEUE_TABLE}
-                SET status = ?, sent_at = CURRENT_TIMESTAMP,
-                    last_attempt_at = CURRENT_TIMESTAMP
+                SET status = ?, claimed_by = ?, claimed_at = CURRENT_TIMESTAMP
                 WHERE message_id = ?
-            ''', (config.MESSAGE_STATUS_SENT, message_id))
+            ''', (config.MESSAGE_STATUS_CLAIMED, account_id, row['message_id']))
             
-            # Update job statistics
             cursor.execute(f'''
-                SELECT job_id FROM {config.QUEUE_TABLE} WHERE message_id = ?
-            ''', (message_id,))
-            row = cursor.fetchone()
-            if row:
-                job_id = row['job_id']
-                self._update_job_stats(job_id, conn)
+                UPDATE {config.JOBS_TABLE}
+                SET vtime = vtime + 1.0 / MAX(weight, 0.001)
+                WHERE job_id = ?
+            ''', (job_id,))
+            
+            message = dict(row)
+            message['status'] = config.MESSAGE_STATUS_CLAIMED
+            message['claimed_by'] = account_id
+            return message
     
-    def mark_message_failed(self, message_id, error_message=None, increment_retry=True):
+    def _claims_held(self, cursor, account_id):
         """
-        Mark a message as failed and increment retry count
+        Count the messages an account has claimed but not finished
         
         Args:
-            message_id: ID of the message
-            error_message: Error message describing the failure
-            increment_retry: Whether to increment retry count (default: True)
+            cursor: Cursor inside the claim transaction
+            account_id: ID of the account
         
         Returns:
-            retry_count: Current retry count after increment
+            Number of claimed or sending messages
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get current retry count
-            cursor.execute(f'''
-                SELECT retry_count, job_id FROM {config.QUEUE_TABLE} 
-                WHERE message_id = ?
-            ''', (message_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                return 0
-            
-            retry_count = row['retry_count']
-            job_id = row['job_id']
-            
-            if increment_retry:
-                retry_count += 1
-            
-            # Determine new status
-            if retry_count < config.MAX_RETRY_ATTEMPTS:
-                new_status = config.MESSAGE_STATUS_PENDING  # Retry
-            else:
-                new_status = config.MESSAGE_STATUS_FAILED  # Permanent failure
-            
-            cursor.execute(f'''
-                UPDATE {config.QUEUE_TABLE}
-                SET status = ?, retry_count = ?, 
-                    last_attempt_at = CURRENT_TIMESTAMP,
-                    error_message = ?
-                WHERE message_id = ?
-            ''', (new_status, retry_count, error_message, message_id))
-            
-            # Update job statistics
-            self._update_job_stats(job_id, conn)
-            
-            return retry_count
+        cursor.execute(f'''
+            SELECT COUNT(*) FROM {config.QUEUE_TABLE}
+            WHERE claimed_by = ? AND status IN (?, ?)
+        ''', (account_id, config.MESSAGE_STATUS_CLAIMED, config.MESSAGE_STATUS_SENDING))
+        return cursor.fetchone()[0]
     
-    def _update_job_stats(self, job_id, conn):
+    def _wake_deferred(self, cursor):
         """
-        Update job statistics (sent_count, failed_count)
+        Return deferred messages whose quiet hours are over to the queue
+        An index range scan on (status, not_before) - empty most of the time
         
         Args:
-            job_id: ID of the job
-            conn: Database connection (must be from context manager)
+            cursor: Cursor inside the claim transaction
         """
-        cursor = conn.cursor()
         cursor.execute(f'''
-            UPDATE {config.JOBS_TABLE}
-            SET sent_count = (
-                SELECT COUNT(*) FROM {config.QUEUE_TABLE} 
-                WHERE job_id = ? AND status = ?
-            ),
-            failed_count = (
-                SELECT COUNT(*) FROM {config.QUEUE_TABLE} 
-                WHERE job_id = ? AND status = ?
-            ),
-            updated_at = CURRENT_TIMESTAMP
-            WHERE job_id = ?
-        ''', (job_id, config.MESSAGE_STATUS_SENT, 
-              job_id, config.MESSAGE_STATUS_FAILED, 
-              job_id))
+            UPDATE {config.QUEUE_TABLE}
+            SET status = ?, not_before = NULL
+            WHERE status = ? AND not_before <= datetime('now')
+        ''', (config.MESSAGE_STATUS_PENDING, config.MESSAGE_STATUS_DEFERRED))
+        if cursor.rowcount:
+            logger.info(f"Quiet hours over for {cursor.rowcount} deferred messages")
     
-    def update_job_status(self, job_id, status, started_at=None, completed_at=None):
+    def _defer_if_quiet(self, cursor, row):
         """
-        Update job status
+        Defer a message's time-zone group if its recipient is in quiet hours
         
         Args:
-            job_id: ID of the job
-            status: New status
-            started_at: Optional start timestamp
-            completed_at: Optional completion timestamp
+            cursor: Cursor inside the claim transaction
+            row: Picked pending message row
+        
+        Returns:
+            True if the message was deferred (pick another)
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            update_fields = ['status = ?', 'updated_at = CURRENT_TIMESTAMP']
-            params = [status, job_id]
-            
-            if started_at:
-                update_fields.append('started_at = ?')
-                params.insert(-1, started_at)
+        cursor.execute(f'''
+            SELECT quiet_start, quiet_end FROM {config.JOBS_TABLE} WHERE job_id = ?
+        ''', (row['job_id'],))
+        job = cursor.fetchone()
+        if not job or not job['quiet_start'] or not job['quiet_end']:
+            return False
+        
+        not_before = quiet_until(row['timezone'], job['quiet_start'], job['quiet_end'])
+        if not not_before:
+            return False
+        
+        cursor.execute(f'''
+            UPDATE {config.QUEUE_TABLE}
+            SET status = ?, not_before = ?
+            WHERE job_id = ? AND status = ? AND timezone = ?
+        ''', (config.MESSAGE_STATUS_DEFERRED, not_before,
+              row['job_id'], config.MESSAGE_STATUS_PENDING, row['timezone']))
+        logger.info(
+            f"Job {row['job_id']}: deferred {cursor.rowcount} messages in {row['timezone']} "
+            f"until {not_before} UTC (quiet hours)"
+        )
+        return True
+    
+    def _next_priority_message(self, cursor, above=0, account_id=None):
+        """
+        Get the most urgent pending message of a runnable job in the priority lane
+        Walks idx_queue_priority, so the cost does not grow with bulk queue depth
+        
+        Args:
+            cursor: Cursor inside the claim transaction
+            above: Only consider messages with priority greater than this
+            account_id: Only messages routed to this account or unrouted (optional)
+        
+        Returns:
+            Message row, or None if the priority lane is empty
+        """
+        routing, params = '', ()
+        if account_id is not None:
+            routing, params = 'AND (q.account_id = ? OR q.account_id IS NULL)', (account_id,)
+        cursor.execute(f'''
+            SELECT q.* FROM {config.QUEUE_TABLE} q
+            JOIN {config.JOBS_TABLE} j ON j.job_id = q.job_id
+            WHERE q.status = ? AND q.priority > ? {routing}
+              AND j.status IN (?, ?, ?)
+            ORDER BY q.priority DESC, q.message_id ASC
+            LIMIT 1
+        ''', (config.MESSAGE_STATUS_PENDING, above, *params, *self._RUNNABLE_STATUSES))
+        return cursor.fetchone()
+    
+    def has_priority_pending(self, above=0, account_id=None):
+        """
+        Check whether a runnable message with priority greater than `above` is waiting
+        
+        Args:
+            above: Priority threshold (default: any priority-lane message)
+            account_id: Only messages this account may claim (optional)
+        
+        Returns:
+            True if such a message is pending
+        """
+        with self._get_connection() as conn:
+            return self._next_priority_message(conn.cursor(), above, account_id) is not None
+    
+    def _next_fair_job(self, cursor, account_id=None):
+        """
+        Pick the runnable job with pending messages and the lowest virtual time
+        
+        Args:
+            cursor: Cursor inside the claim transaction
+            account_id: Only jobs with messages routed to this account or
+                unrouted (optional)
+        
+        Returns:
+            job_id, or None if nothing is runnable
+        """
+        if account_id is None:
+            pending, params = f'''EXISTS (
+                  SELECT 1 FROM {config.QUEUE_TABLE} q
+                  WHERE q.job_id = j.job_id AND q.status = ?
+              )''', (config.MESSAGE_STATUS_PENDING,)
+        else:
+            # Two probes of idx_queue_job_account instead of scanning other accounts' rows
+            pending, params = f'''(EXISTS (
+                  SELECT 1 FROM {config.QUEUE_TABLE} q
+                  WHERE q.job_id = j.job_id AND q.status = ? AND q.account_id = ?
+              ) OR EXISTS (
+                  SELECT 1 FROM {config.QUEUE_TABLE} q
+                  WHERE q.job_id = j.job_id AND q.status = ? AND q.account_id IS NULL
+              ))''', (config.MESSAGE_STATUS_PENDING, account_id, config.MESSAGE_STATUS_PENDING)
+        cursor.execute(f'''
+            SELECT j.job_id FROM {config.JOBS_TABLE} j
+            WHERE j.status IN (?, ?, ?)
+              AND {pending}
+            ORDER BY j.vtime ASC, j.job_id ASC
+            LIMIT 1
+        ''', (*self._RUNNABLE_STATUSES, *params))
+        row = cursor.fetchone()
+        return row['job_id'] if row else None
+    
+    def _next_job_message(self, cursor, job_id, account_id=None):
+        """
+        Get the oldest pending message of a job that an account may claim
+        
+        Args:
+            cursor: Cursor inside the claim transaction
+            job_id: ID of the job
+            account_id: Only messages routed to this account or unrouted (optional)
+        
+        Returns:
+            Message row, or None if none is pending
+        """
+        if account_id is None:
+            conditions = [('1 = 1', ())]
+        else:
+            conditions = [('account_id = ?', (account_id,)), ('account_id IS NULL', ())]
+        
+        rows = []
+        for condition, params in conditions:
+            cursor.execute(f'''
+                SELECT * FROM {config.QUEUE_TABLE}
+                WHERE job_id = ? AND status = ? AND {condition}
+                ORDER BY message_id ASC
+                LIMIT 1
+            ''', (job_id, config.MESSAGE_STATUS_PENDING, *params))
+            row = cursor.fetchone()
+            if row:
+                rows.append(row)
+        return min(rows, key=lambda row: row['message_id']) if rows else None
+    
+    def _routing_accounts(self, cursor):
+        """
+        Get the accounts with their routing inputs (health, circuit, today's sends)
+        
+        Args:
+            cursor: Cursor inside the claim/enqueue transaction
+        
+        Returns:
+            Dict of account_id -> account dict
+        """
+        cursor.execute(f'''
+            SELECT account_id, status, circuit_state, daily_cap,
+                   CASE WHEN daily_date = date('now') THEN daily_sent ELSE 0 END AS sent_today
+            FROM {config.ACCOUNTS_TABLE}
+        ''')
+        return {row['account_id']: dict(row) for row in cursor.fetchall()}
+    
+    def _ensure_routes(self, cursor):
+        """
+        Get the router for the currently routable accounts, re-routing queued
+        messages when that set changed since the last claim or enqueue
+        (account started or stopped, circuit opened, cap reached, new day)
+        Costs two small reads when nothing changed
+        
+        Args:
+            cursor: Cursor inside a BEGIN IMMEDIATE transaction
+        
+        Returns:
+            (AccountRouter, dict of account_id -> account dict)
+        """
+        accounts = self._routing_accounts(cursor)
+        routable = sorted(account_id for account_id, account in accounts.items() if is_routable(account))
+        router = AccountRouter(routable)
+        
+        signature = ','.join(routable)
+        cursor.execute(f'''
+            SELECT accounts FROM {config.ROUTING_TABLE} WHERE routing_id = 1
+        ''')
+        row = cursor.fetchone()
+        if not row or row['accounts'] != signature:
+            moved = self._assign_routes(cursor, router)
+            cursor.execute(f'''
+                INSERT INTO {config.ROUTING_TABLE} (routing_id, accounts, updated_at)
+                VALUES (1, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (routing_id) DO UPDATE SET
+                    accounts = excluded.accounts, updated_at = excluded.updated_at
+            ''', (signature,))
+            logger.info(
+                f"Routing over {len(routable)} accounts ({signature or 'none - any account may claim'}): "
+                f"{moved} queued messages re-routed"
+            )
+        return router, accounts
+    
+    def _assign_routes(self, cursor, router):
+        """
+        Route every pending and deferred message by its ring position
+        One range UPDATE per ring segment over idx_queue_route; only messages
+        whose account changes are written
+        
+        Args:
+            cursor: Cursor inside the transaction
+            router: AccountRouter for the routable accounts
+        
+        Returns:
+            Number of messages re-routed
+        """
+        statuses = (config.MESSAGE_STATUS_PENDING, config.MESSAGE_STATUS_DEFERRED)
+        segments = router.segments()
+        if not segments:
+            cursor.execute(f'''
+                UPDATE {config.QUEUE_TABLE} SET account_id = NULL
+                WHERE status IN (?, ?) AND account_id IS NOT NULL
+            ''', statuses)
+            return cursor.rowcount
+        
+        moved = 0
+        for low, high, account_id in segments:
+            cursor.execute(f'''
+                UPDATE {config.QUEUE_TABLE} SET account_id = ?
+                WHERE status IN (?, ?) AND route_hash BETWEEN ? AND ?
+                  AND account_id IS NOT ?
+            ''', (account_id, *statuses, low, high, account_id))
+            moved += cursor.rowcount
+        return moved
+    
+    def set_job_weight(self, job_id, weight):
+        """
+        Change a job's fair-share weight
+        
+        Args:
+            job_id: ID of the job
+            weight: New weight (> 0); a job with weight 4 gets 4x the sends of weight 1
+        
+        Returns:
+            True if the job exists
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.JOBS_TABLE}
+                SET weight = ?, version = version + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            ''', (weight, job_id))
+            updated = cursor.rowcount > 0
+            if updated:
+                logger.info(f"Job {job_id} weight set to {weight}")
+            return updated
+    
+    def set_job_delays(self, job_id, delay_min, delay_max):
+        """
+        Change a job's delay bounds
+        
+        Args:
+            job_id: ID of the job
+            delay_min: Minimum delay in seconds
+            delay_max: Maximum delay in seconds
+        
+        Returns:
+            True if the job exists
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # The version bump makes workers' job caches pick the bounds up
+            cursor.execute(f'''
+                UPDATE {config.JOBS_TABLE}
+                SET delay_min = ?, delay_max = ?, version = version + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            ''', (delay_min, delay_max, job_id))
+            updated = cursor.rowcount > 0
+            if updated:
+                logger.info(f"Job {job_id} delays set to {delay_min}-{delay_max}s")
+            return updated
+    
+    def release_message(self, message_id, account_id):
+        """
+        Return a claimed message to the queue without counting an attempt
+        
+        Args:
+            message_id: ID of the message
+            account_id: Account holding the claim - a claim that expired and
+                was taken by another account is left alone
+        
+        Returns:
+            True if the claim was held and released
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.QUEUE_TABLE}
+                SET status = ?, claimed_by = NULL, claimed_at = NULL
+                WHERE message_id = ? AND status = ? AND claimed_by = ?
+            ''', (config.MESSAGE_STATUS_PENDING, message_id, config.MESSAGE_STATUS_CLAIMED, account_id))
+            return cursor.rowcount > 0
+    
+    def mark_message_sending(self, message_id, account_id):
+        """
+        Record the intent to send a claimed message (just before pressing ENTER)
+        A message left in 'sending' was possibly delivered and is never retried
+        blindly; its journal entry stays in 'intent' until the outcome is recorded
+        
+        Args:
+            message_id: ID of the message
+            account_id: Account holding the claim
+        
+        Returns:
+            True if the claim was still held and the intent was recorded
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.QUEUE_TABLE}
+                SET status = ?, last_attempt_at = CURRENT_TIMESTAMP
+                WHERE message_id = ? AND status = ? AND claimed_by = ?
+            ''', (config.MESSAGE_STATUS_SENDING, message_id,
+                  config.MESSAGE_STATUS_CLAIMED, account_id))
+            if not cursor.rowcount:
+                return False
+            
+            cursor.execute(f'''
+                SELECT phone_number, message_text FROM {config.QUEUE_TABLE} WHERE message_id = ?
+            ''', (message_id,))
+            row = cursor.fetchone()
+            cursor.execute(f'''
+                INSERT INTO {config.SEND_JOURNAL_TABLE}
+                (message_id, account_id, phone_number, fingerprint, state)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (message_id, account_id, row['phone_number'],
+                  message_fingerprint(row['message_text']), config.JOURNAL_STATE_INTENT))
+            return True
+    
+    def _close_journal(self, cursor, message_id, state):
+        """
+        Record the outcome of a message's open send intent
+        
+        Args:
+            cursor: Cursor inside the transaction that records the outcome
+            message_id: ID of the message
+            state: JOURNAL_STATE_* outcome
+        """
+        cursor.execute(f'''
+            UPDATE {config.SEND_JOURNAL_TABLE}
+            SET state = ?, resolved_at = CURRENT_TIMESTAMP
+            WHERE message_id = ? AND state = ?
+        ''', (state, message_id, config.JOURNAL_STATE_INTENT))
+    
+    def get_interrupted_sends(self, account_id):
+        """
+        Get the sends an account left ambiguous (intent recorded, no outcome)
+        
+        Args:
+            account_id: ID of the account
+        
+        Returns:
+            List of dicts (message_id, job_id, phone_number, message_text,
+            attachment_path, intent_at, repeated). repeated is True when the
+            same text was delivered to the number before, so the chat's last
+            message cannot tell the two apart
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT q.message_id, q.job_id, q.phone_number, q.message_text,
+                       q.attachment_path, COALESCE(j.intent_at, q.last_attempt_at) AS intent_at,
+                       EXISTS (
+                           SELECT 1 FROM {config.SEND_JOURNAL_TABLE} p
+                           WHERE p.phone_number = q.phone_number AND p.fingerprint = j.fingerprint
+                             AND p.state IN (?, ?) AND p.message_id != q.message_id
+                       ) AS repeated
+                FROM {config.QUEUE_TABLE} q
+                LEFT JOIN {config.SEND_JOURNAL_TABLE} j
+                       ON j.message_id = q.message_id AND j.state = ?
+                WHERE q.claimed_by = ? AND q.status = ?
+                ORDER BY q.message_id ASC
+            ''', (config.JOURNAL_STATE_CONFIRMED, config.JOURNAL_STATE_RECOVERED_SENT,
+                  config.JOURNAL_STATE_INTENT, account_id, config.MESSAGE_STATUS_SENDING))
+            sends = []
+            for row in cursor.fetchall():
+                send = dict(row)
+                send['repeated'] = bool(send['repeated'])
+                sends.append(send)
+            return sends
+    
+    def resolve_interrupted_send(self, message_id, account_id, delivered):
+        """
+        Resolve one ambiguous send after checking the chat
+        
+        Args:
+            message_id: ID of the message
+            account_id: Account that left it mid-send
+            delivered: True (found in the chat - sent), False (not in the
+                chat - back to the queue without counting an attempt) or
+                None (could not tell - failed as delivery unknown)
+        
+        Returns:
+            True if the message was still mid-send and got resolved
+        """
+        if delivered:
+            status, journal_state = config.MESSAGE_STATUS_SENT, config.JOURNAL_STATE_RECOVERED_SENT
+            assignments = 'sent_at = CURRENT_TIMESTAMP'
+        elif delivered is None:
+            status, journal_state = config.MESSAGE_STATUS_FAILED, config.JOURNAL_STATE_UNKNOWN
+            assignments = 'error_message = ?'
+        else:
+            status, journal_state = config.MESSAGE_STATUS_PENDING, config.JOURNAL_STATE_RECOVERED_UNSENT
+            assignments = 'claimed_by = NULL, claimed_at = NULL'
+        params = (self._INTERRUPTED_SEND_ERROR,) if delivered is None else ()
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.QUEUE_TABLE}
+                SET status = ?, {assignments}
+                WHERE message_id = ? AND status = ? AND claimed_by = ?
+            ''', (status, *params, message_id, config.MESSAGE_STATUS_SENDING, account_id))
+            if not cursor.rowcount:
+                return False
+            self._close_journal(cursor, message_id, journal_state)
+            
+            if status == config.MESSAGE_STATUS_PENDING:
+                return True
+            cursor.execute(f'''
+                SELECT job_id FROM {config.QUEUE_TABLE} WHERE message_id = ?
+            ''', (message_id,))
+            job_id = cursor.fetchone()['job_id']
+            self._update_job_stats(job_id, conn)
+            if delivered:
+                self._record_rollup(job_id, conn, sent=1)
+                self._record_account_result(message_id, conn, sent=True)
+            else:
+                self._record_rollup(job_id, conn, error_class=classify_error(self._INTERRUPTED_SEND_ERROR),
+                                    failed=1)
+            return True
+    
+    def prune_send_journal(self, retention_days=None):
+        """
+        Delete resolved journal entries (open intents are always kept)
+        
+        Args:
+            retention_days: Age in days after which entries go
+                (default SEND_JOURNAL_RETENTION_DAYS)
+        
+        Returns:
+            Number of entries deleted
+        """
+        days = config.SEND_JOURNAL_RETENTION_DAYS if retention_days is None else retention_days
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                DELETE FROM {config.SEND_JOURNAL_TABLE}
+                WHERE state != ? AND resolved_at < datetime('now', ?)
+            ''', (config.JOURNAL_STATE_INTENT, f'-{int(days)} days'))
+            return cursor.rowcount
+    
+    def recover_interrupted_sends(self, account_id=None, older_than_seconds=None):
+        """
+        Resolve messages left mid-send (process killed after the send intent)
+        without checking the chat: delivery is unknown, so they are failed
+        permanently instead of re-sent
+        
+        Args:
+            account_id: Only sends of this account (optional)
+            older_than_seconds: Only sends whose intent is older than this and
+                whose account has no live worker (optional) - the lease sweep
+        
+        Returns:
+            Number of messages resolved
+        """
+        error_message = self._INTERRUPTED_SEND_ERROR
+        conditions, params = self._claim_conditions(
+            config.MESSAGE_STATUS_SENDING, account_id, older_than_seconds, 'last_attempt_at'
+        )
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(f'''
+                SELECT message_id, job_id FROM {config.QUEUE_TABLE}
+                WHERE {' AND '.join(conditions)}
+            ''', params)
+            rows = cursor.fetchall()
+            if not rows:
+                return 0
+            
+            jobs = {}
+            for row in rows:
+                cursor.execute(f'''
+                    UPDATE {config.QUEUE_TABLE}
+                    SET status = ?, error_message = ?
+                    WHERE message_id = ?
+                ''', (config.MESSAGE_STATUS_FAILED, error_message, row['message_id']))
+                self._close_journal(cursor, row['message_id'], config.JOURNAL_STATE_UNKNOWN)
+                jobs[row['job_id']] = jobs.get(row['job_id'], 0) + 1
+            
+            for job_id, count in jobs.items():
+                self._update_job_stats(job_id, conn)
+                self._record_rollup(job_id, conn, error_class=classify_error(error_message), failed=count)
+            
+            logger.warning(
+                f"{len(rows)} interrupted sends" + (f" of account {account_id}" if account_id else "") +
+                " marked failed (delivery unknown)"
+            )
+            return len(rows)
+    
+    def _claim_conditions(self, status, account_id=None, older_than_seconds=None, age_column='claimed_at'):
+        """
+        Build the WHERE conditions selecting held messages
+        
+        Args:
+            status: Message status (claimed or sending)
+            account_id: Only messages held by this account (optional)
+            older_than_seconds: Only messages whose age_column is older than
+                this and whose account has no live worker in the registry
+            age_column: Timestamp column the age is measured on
+        
+        Returns:
+            (conditions, params)
+        """
+        conditions, params = ['status = ?'], [status]
+        if account_id is not None:
+            conditions.append('claimed_by = ?')
+            params.append(account_id)
+        if older_than_seconds is not None:
+            conditions.append(f"{age_column} < datetime('now', ?)")
+            params.append(f'-{int(older_than_seconds)} seconds')
+            conditions.append(f'''claimed_by NOT IN (
+                SELECT account_id FROM {config.WORKERS_TABLE}
+                WHERE status = ? AND heartbeat_at >= datetime('now', ?)
+            )''')
+            params += [config.WORKER_STATUS_ALIVE, f'-{int(config.WORKER_STALE_AFTER)} seconds']
+        return conditions, params
+    
+    def release_claims(self, account_id=None, older_than_seconds=None):
+        """
+        Return claimed messages to the queue
+        
+        Args:
+            account_id: Only release claims held by this account (optional)
+            older_than_seconds: Only release claims older than this whose
+                account has no live worker in the registry (optional) - a
+                live worker may still be pacing or typing the message
+        
+        Returns:
+            Number of messages released
+        """
+        conditions, params = self._claim_conditions(
+            config.MESSAGE_STATUS_CLAIMED, account_id, older_than_seconds
+        )
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.QUEUE_TABLE}
+                SET status = ?, claimed_by = NULL, claimed_at = NULL
+                WHERE {' AND '.join(conditions)}
+            ''', [config.MESSAGE_STATUS_PENDING] + params)
+            released = cursor.rowcount
+            if released:
+                logger.info(f"Released {released} claimed messages back to the queue")
+            return released
+    
+    def renew_claims(self, account_id, message_ids):
+        """
+        Extend the lease of claims an account still holds (remote heartbeat)
+        Also marks the account as seen
+        
+        Args:
+            account_id: ID of the account
+            message_ids: Message IDs the account believes it holds
+        
+        Returns:
+            List of held message dicts (message_id, job_id, status); IDs
+            missing from it were lost, e.g. reclaimed after the lease expired
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.ACCOUNTS_TABLE} SET last_seen_at = CURRENT_TIMESTAMP
+                WHERE account_id = ?
+            ''', (account_id,))
+            if not message_ids:
+                return []
+            
+            placeholders = ', '.join('?' * len(message_ids))
+            cursor.execute(f'''
+                UPDATE {config.QUEUE_TABLE} SET claimed_at = CURRENT_TIMESTAMP
+                WHERE claimed_by = ? AND status = ? AND message_id IN ({placeholders})
+            ''', (account_id, config.MESSAGE_STATUS_CLAIMED, *message_ids))
+            return self._held_messages(cursor, account_id, message_ids)
+    
+    def get_held_messages(self, account_id, message_ids):
+        """
+        Get which of the given messages an account still holds
+        
+        Args:
+            account_id: ID of the account
+            message_ids: Message IDs to check
+        
+        Returns:
+            List of held message dicts (message_id, job_id, status)
+        """
+        if not message_ids:
+            return []
+        with self._get_connection() as conn:
+            return self._held_messages(conn.cursor(), account_id, message_ids)
+    
+    def _held_messages(self, cursor, account_id, message_ids):
+        """
+        Select the messages claimed or being sent by an account
+        """
+        placeholders = ', '.join('?' * len(message_ids))
+        cursor.execute(f'''
+            SELECT message_id, job_id, status FROM {config.QUEUE_TABLE}
+            WHERE claimed_by = ? AND status IN (?, ?) AND message_id IN ({placeholders})
+        ''', (account_id, config.MESSAGE_STATUS_CLAIMED, config.MESSAGE_STATUS_SENDING, *message_ids))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_top_pending_priority(self, account_id=None):
+        """
+        Get the highest priority among runnable pending messages
+        
+        Args:
+            account_id: Only messages this account may claim (optional)
+        
+        Returns:
+            Priority of the most urgent priority-lane message, or 0 if the lane is empty
+        """
+        with self._get_connection() as conn:
+            row = self._next_priority_message(conn.cursor(), account_id=account_id)
+            return row['priority'] if row else 0
+    
+    def mark_message_sent(self, message_id):
+        """
+        Mark a message as successfully sent
+        
+        Args:
+            message_id: ID of the message
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.QUEUE_TABLE}
+                SET status = ?, sent_at = CURRENT_TIMESTAMP,
+                    last_attempt_at = CURRENT_TIMESTAMP
+                WHERE message_id = ?
+            ''', (config.MESSAGE_STATUS_SENT, message_id))
+            self._close_journal(cursor, message_id, config.JOURNAL_STATE_CONFIRMED)
+            
+            # Update job statistics
+            cursor.execute(f'''
+                SELECT job_id FROM {config.QUEUE_TABLE} WHERE message_id = ?
+            ''', (message_id,))
+            row = cursor.fetchone()
+            if row:
+                job_id = row['job_id']
+                self._update_job_stats(job_id, conn)
+                self._record_rollup(job_id, conn, sent=1)
+                self._record_account_result(message_id, conn, sent=True)
+    
+    def mark_message_failed(self, message_id, error_message=None, increment_retry=True):
+        """
+        Mark a message as failed and increment retry count
+        A message already 'sending' (ENTER may have gone out before the
+        error) is never retried: it is failed as delivery unknown, like an
+        unverifiable interrupted send
+        
+        Args:
+            message_id: ID of the message
+            error_message: Error message describing the failure
+            increment_retry: Whether to increment retry count (default: True)
+        
+        Returns:
+            retry_count: Current retry count after increment
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get current retry count
+            cursor.execute(f'''
+                SELECT retry_count, job_id, status FROM {config.QUEUE_TABLE} 
+                WHERE message_id = ?
+            ''', (message_id,))
+            row = cursor.fetchone()
+            
+            if not row:
+                return 0
+            
+            retry_count = row['retry_count']
+            job_id = row['job_id']
+            
+            if increment_retry:
+                retry_count += 1
+            
+            # Determine new status
+            journal_state = config.JOURNAL_STATE_FAILED
+            if row['status'] == config.MESSAGE_STATUS_SENDING:
+                new_status = config.MESSAGE_STATUS_FAILED  # Maybe delivered - no blind re-send
+                journal_state = config.JOURNAL_STATE_UNKNOWN
+                error_message = f"{self._INTERRUPTED_SEND_ERROR} ({error_message})"
+            elif retry_count < config.MAX_RETRY_ATTEMPTS:
+                new_status = config.MESSAGE_STATUS_PENDING  # Retry
+            else:
+                new_status = config.MESSAGE_STATUS_FAILED  # Permanent failure
+            
+            # Counted before a retry clears the claim
+            self._record_account_result(message_id, conn, sent=False)
+            
+            cursor.execute(f'''
+                UPDATE {config.QUEUE_TABLE}
+                SET status = ?, retry_count = ?, 
+                    last_attempt_at = CURRENT_TIMESTAMP,
+                    error_message = ?,
+                    claimed_by = CASE WHEN ? = ? THEN NULL ELSE claimed_by END,
+                    claimed_at = CASE WHEN ? = ? THEN NULL ELSE claimed_at END
+                WHERE message_id = ?
+            ''', (new_status, retry_count, error_message,
+                  new_status, config.MESSAGE_STATUS_PENDING,
+                  new_status, config.MESSAGE_STATUS_PENDING, message_id))
+            self._close_journal(cursor, message_id, journal_state)
+            
+            # Update job statistics
+            self._update_job_stats(job_id, conn)
+            
+            if new_status == config.MESSAGE_STATUS_FAILED:
+                self._record_rollup(job_id, conn, error_class=classify_error(error_message), failed=1)
+            else:
+                self._record_rollup(job_id, conn, error_class=classify_error(error_message), retried=1)
+            
+            return retry_count
+    
+    def _record_account_result(self, message_id, conn, sent):
+        """
+        Count a send attempt against the account that claimed the message
+        
+        Args:
+            message_id: ID of the message
+            conn: Database connection (must be from context manager)
+            sent: True for a successful send, False for a failed attempt
+        """
+        cursor = conn.cursor()
+        if sent:
+            # Today's count restarts on the first send of a new (UTC) day
+            counters = '''sent_count = sent_count + 1, last_sent_at = CURRENT_TIMESTAMP,
+                daily_sent = CASE WHEN daily_date = date('now') THEN daily_sent + 1 ELSE 1 END,
+                daily_date = date('now')'''
+        else:
+            counters = 'failed_count = failed_count + 1'
+        cursor.execute(f'''
+            UPDATE {config.ACCOUNTS_TABLE}
+            SET {counters}, last_seen_at = CURRENT_TIMESTAMP
+            WHERE account_id = (
+                SELECT claimed_by FROM {config.QUEUE_TABLE} WHERE message_id = ?
+            )
+        ''', (message_id,))
+    
+    def _update_job_stats(self, job_id, conn):
+        """
+        Update job statistics (sent_count, failed_count)
+        
+        Args:
+            job_id: ID of the job
+            conn: Database connection (must be from context manager)
+        """
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            UPDATE {config.JOBS_TABLE}
+            SET sent_count = (
+                SELECT COUNT(*) FROM {config.QUEUE_TABLE} 
+                WHERE job_id = ? AND status = ?
+            ),
+            failed_count = (
+                SELECT COUNT(*) FROM {config.QUEUE_TABLE} 
+                WHERE job_id = ? AND status = ?
+            ),
+            updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+        ''', (job_id, config.MESSAGE_STATUS_SENT, 
+              job_id, config.MESSAGE_STATUS_FAILED, 
+              job_id))
+        
+        # Complete the job in the same transaction once every message is processed
+        cursor.execute(f'''
+            UPDATE {config.JOBS_TABLE}
+            SET status = ?, completed_at = ?, version = version + 1,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ? AND status = ?
+              AND sent_count + failed_count >= total_messages
+        ''', (config.JOB_STATUS_COMPLETED, datetime.now(), job_id, config.JOB_STATUS_RUNNING))
+        if cursor.rowcount:
+            cursor.execute(f'''
+                SELECT sent_count, failed_count FROM {config.JOBS_TABLE} WHERE job_id = ?
+            ''', (job_id,))
+            row = cursor.fetchone()
+            logger.info(f"Job {job_id} completed: {row['sent_count']} sent, {row['failed_count']} failed")
+    
+    def _record_rollup(self, job_id, conn, error_class='', sent=0, failed=0, retried=0):
+        """
+        Increment the current minute and hour rollup buckets for a job
+        
+        Args:
+            job_id: ID of the job
+            conn: Database connection (must be from context manager)
+            error_class: Error class of the outcome ('' for a successful send)
+            sent: Number of sent messages to add
+            failed: Number of permanently failed messages to add
+            retried: Number of failed attempts that will be retried
+        """
+        cursor = conn.cursor()
+        cursor.executemany(f'''
+            INSERT INTO {config.ROLLUPS_TABLE}
+            (bucket, bucket_start, job_id, error_class, sent_count, failed_count, retry_count)
+            VALUES (?, strftime(?, 'now'), ?, ?, ?, ?, ?)
+            ON CONFLICT (bucket, bucket_start, job_id, error_class) DO UPDATE SET
+                sent_count = sent_count + excluded.sent_count,
+                failed_count = failed_count + excluded.failed_count,
+                retry_count = retry_count + excluded.retry_count
+        ''', [
+            (bucket, bucket_format, job_id, error_class, sent, failed, retried)
+            for bucket, bucket_format in config.ROLLUP_BUCKETS.items()
+        ])
+    
+    def get_rollup_timeseries(self, bucket='hour', job_id=None, since=None, until=None):
+        """
+        Get sent/failed/retried counts per time bucket from the rollup table
+        
+        Args:
+            bucket: 'minute' or 'hour'
+            job_id: Optional job ID to filter by (default: all jobs)
+            since: Optional inclusive lower bound ('YYYY-MM-DD HH:MM:SS', UTC)
+            until: Optional exclusive upper bound ('YYYY-MM-DD HH:MM:SS', UTC)
+        
+        Returns:
+            List of dicts ordered by bucket_start
+        """
+        conditions, params = self._rollup_filters(bucket, job_id, since, until)
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT bucket_start,
+                       SUM(sent_count) AS sent_count,
+                       SUM(failed_count) AS failed_count,
+                       SUM(retry_count) AS retry_count
+                FROM {config.ROLLUPS_TABLE}
+                WHERE {' AND '.join(conditions)}
+                GROUP BY bucket_start
+                ORDER BY bucket_start ASC
+            ''', params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_rollup_errors(self, bucket='hour', job_id=None, since=None, until=None):
+        """
+        Get failure counts per time bucket and error class from the rollup table
+        
+        Args:
+            bucket: 'minute' or 'hour'
+            job_id: Optional job ID to filter by (default: all jobs)
+            since: Optional inclusive lower bound ('YYYY-MM-DD HH:MM:SS', UTC)
+            until: Optional exclusive upper bound ('YYYY-MM-DD HH:MM:SS', UTC)
+        
+        Returns:
+            List of dicts ordered by bucket_start and error_class
+        """
+        conditions, params = self._rollup_filters(bucket, job_id, since, until)
+        conditions.append("error_class != ''")
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT bucket_start, error_class,
+                       SUM(failed_count) AS failed_count,
+                       SUM(retry_count) AS retry_count
+                FROM {config.ROLLUPS_TABLE}
+                WHERE {' AND '.join(conditions)}
+                GROUP BY bucket_start, error_class
+                ORDER BY bucket_start ASC, error_class ASC
+            ''', params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def _rollup_filters(self, bucket, job_id, since, until):
+        """
+        Build WHERE conditions for rollup queries
+        
+        Returns:
+            Tuple of (conditions list, params list)
+        """
+        if bucket not in config.ROLLUP_BUCKETS:
+            raise ValueError(f"Unknown rollup bucket: {bucket}")
+        
+        conditions, params = ['bucket = ?'], [bucket]
+        if since:
+            conditions.append('bucket_start >= ?')
+            params.append(since)
+        if until:
+            conditions.append('bucket_start < ?')
+            params.append(until)
+        if job_id is not None:
+            conditions.append('job_id = ?')
+            params.append(job_id)
+        return conditions, params
+    
+    def update_job_status(self, job_id, status, started_at=None, completed_at=None,
+                          pause_reason=None):
+        """
+        Update job status
+        
+        Args:
+            job_id: ID of the job
+            status: New status
+            started_at: Optional start timestamp
+            completed_at: Optional completion timestamp
+            pause_reason: Why the job was paused (cleared on every other change)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            update_fields = ['status = ?', 'pause_reason = ?', 'version = version + 1',
+                             'updated_at = CURRENT_TIMESTAMP']
+            params = [status, pause_reason, job_id]
+            
+            if started_at:
+                update_fields.append('started_at = ?')
+                params.insert(-1, started_at)
             
             if completed_at:
                 update_fields.append('completed_at = ?')
                 params.insert(-1, completed_at)
             
             cursor.execute(f'''
-                UPDATE {config.JOBS_TABLE}
-                SET {', '.join(update_fields)}
-                WHERE job_id = ?
-            ''', params)
+                UPDATE {config.JOBS_TABLE}
+                SET {', '.join(update_fields)}
+                WHERE job_id = ?
+            ''', params)
+            
+            logger.info(f"Job {job_id} status updated to {status}")
+    
+    def get_job_status(self, job_id):
+        """
+        Get job status and statistics
+        
+        Args:
+            job_id: ID of the job
+        
+        Returns:
+            Job information as dict, or None if not found
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT * FROM {config.JOBS_TABLE} WHERE job_id = ?
+            ''', (job_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_job_backlog(self, job_id):
+        """
+        Count a job's unfinished messages by attempts already used
+        
+        Args:
+            job_id: ID of the job
+        
+        Returns:
+            Dict of retry_count -> number of messages still to send
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT retry_count, COUNT(*) AS count FROM {config.QUEUE_TABLE}
+                WHERE job_id = ? AND status IN (?, ?, ?, ?, ?)
+                GROUP BY retry_count
+            ''', (job_id, config.MESSAGE_STATUS_PENDING, config.MESSAGE_STATUS_RETRYING,
+                  config.MESSAGE_STATUS_CLAIMED, config.MESSAGE_STATUS_SENDING,
+                  config.MESSAGE_STATUS_DEFERRED))
+            return {row['retry_count']: row['count'] for row in cursor.fetchall()}
+    
+    def get_job_share(self, job_id):
+        """
+        Get a job's fair share of the worker pool
+        The job's weight over the weights of all runnable jobs in the same
+        priority lane that still have messages to send; 0 while a
+        higher-priority job has pending messages
+        
+        Args:
+            job_id: ID of the job
+        
+        Returns:
+            Share between 0 and 1 (1 if the job has no competition)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT job_id, weight, priority FROM {config.JOBS_TABLE} j
+                WHERE (status IN (?, ?, ?) AND EXISTS (
+                          SELECT 1 FROM {config.QUEUE_TABLE} q
+                          WHERE q.job_id = j.job_id AND q.status = ?
+                      ))
+                   OR job_id = ?
+            ''', (*self._RUNNABLE_STATUSES, config.MESSAGE_STATUS_PENDING, job_id))
+            jobs = [dict(row) for row in cursor.fetchall()]
+        
+        job = next((j for j in jobs if j['job_id'] == job_id), None)
+        if not job:
+            return 0.0
+        if any(j['priority'] > job['priority'] for j in jobs):
+            return 0.0
+        
+        lane_weight = sum(j['weight'] for j in jobs if j['priority'] == job['priority'])
+        return job['weight'] / lane_weight if lane_weight else 1.0
+    
+    def get_job_messages(self, job_id, status=None):
+        """
+        Get all messages for a job, optionally filtered by status
+        
+        Args:
+            job_id: ID of the job
+            status: Optional status filter
+        
+        Returns:
+            List of message dictionaries
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if status:
+                cursor.execute(f'''
+                    SELECT * FROM {config.QUEUE_TABLE}
+                    WHERE job_id = ? AND status = ?
+                    ORDER BY message_id ASC
+                ''', (job_id, status))
+            else:
+                cursor.execute(f'''
+                    SELECT * FROM {config.QUEUE_TABLE}
+                    WHERE job_id = ?
+                    ORDER BY message_id ASC
+                ''', (job_id,))
+            
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def iter_job_message_chunks(self, job_id, columns, chunk_size=None):
+        """
+        Stream messages for a job in fixed-size chunks
+        Only one chunk is held in memory at a time. Each chunk is read on its
+        own short connection, paging by message_id, so no read lock is held
+        while the caller writes a chunk out and workers keep claiming and
+        marking messages during a long export
+        
+        Args:
+            job_id: ID of the job
+            columns: Column names to select
+            chunk_size: Rows per chunk (default from config)
+        
+        Yields:
+            Lists of row tuples in message_id order
+        """
+        chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+        
+        last_id = 0
+        while True:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None  # Plain tuples - cheaper than sqlite3.Row
+                # message_id is appended as the paging key and stripped below
+                cursor.execute(f'''
+                    SELECT {', '.join(columns)}, message_id FROM {config.QUEUE_TABLE}
+                    WHERE job_id = ? AND message_id > ?
+                    ORDER BY message_id ASC
+                    LIMIT ?
+                ''', (job_id, last_id, chunk_size))
+                rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][-1]
+            yield [row[:-1] for row in rows]
+            if len(rows) < chunk_size:
+                break
+    
+    def create_export(self, job_id, export_format):
+        """
+        Record a new pending export
+        
+        Args:
+            job_id: ID of the job to export
+            export_format: 'csv' or 'parquet'
+        
+        Returns:
+            export_id: ID of the created export
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT INTO {config.EXPORTS_TABLE} (job_id, format, status)
+                VALUES (?, ?, ?)
+            ''', (job_id, export_format, config.EXPORT_STATUS_PENDING))
+            return cursor.lastrowid
+    
+    def update_export(self, export_id, status, file_path=None, row_count=None, error_message=None):
+        """
+        Update export status and results
+        
+        Args:
+            export_id: ID of the export
+            status: New status
+            file_path: Path of the written file (optional)
+            row_count: Number of rows written (optional)
+            error_message: Failure description (optional)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            finished = status in (config.EXPORT_STATUS_COMPLETED, config.EXPORT_STATUS_FAILED)
+            cursor.execute(f'''
+                UPDATE {config.EXPORTS_TABLE}
+                SET status = ?,
+                    file_path = COALESCE(?, file_path),
+                    row_count = COALESCE(?, row_count),
+                    error_message = ?,
+                    completed_at = CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE completed_at END
+                WHERE export_id = ?
+            ''', (status, file_path, row_count, error_message, finished, export_id))
+    
+    def get_export(self, export_id):
+        """
+        Get export information
+        
+        Args:
+            export_id: ID of the export
+        
+        Returns:
+            Export information as dict, or None if not found
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT * FROM {config.EXPORTS_TABLE} WHERE export_id = ?
+            ''', (export_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def pause_job(self, job_id, reason=None):
+        """
+        Pause a job by updating its status
+        
+        Args:
+            job_id: ID of the job
+            reason: Optional pause reason (None for a user pause)
+        """
+        self.update_job_status(job_id, config.JOB_STATUS_PAUSED, pause_reason=reason)
+    
+    def resume_job(self, job_id):
+        """
+        Resume a paused job
+        
+        Args:
+            job_id: ID of the job
+        """
+        job = self.get_job_status(job_id)
+        if job and job['status'] == config.JOB_STATUS_PAUSED:
+            # Catch up to the current virtual time - no burst for time spent paused
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f'''
+                    UPDATE {config.JOBS_TABLE}
+                    SET vtime = MAX(vtime, {self._RUNNABLE_MIN_VTIME_SQL})
+                    WHERE job_id = ?
+                ''', (*self._RUNNABLE_STATUSES, job_id))
+            self.update_job_status(job_id, config.JOB_STATUS_RUNNING)
+    
+    def stop_job(self, job_id):
+        """
+        Stop a job (marks as stopped, worker will stop processing)
+        
+        Args:
+            job_id: ID of the job
+        """
+        self.update_job_status(job_id, config.JOB_STATUS_STOPPED)
+    
+    def get_active_jobs(self):
+        """
+        Get all active jobs (running or paused)
+        
+        Returns:
+            List of job dictionaries
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT * FROM {config.JOBS_TABLE}
+                WHERE status IN (?, ?, ?)
+                ORDER BY job_id DESC
+            ''', (config.JOB_STATUS_RUNNING, 
+                  config.JOB_STATUS_PAUSED,
+                  config.JOB_STATUS_WAITING_FOR_LOGIN))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_paused_jobs(self, reason_prefix):
+        """
+        Get paused jobs whose pause reason starts with a prefix
+        
+        Args:
+            reason_prefix: Pause reason prefix (e.g. config.CIRCUIT_PAUSE_REASON)
+        
+        Returns:
+            List of job dictionaries
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # Account IDs in prefixes may contain LIKE wildcards ('_')
+            escaped = reason_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            cursor.execute(f'''
+                SELECT * FROM {config.JOBS_TABLE}
+                WHERE status = ? AND pause_reason LIKE ? ESCAPE '\\'
+                ORDER BY job_id ASC
+            ''', (config.JOB_STATUS_PAUSED, f"{escaped}%"))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def set_contact_timezones(self, list_id, timezones):
+        """
+        Override the derived time zone of contacts in a list
+        
+        Args:
+            list_id: ID of the contact list
+            timezones: Dict of phone number -> IANA zone name (None clears the override)
+        
+        Returns:
+            Number of contacts updated
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(f'''
+                UPDATE {config.CONTACT_LIST_MEMBERS_TABLE}
+                SET timezone = ?
+                WHERE list_id = ? AND phone_number = ?
+            ''', ((zone, list_id, phone) for phone, zone in timezones.items()))
+            return cursor.rowcount
+    
+    def create_contact_list(self, phone_numbers, name=None):
+        """
+        Store a contact list once so jobs can reference it by ID
+        Duplicate numbers are dropped by the (list_id, phone_number) constraint
+        
+        Args:
+            phone_numbers: List of normalized phone numbers
+            name: Optional human-readable list name
+        
+        Returns:
+            list_id: ID of the created list
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT INTO {config.CONTACT_LISTS_TABLE} (name) VALUES (?)
+            ''', (name,))
+            list_id = cursor.lastrowid
+            
+            cursor.executemany(f'''
+                INSERT OR IGNORE INTO {config.CONTACT_LIST_MEMBERS_TABLE}
+                (list_id, phone_number)
+                VALUES (?, ?)
+            ''', ((list_id, phone) for phone in phone_numbers))
+            
+            count = self._update_contact_count(list_id, conn)
+            logger.info(f"Created contact list {list_id} with {count} contacts")
+            return list_id
+    
+    def combine_contact_lists(self, operation, list_ids, name=None):
+        """
+        Create a new contact list from a set operation over existing lists
+        The set operation runs entirely in SQL
+        
+        Args:
+            operation: 'union', 'intersect' or 'minus' (first list minus the rest)
+            list_ids: IDs of the source lists (at least two)
+            name: Optional name for the resulting list
+        
+        Returns:
+            list_id: ID of the created list
+        """
+        operators = {'union': 'UNION', 'intersect': 'INTERSECT', 'minus': 'EXCEPT'}
+        if operation not in operators:
+            raise ValueError(f"Unknown list operation: {operation}")
+        if len(list_ids) < 2:
+            raise ValueError("At least two lists are required")
+        
+        member_select = f'''
+            SELECT phone_number FROM {config.CONTACT_LIST_MEMBERS_TABLE} WHERE list_id = ?
+        '''
+        compound = f' {operators[operation]} '.join([member_select] * len(list_ids))
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT INTO {config.CONTACT_LISTS_TABLE} (name) VALUES (?)
+            ''', (name,))
+            list_id = cursor.lastrowid
+            
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO {config.CONTACT_LIST_MEMBERS_TABLE}
+                (list_id, phone_number)
+                SELECT ?, phone_number FROM ({compound})
+            ''', (list_id, *list_ids))
             
-            logger.info(f"Job {job_id} status updated to {status}")
+            count = self._update_contact_count(list_id, conn)
+            logger.info(f"Created contact list {list_id} ({operation} of {list_ids}) with {count} contacts")
+            return list_id
     
-    def get_job_status(self, job_id):
+    def _update_contact_count(self, list_id, conn):
         """
-        Get job status and statistics
+        Update contact_count for a list
         
         Args:
-            job_id: ID of the job
+            list_id: ID of the contact list
+            conn: Database connection (must be from context manager)
         
         Returns:
-            Job information as dict, or None if not found
+            Number of contacts in the list
+        """
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            UPDATE {config.CONTACT_LISTS_TABLE}
+            SET contact_count = (
+                SELECT COUNT(*) FROM {config.CONTACT_LIST_MEMBERS_TABLE} WHERE list_id = ?
+            )
+            WHERE list_id = ?
+        ''', (list_id, list_id))
+        cursor.execute(f'''
+            SELECT contact_count FROM {config.CONTACT_LISTS_TABLE} WHERE list_id = ?
+        ''', (list_id,))
+        return cursor.fetchone()['contact_count']
+    
+    def get_contact_list(self, list_id):
+        """
+        Get contact list metadata
+        
+        Args:
+            list_id: ID of the contact list
+        
+        Returns:
+            List information as dict, or None if not found
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(f'''
-                SELECT * FROM {config.JOBS_TABLE} WHERE job_id = ?
-            ''', (job_id,))
+                SELECT * FROM {config.CONTACT_LISTS_TABLE} WHERE list_id = ?
+            ''', (list_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
     
-    def get_job_messages(self, job_id, status=None):
+    def get_contact_lists(self):
         """
-        Get all messages for a job, optionally filtered by status
+        Get metadata for all stored contact lists
+        
+        Returns:
+            List of contact list dictionaries
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT * FROM {config.CONTACT_LISTS_TABLE} ORDER BY list_id DESC
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_contact_list_numbers(self, list_id, limit=None):
+        """
+        Get the phone numbers stored in a contact list
         
         Args:
-            job_id: ID of the job
-            status: Optional status filter
+            list_id: ID of the contact list
+            limit: Optional maximum number of numbers to return
         
         Returns:
-            List of message dictionaries
+            List of phone numbers in insertion order
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            
-            if status:
+            cursor.execute(f'''
+                SELECT phone_number FROM {config.CONTACT_LIST_MEMBERS_TABLE}
+                WHERE list_id = ?
+                ORDER BY member_id ASC
+                LIMIT ?
+            ''', (list_id, limit if limit is not None else -1))
+            return [row['phone_number'] for row in cursor.fetchall()]
+    
+    def delete_contact_list(self, list_id):
+        """
+        Delete a contact list and its members
+        Jobs already created from the list keep their messages
+        
+        Args:
+            list_id: ID of the contact list
+        
+        Returns:
+            True if the list existed
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                DELETE FROM {config.CONTACT_LIST_MEMBERS_TABLE} WHERE list_id = ?
+            ''', (list_id,))
+            cursor.execute(f'''
+                DELETE FROM {config.CONTACT_LISTS_TABLE} WHERE list_id = ?
+            ''', (list_id,))
+            deleted = cursor.rowcount > 0
+            if deleted:
+                logger.info(f"Deleted contact list {list_id}")
+            return deleted
+    
+    def register_account(self, account_id, profile_dir=None, pid=None):
+        """
+        Register (or re-register) a worker account as starting
+        Send counters restart with the worker so throughput reflects this run
+        
+        Args:
+            account_id: ID of the account
+            profile_dir: Chrome profile directory used by the account
+            pid: Process ID of the worker
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT INTO {config.ACCOUNTS_TABLE}
+                (account_id, profile_dir, status, pid, started_at, last_seen_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT (account_id) DO UPDATE SET
+                    profile_dir = excluded.profile_dir,
+                    status = excluded.status,
+                    pid = excluded.pid,
+                    sent_count = 0,
+                    failed_count = 0,
+                    started_at = excluded.started_at,
+                    last_seen_at = excluded.last_seen_at
+            ''', (account_id, profile_dir, config.ACCOUNT_STATUS_STARTING, pid))
+    
+    def save_pacing_state(self, account_id, state):
+        """
+        Checkpoint an account's pacing state
+        
+        Args:
+            account_id: ID of the account
+            state: JSON-serialisable dict from DelayGenerator.get_state()
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.ACCOUNTS_TABLE}
+                SET pacing_state = ?
+                WHERE account_id = ?
+            ''', (json.dumps(state), account_id))
+    
+    def record_pacing_decision(self, account_id, job_id, decision, state):
+        """
+        Audit an adaptive pacing decision and checkpoint the account's pacing state
+        
+        Args:
+            account_id: ID of the account
+            job_id: Job whose send produced the decision
+            decision: Decision dict from AdaptivePacer.record()
+            state: Dict from DelayGenerator.get_state()
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT INTO {config.PACING_AUDIT_TABLE}
+                (account_id, job_id, action, error_class, delay_before, delay_after, position)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (account_id, job_id, decision['action'], decision['error_class'],
+                  decision['delay_before'], decision['delay_after'], decision['position']))
+            cursor.execute(f'''
+                UPDATE {config.ACCOUNTS_TABLE}
+                SET pacing_state = ?
+                WHERE account_id = ?
+            ''', (json.dumps(state), account_id))
+    
+    def get_pacing_decisions(self, account_id=None, limit=100):
+        """
+        Get the most recent adaptive pacing decisions
+        
+        Args:
+            account_id: Only decisions of this account (optional)
+            limit: Maximum number of decisions
+        
+        Returns:
+            List of decision dictionaries, newest first
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if account_id:
                 cursor.execute(f'''
-                    SELECT * FROM {config.QUEUE_TABLE}
-                    WHERE job_id = ? AND status = ?
-                    ORDER BY message_id ASC
-                ''', (job_id, status))
+                    SELECT * FROM {config.PACING_AUDIT_TABLE}
+                    WHERE account_id = ?
+                    ORDER BY decision_id DESC
+                    LIMIT ?
+                ''', (account_id, limit))
             else:
                 cursor.execute(f'''
-                    SELECT * FROM {config.QUEUE_TABLE}
-                    WHERE job_id = ?
-                    ORDER BY message_id ASC
-                ''', (job_id,))
-            
+                    SELECT * FROM {config.PACING_AUDIT_TABLE}
+                    ORDER BY decision_id DESC
+                    LIMIT ?
+                ''', (limit,))
             return [dict(row) for row in cursor.fetchall()]
     
-    def pause_job(self, job_id):
+    def get_settings_version(self):
         """
-        Pause a job by updating its status
+        Get the runtime settings version (one index lookup)
+        
+        Returns:
+            ID of the newest settings audit entry, 0 if never changed
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT COALESCE(MAX(audit_id), 0) AS version FROM {config.SETTINGS_AUDIT_TABLE}
+            ''')
+            return cursor.fetchone()['version']
+    
+    def get_runtime_settings(self):
+        """
+        Get the stored runtime setting overrides
+        
+        Returns:
+            Dict with version and overrides (setting name -> value)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT COALESCE(MAX(audit_id), 0) AS version FROM {config.SETTINGS_AUDIT_TABLE}
+            ''')
+            version = cursor.fetchone()['version']
+            cursor.execute(f'''
+                SELECT name, value FROM {config.RUNTIME_SETTINGS_TABLE}
+            ''')
+            # Overrides of settings that were retired (e.g. sender_pipeline_tabs) are ignored
+            overrides = {row['name']: json.loads(row['value']) for row in cursor.fetchall()
+                         if row['name'] in TUNABLE_SETTINGS}
+            return {'version': version, 'overrides': overrides}
+    
+    def update_runtime_settings(self, updates, changed_by=None):
+        """
+        Store runtime setting overrides and audit every change
         
         Args:
-            job_id: ID of the job
+            updates: Dict of setting name -> value (None removes the override)
+            changed_by: Who made the change (recorded in the audit)
+        
+        Returns:
+            Names of the settings that changed
         """
-        self.update_job_status(job_id, config.JOB_STATUS_PAUSED)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            changed = []
+            for name, value in updates.items():
+                cursor.execute(f'''
+                    SELECT value FROM {config.RUNTIME_SETTINGS_TABLE} WHERE name = ?
+                ''', (name,))
+                row = cursor.fetchone()
+                old_value = row['value'] if row else None
+                new_value = None if value is None else json.dumps(value)
+                if old_value == new_value:
+                    continue
+                
+                if new_value is None:
+                    cursor.execute(f'''
+                        DELETE FROM {config.RUNTIME_SETTINGS_TABLE} WHERE name = ?
+                    ''', (name,))
+                else:
+                    cursor.execute(f'''
+                        INSERT INTO {config.RUNTIME_SETTINGS_TABLE} (name, value) VALUES (?, ?)
+                        ON CONFLICT (name) DO UPDATE SET value = excluded.value,
+                                                         updated_at = CURRENT_TIMESTAMP
+                    ''', (name, new_value))
+                cursor.execute(f'''
+                    INSERT INTO {config.SETTINGS_AUDIT_TABLE} (name, old_value, new_value, changed_by)
+                    VALUES (?, ?, ?, ?)
+                ''', (name, old_value, new_value, changed_by))
+                changed.append(name)
+            return changed
     
-    def resume_job(self, job_id):
+    def get_settings_audit(self, name=None, limit=100):
         """
-        Resume a paused job
+        Get the most recent runtime settings changes
         
         Args:
-            job_id: ID of the job
+            name: Only changes of this setting (optional)
+            limit: Maximum number of entries
+        
+        Returns:
+            List of audit dictionaries (values JSON-decoded, None = default), newest first
         """
-        job = self.get_job_status(job_id)
-        if job and job['status'] == config.JOB_STATUS_PAUSED:
-            self.update_job_status(job_id, config.JOB_STATUS_RUNNING)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if name:
+                cursor.execute(f'''
+                    SELECT * FROM {config.SETTINGS_AUDIT_TABLE}
+                    WHERE name = ?
+                    ORDER BY audit_id DESC
+                    LIMIT ?
+                ''', (name, limit))
+            else:
+                cursor.execute(f'''
+                    SELECT * FROM {config.SETTINGS_AUDIT_TABLE}
+                    ORDER BY audit_id DESC
+                    LIMIT ?
+                ''', (limit,))
+            entries = []
+            for row in cursor.fetchall():
+                entry = dict(row)
+                for key in ('old_value', 'new_value'):
+                    entry[key] = json.loads(entry[key]) if entry[key] is not None else None
+                entries.append(entry)
+            return entries
     
-    def stop_job(self, job_id):
+    def get_pacing_state(self, account_id):
         """
-        Stop a job (marks as stopped, worker will stop processing)
+        Get an account's last pacing checkpoint
         
         Args:
-            job_id: ID of the job
+            account_id: ID of the account
+        
+        Returns:
+            State dict, or None if nothing was saved
         """
-        self.update_job_status(job_id, config.JOB_STATUS_STOPPED)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT pacing_state FROM {config.ACCOUNTS_TABLE} WHERE account_id = ?
+            ''', (account_id,))
+            row = cursor.fetchone()
+            if not row or not row['pacing_state']:
+                return None
+            try:
+                return json.loads(row['pacing_state'])
+            except ValueError:
+                return None
     
-    def get_active_jobs(self):
+    def update_account_status(self, account_id, status):
         """
-        Get all active jobs (running or paused)
+        Update account health status
+        
+        Args:
+            account_id: ID of the account
+            status: New status (ACCOUNT_STATUS_*)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.ACCOUNTS_TABLE}
+                SET status = ?, last_seen_at = CURRENT_TIMESTAMP
+                WHERE account_id = ?
+            ''', (status, account_id))
+    
+    def update_account_circuit(self, account_id, state, reason=None):
+        """
+        Record an account's circuit breaker state
+        
+        Args:
+            account_id: ID of the account
+            state: CIRCUIT_* state
+            reason: Error class that tripped the circuit (optional)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.ACCOUNTS_TABLE}
+                SET circuit_state = ?, circuit_reason = ?,
+                    circuit_changed_at = CURRENT_TIMESTAMP, last_seen_at = CURRENT_TIMESTAMP
+                WHERE account_id = ?
+            ''', (state, reason, account_id))
+    
+    def has_other_sending_account(self, account_id):
+        """
+        Check whether another account can still send
+        (a live worker in the registry and a circuit that is not open)
+        
+        Args:
+            account_id: Account to leave out
         
         Returns:
-            List of job dictionaries
+            True if at least one other account can send
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(f'''
-                SELECT * FROM {config.JOBS_TABLE}
-                WHERE status IN (?, ?, ?)
-                ORDER BY job_id DESC
-            ''', (config.JOB_STATUS_RUNNING, 
-                  config.JOB_STATUS_PAUSED,
-                  config.JOB_STATUS_WAITING_FOR_LOGIN))
-            return [dict(row) for row in cursor.fetchall()]
+                SELECT 1 FROM {config.ACCOUNTS_TABLE} a
+                JOIN {config.WORKERS_TABLE} w ON w.account_id = a.account_id
+                WHERE a.account_id != ? AND a.status != ?
+                  AND COALESCE(a.circuit_state, '') != ?
+                  AND w.status = ? AND w.heartbeat_at >= datetime('now', ?)
+                LIMIT 1
+            ''', (account_id, config.ACCOUNT_STATUS_STOPPED, config.CIRCUIT_OPEN,
+                  config.WORKER_STATUS_ALIVE, f'-{int(config.WORKER_STALE_AFTER)} seconds'))
+            return cursor.fetchone() is not None
+    
+    def record_browser_metrics(self, account_id, rss_mb, cpu_percent, process_count):
+        """
+        Store the latest browser resource sample of an account
+        
+        Args:
+            account_id: ID of the account
+            rss_mb: Total RSS of the Chrome process tree in MB
+            cpu_percent: Total CPU percent (100 = one core)
+            process_count: Number of processes in the tree
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.ACCOUNTS_TABLE}
+                SET browser_rss_mb = ?, browser_cpu_percent = ?, browser_processes = ?,
+                    browser_sampled_at = CURRENT_TIMESTAMP, last_seen_at = CURRENT_TIMESTAMP
+                WHERE account_id = ?
+            ''', (rss_mb, cpu_percent, process_count, account_id))
+    
+    def get_accounts(self):
+        """
+        Get all accounts with health, throughput and routing
+        throughput_per_hour is sent messages per hour since the worker started;
+        routed_count is pending messages routed to the account
+        
+        Returns:
+            List of account dictionaries
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT *,
+                       (SELECT COUNT(*) FROM {config.QUEUE_TABLE} q
+                        WHERE q.claimed_by = a.account_id AND q.status = ?) AS claimed_count,
+                       (SELECT COUNT(*) FROM {config.QUEUE_TABLE} q
+                        WHERE q.account_id = a.account_id AND q.status = ?) AS routed_count,
+                       CASE WHEN daily_date = date('now') THEN daily_sent ELSE 0 END AS sent_today,
+                       (julianday('now') - julianday(started_at)) * 24 AS hours_running
+                FROM {config.ACCOUNTS_TABLE} a
+                ORDER BY account_id ASC
+            ''', (config.MESSAGE_STATUS_CLAIMED, config.MESSAGE_STATUS_PENDING))
+            
+            accounts = []
+            for row in cursor.fetchall():
+                account = dict(row)
+                hours = account.pop('hours_running') or 0
+                account['throughput_per_hour'] = round(account['sent_count'] / hours, 1) if hours > 0 else 0.0
+                account['daily_cap'] = daily_cap(account)
+                account['routable'] = is_routable(account)
+                for column in ('daily_date', 'daily_sent'):
+                    account.pop(column)
+                accounts.append(account)
+            return accounts
+    
+    def set_account_daily_cap(self, account_id, cap):
+        """
+        Set an account's daily send cap
+        
+        Args:
+            account_id: ID of the account
+            cap: Sends allowed per (UTC) day, 0 for unlimited, None for the configured default
+        
+        Returns:
+            True if the account exists
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.ACCOUNTS_TABLE} SET daily_cap = ? WHERE account_id = ?
+            ''', (cap, account_id))
+            updated = cursor.rowcount > 0
+            if updated:
+                logger.info(f"Account {account_id} daily cap set to {cap}")
+            return updated
+    
+    def register_worker(self, worker_id, account_id, host=None, pid=None):
+        """
+        Add (or reset) a worker in the registry as alive
+        
+        Args:
+            worker_id: Unique worker ID (account@host:pid)
+            account_id: Account the worker sends as
+            host: Host name the worker runs on
+            pid: Process ID on that host
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO {config.WORKERS_TABLE}
+                (worker_id, host, account_id, pid, status, started_at, heartbeat_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            ''', (worker_id, host, account_id, pid, config.WORKER_STATUS_ALIVE))
+    
+    def heartbeat_worker(self, worker_id, current_job_id=None):
+        """
+        Refresh a worker's heartbeat, current job and throughput
+        Throughput is a time-weighted moving average over WORKER_THROUGHPUT_WINDOW
+        of the sends counted against the worker's account since the last heartbeat
+        
+        Args:
+            worker_id: ID of the worker
+            current_job_id: Job the worker is sending for (optional)
+        
+        Returns:
+            Status the worker had before this heartbeat, or None if it is not registered
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT w.status, w.sent_count, w.throughput_per_min,
+                       (julianday('now') - julianday(w.heartbeat_at)) * 86400 AS elapsed,
+                       COALESCE(a.sent_count, 0) AS account_sent,
+                       COALESCE(a.failed_count, 0) AS account_failed
+                FROM {config.WORKERS_TABLE} w
+                LEFT JOIN {config.ACCOUNTS_TABLE} a ON a.account_id = w.account_id
+                WHERE w.worker_id = ?
+            ''', (worker_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            
+            throughput = row['throughput_per_min'] or 0.0
+            elapsed = row['elapsed'] or 0
+            if elapsed > 0:
+                rate = max(0, row['account_sent'] - row['sent_count']) / elapsed * 60
+                weight = min(1.0, elapsed / config.WORKER_THROUGHPUT_WINDOW)
+                throughput += weight * (rate - throughput)
+            
+            cursor.execute(f'''
+                UPDATE {config.WORKERS_TABLE}
+                SET status = ?, current_job_id = ?, sent_count = ?, failed_count = ?,
+                    throughput_per_min = ?, heartbeat_at = CURRENT_TIMESTAMP
+                WHERE worker_id = ?
+            ''', (config.WORKER_STATUS_ALIVE, current_job_id, row['account_sent'],
+                  row['account_failed'], round(throughput, 3), worker_id))
+            return row['status']
+    
+    def deregister_worker(self, worker_id):
+        """
+        Mark a worker as cleanly stopped
+        
+        Args:
+            worker_id: ID of the worker
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                UPDATE {config.WORKERS_TABLE}
+                SET status = ?, current_job_id = NULL, heartbeat_at = CURRENT_TIMESTAMP
+                WHERE worker_id = ?
+            ''', (config.WORKER_STATUS_STOPPED, worker_id))
+    
+    def mark_stale_workers(self, stale_after_seconds):
+        """
+        Mark alive workers whose last heartbeat is too old as stale
+        Each worker is claimed by exactly one caller, so concurrent reapers
+        never fail over the same worker twice
+        
+        Args:
+            stale_after_seconds: Heartbeat age after which a worker is stale
+        
+        Returns:
+            List of newly stale worker dicts; orphaned is True when no other
+            alive worker sends as the same account (its work must be reassigned)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT worker_id, account_id, host, pid, current_job_id, heartbeat_at
+                FROM {config.WORKERS_TABLE}
+                WHERE status = ? AND heartbeat_at < datetime('now', ?)
+            ''', (config.WORKER_STATUS_ALIVE, f'-{int(stale_after_seconds)} seconds'))
+            candidates = [dict(row) for row in cursor.fetchall()]
+            
+            stale = []
+            for worker in candidates:
+                cursor.execute(f'''
+                    UPDATE {config.WORKERS_TABLE} SET status = ?
+                    WHERE worker_id = ? AND status = ?
+                ''', (config.WORKER_STATUS_STALE, worker['worker_id'], config.WORKER_STATUS_ALIVE))
+                if not cursor.rowcount:
+                    continue
+                # A newer worker on the same account already recovered its work
+                cursor.execute(f'''
+                    SELECT 1 FROM {config.WORKERS_TABLE}
+                    WHERE account_id = ? AND status = ? AND worker_id != ?
+                ''', (worker['account_id'], config.WORKER_STATUS_ALIVE, worker['worker_id']))
+                worker['orphaned'] = cursor.fetchone() is None
+                stale.append(worker)
+            
+            cursor.execute(f'''
+                DELETE FROM {config.WORKERS_TABLE}
+                WHERE status != ? AND heartbeat_at < datetime('now', ?)
+            ''', (config.WORKER_STATUS_ALIVE, f'-{int(config.WORKER_REGISTRY_RETENTION_HOURS)} hours'))
+            return stale
+    
+    def get_workers(self):
+        """
+        Get the worker registry with heartbeat ages and held work
+        
+        Returns:
+            List of worker dictionaries (alive first)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT w.*,
+                       (julianday('now') - julianday(w.heartbeat_at)) * 86400 AS heartbeat_age,
+                       (SELECT COUNT(*) FROM {config.QUEUE_TABLE} q
+                        WHERE q.claimed_by = w.account_id AND q.status IN (?, ?)
+                          AND w.status = ?) AS held_count
+                FROM {config.WORKERS_TABLE} w
+                ORDER BY w.status = ? DESC, w.account_id ASC, w.heartbeat_at DESC
+            ''', (config.MESSAGE_STATUS_CLAIMED, config.MESSAGE_STATUS_SENDING,
+                  config.WORKER_STATUS_ALIVE, config.WORKER_STATUS_ALIVE))
+            
+            workers = []
+            for row in cursor.fetchall():
+                worker = dict(row)
+                worker['heartbeat_age'] = round(worker['heartbeat_age'] or 0, 1)
+                workers.append(worker)
+            return workers
@@ -0,0 +1,142 @@
+"""
+Local queue notification channel
+The API signals new or resumed work over UDP so idle workers wake immediately
+"""
+
+import select
+import socket
+import time
+from utils.logger import logger
+import config
+
+EVENT_ENQUEUE = 'enqueue'
+EVENT_RESUME = 'resume'
+EVENT_PAUSE = 'pause'
+EVENT_STOP = 'stop'
+
+class QueueNotifier:
+    """
+    Sends fire-and-forget notifications to every local worker slot
+    Enqueue/resume wake idle workers; pause/stop cut short in-flight pacing waits
+    """
+
+    def __init__(self, host=None, port=None, slots=None):
+        """
+        Initialize notifier
+
+        Args:
+            host: Notification host (default from config)
+            port: First notification port (default from config)
+            slots: Number of consecutive ports workers may listen on (default from config)
+        """
+        self.host = host or config.WORKER_NOTIFY_HOST
+        self.port = port or config.WORKER_NOTIFY_PORT
+        self.slots = slots or config.WORKER_NOTIFY_SLOTS
+
+    def notify(self, event, job_id=None):
+        """
+        Notify listening workers of a queue event
+        Never raises - workers fall back to polling if a notification is lost
+
+        Args:
+            event: Event name (EVENT_ENQUEUE, EVENT_RESUME, ...)
+            job_id: Optional job ID the event refers to
+        """
+        payload = f"{event}:{job_id if job_id is not None else ''}".encode('utf-8')
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                for slot in range(self.slots):
+                    try:
+                        sock.sendto(payload, (self.host, self.port + slot))
+                    except OSError:
+                        pass
+        except OSError as e:
+            logger.debug(f"Queue notification failed: {str(e)}")
+
+class QueueListener:
+    """
+    Blocks a worker until a queue notification arrives or a timeout expires
+    """
+
+    def __init__(self, host=None, port=None, slots=None):
+        """
+        Bind the first free notification slot
+
+        Args:
+            host: Notification host (default from config)
+            port: First notification port (default from config)
+            slots: Number of consecutive ports to try (default from config)
+        """
+        self.sock = None
+        host = host or config.WORKER_NOTIFY_HOST
+        port = port or config.WORKER_NOTIFY_PORT
+        slots = slots or config.WORKER_NOTIFY_SLOTS
+
+        for slot in range(slots):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                sock.bind((host, port + slot))
+            except OSError:
+                sock.close()
+                continue
+            sock.setblocking(False)
+            self.sock = sock
+            logger.info(f"Listening for queue notifications on {host}:{port + slot}")
+            break
+
+        if not self.sock:
+            logger.warning("No free notification port - worker will poll the queue")
+
+    @property
+    def active(self):
+        """True if notifications can be received (otherwise callers must poll)"""
+        return self.sock is not None
+
+    def wait(self, timeout):
+        """
+        Wait for queue notifications
+
+        Args:
+            timeout: Maximum seconds to block
+
+        Returns:
+            List of (event, job_id) tuples received (empty on timeout)
+        """
+        if not self.sock:
+            time.sleep(timeout)
+            return []
+
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        if not readable:
+            return []
+
+        # Drain everything queued so bursts of enqueues cause one wake-up
+        events = []
+        while True:
+            try:
+                payload, _ = self.sock.recvfrom(256)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+            event, _, job_id = payload.decode('utf-8', 'replace').partition(':')
+            events.append((event, int(job_id) if job_id.isdigit() else None))
+        return events
+
+    def wake(self):
+        """
+        Wake a blocked wait() from another thread or a signal handler
+        """
+        if self.sock:
+            try:
+                self.sock.sendto(b'wake:', self.sock.getsockname())
+            except OSError:
+                pass
+
+    def close(self):
+        """
+        Release the notification port
+        """
+        if self.sock:
+            self.sock.close()
+            self.sock = None
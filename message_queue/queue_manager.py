@@ -4,9 +4,24 @@ Wraps JobStore with queue-specific operations
 """
 
 from message_queue.job_store import JobStore
+from message_queue.notifier import QueueNotifier, EVENT_ENQUEUE, EVENT_RESUME, EVENT_PAUSE, EVENT_STOP
+import math
+from datetime import datetime, timedelta, timezone
+from utils.error_classifier import ERROR_CLASS_THROTTLED
 from utils.logger import logger
+from utils.timezones import parse_clock_time, is_valid_timezone, SQLITE_UTC_FORMAT
+from utils.runtime_settings import DEFAULTS as SETTING_DEFAULTS, validate_settings, apply_settings
 import config
 
+# Outcomes a remote worker reports through the lease API
+LEASE_RELEASED = 'released'
+LEASE_OUTCOMES = (
+    config.MESSAGE_STATUS_SENDING,
+    config.MESSAGE_STATUS_SENT,
+    config.MESSAGE_STATUS_FAILED,
+    LEASE_RELEASED,
+)
+
 class QueueManager:
     """
     High-level interface for managing the message queue
@@ -21,9 +36,11 @@ class QueueManager:
             db_path: Path to SQLite database (default: from config)
         """
         self.job_store = JobStore(db_path)
+        self.notifier = QueueNotifier()
     
     def enqueue_job(self, phone_numbers, message_text=None, attachment_path=None, 
-                   delay_min=None, delay_max=None):
+                   delay_min=None, delay_max=None, weight=None, priority=None,
+                   quiet_start=None, quiet_end=None):
         """
         Create a new job and enqueue all messages
         
@@ -33,6 +50,10 @@ class QueueManager:
             attachment_path: Path to attachment file (optional)
             delay_min: Minimum delay between messages
             delay_max: Maximum delay between messages
+            weight: Fair-share weight relative to other running jobs
+            priority: Priority lane (0 = bulk, higher preempts lower lanes)
+            quiet_start: 'HH:MM' recipient-local start of quiet hours (optional)
+            quiet_end: 'HH:MM' recipient-local end of quiet hours (optional)
         
         Returns:
             job_id: ID of the created job
@@ -47,12 +68,20 @@ class QueueManager:
         if not message_text and not attachment_path:
             raise ValueError("Either message_text or attachment_path must be provided")
         
+        self._validate_weight(weight)
+        self._validate_priority(priority)
+        self._validate_quiet_hours(quiet_start, quiet_end)
+        
         # Create job
         job_id = self.job_store.create_job(
             message_text=message_text,
             attachment_path=attachment_path,
             delay_min=delay_min or config.MIN_DELAY,
-            delay_max=delay_max or config.MAX_DELAY
+            delay_max=delay_max or config.MAX_DELAY,
+            weight=weight,
+            priority=priority,
+            quiet_start=quiet_start,
+            quiet_end=quiet_end
         )
         
         # Add messages to queue
@@ -64,8 +93,240 @@ class QueueManager:
         )
         
         logger.info(f"Job {job_id} enqueued with {len(unique_numbers)} messages")
+        self.notifier.notify(EVENT_ENQUEUE, job_id)
         return job_id
     
+    def enqueue_job_from_list(self, list_id, message_text=None, attachment_path=None,
+                              delay_min=None, delay_max=None, weight=None, priority=None,
+                              quiet_start=None, quiet_end=None):
+        """
+        Create a new job whose recipients come from a stored contact list
+        
+        Args:
+            list_id: ID of the contact list
+            message_text: Message text
+            attachment_path: Path to attachment file (optional)
+            delay_min: Minimum delay between messages
+            delay_max: Maximum delay between messages
+            weight: Fair-share weight relative to other running jobs
+            priority: Priority lane (0 = bulk, higher preempts lower lanes)
+            quiet_start: 'HH:MM' recipient-local start of quiet hours (optional)
+            quiet_end: 'HH:MM' recipient-local end of quiet hours (optional)
+        
+        Returns:
+            job_id: ID of the created job
+        """
+        contact_list = self.job_store.get_contact_list(list_id)
+        if not contact_list:
+            raise ValueError(f"Contact list {list_id} not found")
+        
+        if not contact_list['contact_count']:
+            raise ValueError(f"Contact list {list_id} is empty")
+        
+        if not message_text and not attachment_path:
+            raise ValueError("Either message_text or attachment_path must be provided")
+        
+        self._validate_weight(weight)
+        self._validate_priority(priority)
+        self._validate_quiet_hours(quiet_start, quiet_end)
+        
+        job_id = self.job_store.create_job(
+            message_text=message_text,
+            attachment_path=attachment_path,
+            delay_min=delay_min or config.MIN_DELAY,
+            delay_max=delay_max or config.MAX_DELAY,
+            weight=weight,
+            priority=priority,
+            quiet_start=quiet_start,
+            quiet_end=quiet_end
+        )
+        
+        count = self.job_store.add_list_messages_to_job(
+            job_id=job_id,
+            list_id=list_id,
+            message_text=message_text,
+            attachment_path=attachment_path
+        )
+        
+        logger.info(f"Job {job_id} enqueued from list {list_id} with {count} messages")
+        self.notifier.notify(EVENT_ENQUEUE, job_id)
+        return job_id
+    
+    def _validate_weight(self, weight):
+        """
+        Validate a fair-share weight
+        
+        Args:
+            weight: Weight to validate (None means default)
+        """
+        # NaN/infinite weights would break the virtual-time ordering of claims
+        if weight is not None and not (math.isfinite(weight) and weight > 0):
+            raise ValueError("Weight must be a finite number greater than 0")
+    
+    def _validate_priority(self, priority):
+        """
+        Validate a priority lane
+        
+        Args:
+            priority: Priority to validate (None means default)
+        """
+        if priority is not None and (not isinstance(priority, int) or priority < 0):
+            raise ValueError("Priority must be a non-negative integer")
+    
+    def _validate_quiet_hours(self, quiet_start, quiet_end):
+        """
+        Validate a quiet-hours window
+        
+        Args:
+            quiet_start: 'HH:MM' start (or None)
+            quiet_end: 'HH:MM' end (or None)
+        """
+        if bool(quiet_start) != bool(quiet_end):
+            raise ValueError("quiet_start and quiet_end must be given together")
+        if quiet_start:
+            if parse_clock_time(quiet_start) == parse_clock_time(quiet_end):
+                raise ValueError("quiet_start and quiet_end must differ")
+    
+    def has_priority_pending(self, above=0, account_id=None):
+        """
+        Check whether a more urgent message is waiting to be claimed
+        
+        Args:
+            above: Priority threshold
+            account_id: Only messages routed to this account or unrouted (optional)
+        
+        Returns:
+            True if a runnable message with priority > above is pending
+        """
+        return self.job_store.has_priority_pending(above, account_id)
+    
+    def set_job_weight(self, job_id, weight):
+        """
+        Change a job's fair-share weight
+        
+        Args:
+            job_id: ID of the job
+            weight: New weight (> 0)
+        
+        Returns:
+            True if the job exists
+        """
+        self._validate_weight(weight)
+        return self.job_store.set_job_weight(job_id, weight)
+    
+    def set_job_delays(self, job_id, delay_min, delay_max):
+        """
+        Change a job's delay bounds
+        A job keeps the bounds it was created with; the min_delay/max_delay
+        runtime settings only apply to new jobs, so this is how a live job
+        is slowed down or sped up
+        
+        Args:
+            job_id: ID of the job
+            delay_min: Minimum delay in seconds
+            delay_max: Maximum delay in seconds
+        
+        Returns:
+            True if the job exists
+        """
+        if not (math.isfinite(delay_min) and math.isfinite(delay_max) and 0 < delay_min <= delay_max):
+            raise ValueError("Delays must be finite with 0 < delay_min <= delay_max")
+        return self.job_store.set_job_delays(job_id, delay_min, delay_max)
+    
+    def set_contact_timezones(self, list_id, timezones):
+        """
+        Override the derived time zone of contacts in a list
+        
+        Args:
+            list_id: ID of the contact list
+            timezones: Dict of phone number -> IANA zone name (None clears the override)
+        
+        Returns:
+            Number of contacts updated
+        """
+        for phone, zone in timezones.items():
+            if zone is not None and not is_valid_timezone(zone):
+                raise ValueError(f"Unknown time zone '{zone}' for {phone}")
+        return self.job_store.set_contact_timezones(list_id, timezones)
+    
+    def create_contact_list(self, phone_numbers, name=None):
+        """
+        Store a contact list for reuse across jobs
+        
+        Args:
+            phone_numbers: List of normalized phone numbers
+            name: Optional list name
+        
+        Returns:
+            list_id: ID of the created list
+        """
+        if not phone_numbers:
+            raise ValueError("No phone numbers provided")
+        return self.job_store.create_contact_list(phone_numbers, name)
+    
+    def combine_contact_lists(self, operation, list_ids, name=None):
+        """
+        Create a contact list from union/intersect/minus of existing lists
+        
+        Args:
+            operation: 'union', 'intersect' or 'minus'
+            list_ids: IDs of the source lists
+            name: Optional list name
+        
+        Returns:
+            list_id: ID of the created list
+        """
+        for list_id in list_ids:
+            if not self.job_store.get_contact_list(list_id):
+                raise ValueError(f"Contact list {list_id} not found")
+        return self.job_store.combine_contact_lists(operation, list_ids, name)
+    
+    def get_contact_list(self, list_id):
+        """
+        Get contact list metadata
+        
+        Args:
+            list_id: ID of the contact list
+        
+        Returns:
+            Contact list dict, or None if not found
+        """
+        return self.job_store.get_contact_list(list_id)
+    
+    def get_contact_lists(self):
+        """
+        Get all stored contact lists
+        
+        Returns:
+            List of contact list dictionaries
+        """
+        return self.job_store.get_contact_lists()
+    
+    def get_contact_list_numbers(self, list_id, limit=None):
+        """
+        Get the phone numbers in a contact list
+        
+        Args:
+            list_id: ID of the contact list
+            limit: Optional maximum number of numbers to return
+        
+        Returns:
+            List of phone numbers
+        """
+        return self.job_store.get_contact_list_numbers(list_id, limit)
+    
+    def delete_contact_list(self, list_id):
+        """
+        Delete a stored contact list
+        
+        Args:
+            list_id: ID of the contact list
+        
+        Returns:
+            True if the list existed
+        """
+        return self.job_store.delete_contact_list(list_id)
+    
     def dequeue_next_message(self, job_id=None):
         """
         Get the next pending message from the queue (FIFO)
@@ -78,6 +339,245 @@ class QueueManager:
         """
         return self.job_store.get_next_pending_message(job_id)
     
+    def claim_next_message(self, account_id, job_id=None):
+        """
+        Atomically claim the next pending message for a worker account
+        
+        Args:
+            account_id: ID of the claiming account
+            job_id: Optional job ID to filter by
+        
+        Returns:
+            Message dict, or None if no pending messages
+        """
+        return self.job_store.claim_next_message(account_id, job_id)
+    
+    def release_message(self, message_id, account_id):
+        """
+        Return a claimed message to the queue (no attempt is counted)
+        
+        Args:
+            message_id: ID of the message
+            account_id: Account holding the claim
+        
+        Returns:
+            True if the claim was still held by the account
+        """
+        return self.job_store.release_message(message_id, account_id)
+    
+    def release_claims(self, account_id=None, older_than_seconds=None):
+        """
+        Return claimed messages to the queue
+        With older_than_seconds this is the lease sweep: claims and send
+        intents older than that whose account has no live worker are
+        recovered - claims go back to the queue, sends are failed as
+        delivery unknown (see recover_interrupted_sends)
+        
+        Args:
+            account_id: Only release claims held by this account (optional)
+            older_than_seconds: Only release claims older than this whose
+                account has no live worker (optional)
+        
+        Returns:
+            Number of messages released
+        """
+        if older_than_seconds is not None:
+            self.job_store.recover_interrupted_sends(account_id, older_than_seconds)
+        return self.job_store.release_claims(account_id, older_than_seconds)
+    
+    def mark_sending(self, message_id, account_id):
+        """
+        Record the intent to send a claimed message
+        
+        Args:
+            message_id: ID of the message
+            account_id: Account holding the claim
+        
+        Returns:
+            True if the claim was still held (safe to press ENTER)
+        """
+        return self.job_store.mark_message_sending(message_id, account_id)
+    
+    def get_interrupted_sends(self, account_id):
+        """
+        Get the sends an account left ambiguous (see JobStore.get_interrupted_sends)
+        
+        Args:
+            account_id: ID of the account
+        
+        Returns:
+            List of interrupted send dicts
+        """
+        return self.job_store.get_interrupted_sends(account_id)
+    
+    def resolve_interrupted_send(self, message_id, account_id, delivered):
+        """
+        Resolve one ambiguous send
+        
+        Args:
+            message_id: ID of the message
+            account_id: Account that left it mid-send
+            delivered: True (sent), False (queue again) or None (unknown -
+                failed without a re-send)
+        
+        Returns:
+            True if the message was resolved
+        """
+        return self.job_store.resolve_interrupted_send(message_id, account_id, delivered)
+    
+    def recover_interrupted_sends(self, account_id, verify=None):
+        """
+        Resolve messages an account left mid-send without re-sending them blindly
+        
+        Args:
+            account_id: ID of the account
+            verify: Optional callable(send) -> True/False/None checking the
+                chat for an interrupted send; without it every interrupted
+                send is failed as delivery unknown
+        
+        Returns:
+            Number of messages resolved
+        """
+        self.job_store.prune_send_journal()
+        if verify is None:
+            return self.job_store.recover_interrupted_sends(account_id)
+        
+        outcomes = {True: 0, False: 0, None: 0}
+        for send in self.job_store.get_interrupted_sends(account_id):
+            try:
+                delivered = verify(send)
+            except Exception as e:
+                logger.error(f"Could not verify interrupted send {send['message_id']}: {str(e)}")
+                delivered = None
+            if self.resolve_interrupted_send(send['message_id'], account_id, delivered):
+                outcomes[delivered] += 1
+        
+        resolved = sum(outcomes.values())
+        if resolved:
+            logger.warning(
+                f"Account {account_id} recovered {resolved} interrupted sends: "
+                f"{outcomes[True]} delivered, {outcomes[False]} queued again, {outcomes[None]} unknown"
+            )
+        return resolved
+    
+    def save_pacing_state(self, account_id, state):
+        """
+        Checkpoint an account's pacing state
+        
+        Args:
+            account_id: ID of the account
+            state: Dict from DelayGenerator.get_state()
+        """
+        self.job_store.save_pacing_state(account_id, state)
+    
+    def record_pacing_decision(self, account_id, job_id, decision, state):
+        """
+        Audit an adaptive pacing decision and checkpoint pacing state
+        
+        Args:
+            account_id: ID of the account
+            job_id: Job whose send produced the decision
+            decision: Decision dict from AdaptivePacer.record()
+            state: Dict from DelayGenerator.get_state()
+        """
+        self.job_store.record_pacing_decision(account_id, job_id, decision, state)
+    
+    def get_pacing_decisions(self, account_id=None, limit=100):
+        """
+        Get the most recent adaptive pacing decisions
+        
+        Args:
+            account_id: Only decisions of this account (optional)
+            limit: Maximum number of decisions
+        
+        Returns:
+            List of decision dictionaries, newest first
+        """
+        return self.job_store.get_pacing_decisions(account_id, limit)
+    
+    def get_settings_version(self):
+        """
+        Get the runtime settings version (changes with every settings update)
+        
+        Returns:
+            Version number
+        """
+        return self.job_store.get_settings_version()
+    
+    def get_runtime_settings(self):
+        """
+        Get the stored runtime setting overrides
+        
+        Returns:
+            Dict with version and overrides
+        """
+        return self.job_store.get_runtime_settings()
+    
+    def get_settings(self):
+        """
+        Get the runtime settings as workers see them
+        
+        Returns:
+            Dict with version, settings (values in effect), overrides and defaults
+        """
+        stored = self.job_store.get_runtime_settings()
+        return {
+            'version': stored['version'],
+            'settings': dict(SETTING_DEFAULTS, **stored['overrides']),
+            'overrides': stored['overrides'],
+            'defaults': SETTING_DEFAULTS,
+        }
+    
+    def update_settings(self, updates, changed_by=None):
+        """
+        Change runtime settings (workers pick them up within SETTINGS_REFRESH_INTERVAL)
+        
+        Args:
+            updates: Dict of setting name -> value (None = back to default)
+            changed_by: Who made the change (recorded in the audit)
+        
+        Returns:
+            Dict from get_settings() plus the names that changed
+        
+        Raises:
+            ValueError: If a setting is unknown or its value invalid
+        """
+        updates = validate_settings(updates, self.job_store.get_runtime_settings()['overrides'])
+        changed = self.job_store.update_runtime_settings(updates, changed_by)
+        settings = self.get_settings()
+        # This process (e.g. the API, which fails messages for remote workers) too
+        apply_settings(settings['overrides'])
+        if changed:
+            logger.info(f"Runtime settings v{settings['version']} by {changed_by or 'unknown'}: "
+                        + ", ".join(f"{name}={settings['settings'][name]}" for name in changed))
+        settings['changed'] = changed
+        return settings
+    
+    def get_settings_audit(self, name=None, limit=100):
+        """
+        Get the most recent runtime settings changes
+        
+        Args:
+            name: Only changes of this setting (optional)
+            limit: Maximum number of entries
+        
+        Returns:
+            List of audit dictionaries, newest first
+        """
+        return self.job_store.get_settings_audit(name, limit)
+    
+    def get_pacing_state(self, account_id):
+        """
+        Get an account's last pacing checkpoint
+        
+        Args:
+            account_id: ID of the account
+        
+        Returns:
+            State dict, or None
+        """
+        return self.job_store.get_pacing_state(account_id)
+    
     def mark_sent(self, message_id):
         """
         Mark a message as successfully sent
@@ -114,15 +614,17 @@ class QueueManager:
             started_at=datetime.now()
         )
     
-    def pause_job(self, job_id):
+    def pause_job(self, job_id, reason=None):
         """
         Pause a running job
         
         Args:
             job_id: ID of the job
+            reason: Optional pause reason (None for a user pause)
         """
-        self.job_store.pause_job(job_id)
-        logger.info(f"Job {job_id} paused")
+        self.job_store.pause_job(job_id, reason)
+        logger.info(f"Job {job_id} paused" + (f" ({reason})" if reason else ""))
+        self.notifier.notify(EVENT_PAUSE, job_id)
     
     def resume_job(self, job_id):
         """
@@ -133,6 +635,7 @@ class QueueManager:
         """
         self.job_store.resume_job(job_id)
         logger.info(f"Job {job_id} resumed")
+        self.notifier.notify(EVENT_RESUME, job_id)
     
     def stop_job(self, job_id):
         """
@@ -143,6 +646,19 @@ class QueueManager:
         """
         self.job_store.stop_job(job_id)
         logger.info(f"Job {job_id} stopped")
+        self.notifier.notify(EVENT_STOP, job_id)
+    
+    def get_paused_jobs(self, reason_prefix):
+        """
+        Get paused jobs whose pause reason starts with a prefix
+        
+        Args:
+            reason_prefix: Pause reason prefix
+        
+        Returns:
+            List of job dictionaries
+        """
+        return self.job_store.get_paused_jobs(reason_prefix)
     
     def get_job_status(self, job_id):
         """
@@ -169,6 +685,475 @@ class QueueManager:
         """
         return self.job_store.get_job_messages(job_id, status)
     
+    def get_throughput_timeseries(self, bucket='hour', job_id=None, since=None, until=None):
+        """
+        Get sent/failed/retried counts per time bucket (served from rollups)
+        
+        Args:
+            bucket: 'minute' or 'hour'
+            job_id: Optional job ID to filter by
+            since: Optional inclusive lower bound (UTC timestamp string)
+            until: Optional exclusive upper bound (UTC timestamp string)
+        
+        Returns:
+            List of bucket dictionaries
+        """
+        return self.job_store.get_rollup_timeseries(bucket, job_id, since, until)
+    
+    def get_failure_timeseries(self, bucket='hour', job_id=None, since=None, until=None):
+        """
+        Get failure counts per time bucket and error class (served from rollups)
+        
+        Args:
+            bucket: 'minute' or 'hour'
+            job_id: Optional job ID to filter by
+            since: Optional inclusive lower bound (UTC timestamp string)
+            until: Optional exclusive upper bound (UTC timestamp string)
+        
+        Returns:
+            List of bucket dictionaries
+        """
+        return self.job_store.get_rollup_errors(bucket, job_id, since, until)
+    
+    def get_forecast_inputs(self, job_id):
+        """
+        Collect a job's live state for an ETA forecast (see worker.simulator.forecast_job)
+        Observed rates come from the minute rollups of the last
+        FORECAST_WINDOW_MINUTES, excluding the minute still being filled, over
+        the time elapsed since the first of them (not just the busy minutes)
+        
+        Args:
+            job_id: ID of the job
+        
+        Returns:
+            Dict with job, backlog, observed, accounts and share, or None if the job doesn't exist
+        """
+        job = self.job_store.get_job_status(job_id)
+        if not job:
+            return None
+        
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        since = (now - timedelta(minutes=config.FORECAST_WINDOW_MINUTES)).strftime(SQLITE_UTC_FORMAT)
+        until = now.strftime(SQLITE_UTC_FORMAT)
+        series = self.job_store.get_rollup_timeseries('minute', job_id, since, until)
+        errors = self.job_store.get_rollup_errors('minute', job_id, since, until)
+        
+        failures = sum(b['failed_count'] + b['retry_count'] for b in series)
+        observed = {
+            'attempts': sum(b['sent_count'] for b in series) + failures,
+            'failures': failures,
+            'throttled': sum(e['failed_count'] + e['retry_count'] for e in errors
+                             if e['error_class'] == ERROR_CLASS_THROTTLED),
+            'minutes': 0,
+        }
+        if series:
+            # Elapsed time since the first observed minute, idle minutes included -
+            # quiet hours, pauses and logins slow the observed rate as they should
+            first = datetime.strptime(series[0]['bucket_start'], SQLITE_UTC_FORMAT).replace(tzinfo=timezone.utc)
+            observed['minutes'] = round((now - first).total_seconds() / 60)
+        
+        accounts = sum(1 for account in self.job_store.get_accounts()
+                       if account['status'] == config.ACCOUNT_STATUS_ACTIVE)
+        
+        return {
+            'job': job,
+            'backlog': self.job_store.get_job_backlog(job_id),
+            'observed': observed,
+            'accounts': accounts,
+            'share': self.job_store.get_job_share(job_id),
+        }
+    
+    def lease_register(self, account_id, profile_dir=None, pid=None):
+        """
+        Register a remote worker and release the claims its previous run left behind
+        Interrupted sends are kept for the worker to check against the chat
+        once logged in (see lease_interrupted / lease_resolve)
+        
+        Args:
+            account_id: ID of the account
+            profile_dir: Chrome profile directory on the worker host
+            pid: Process ID on the worker host
+        
+        Returns:
+            Dict with the account's pacing_state checkpoint and settings_version
+        """
+        self.job_store.register_account(account_id, profile_dir, pid)
+        self.job_store.release_claims(account_id=account_id)
+        return {
+            'account_id': account_id,
+            'pacing_state': self.job_store.get_pacing_state(account_id),
+            'settings_version': self.job_store.get_settings_version(),
+        }
+    
+    def lease_interrupted(self, account_id):
+        """
+        Get the sends a remote worker's previous run left ambiguous
+        
+        Args:
+            account_id: ID of the account
+        
+        Returns:
+            List of interrupted send dicts (server attachment paths removed)
+        """
+        self.job_store.prune_send_journal()
+        sends = self.job_store.get_interrupted_sends(account_id)
+        for send in sends:
+            send.pop('attachment_path', None)
+        return sends
+    
+    def lease_resolve(self, account_id, resolutions=None):
+        """
+        Resolve a remote worker's interrupted sends after it checked its chats
+        
+        Args:
+            account_id: ID of the account
+            resolutions: List of {message_id, delivered} dicts (delivered
+                True/False/None); None fails them all as delivery unknown
+        
+        Returns:
+            Number of messages resolved
+        """
+        if resolutions is None:
+            return self.job_store.recover_interrupted_sends(account_id)
+        
+        resolved = 0
+        for resolution in resolutions:
+            delivered = resolution.get('delivered')
+            if delivered not in (True, False, None):
+                raise ValueError("delivered must be true, false or null")
+            if self.job_store.resolve_interrupted_send(int(resolution['message_id']), account_id, delivered):
+                resolved += 1
+        return resolved
+    
+    def lease_claim(self, account_id, limit=1):
+        """
+        Claim a batch of messages for a remote worker
+        Stale workers and expired leases are reaped first; pending jobs of
+        claimed messages are started here, as the remote worker cannot do it itself
+        
+        Args:
+            account_id: ID of the claiming account
+            limit: Messages to claim (capped at LEASE_CLAIM_MAX)
+        
+        Returns:
+            Dict with messages, jobs (job_id -> job row) and top_priority
+        """
+        limit = max(1, min(int(limit), config.LEASE_CLAIM_MAX))
+        self.reap_stale_workers()
+        self.release_claims(older_than_seconds=config.CLAIM_LEASE_SECONDS)
+        
+        messages = []
+        for _ in range(limit):
+            message = self.job_store.claim_next_message(account_id)
+            if not message:
+                break
+            messages.append(message)
+        
+        jobs = {}
+        for job_id in {message['job_id'] for message in messages}:
+            job = self.job_store.get_job_status(job_id)
+            if job and job['status'] == config.JOB_STATUS_PENDING:
+                self.start_job(job_id)
+                job = self.job_store.get_job_status(job_id)
+            jobs[job_id] = job
+        
+        return {
+            'messages': messages,
+            'jobs': jobs,
+            'top_priority': self.job_store.get_top_pending_priority(account_id),
+        }
+    
+    def lease_heartbeat(self, account_id, message_ids=None, status=None, circuit=None,
+                        metrics=None, pacing_state=None, worker=None):
+        """
+        Renew a remote worker's leases and store its account state
+        
+        Args:
+            account_id: ID of the account
+            message_ids: Message IDs the worker holds
+            status: Optional new account status (ACCOUNT_STATUS_*)
+            circuit: Optional {'state', 'reason'} circuit breaker change
+            metrics: Optional browser sample (see record_browser_metrics)
+            pacing_state: Optional pacing checkpoint
+            worker: Optional registry heartbeat {'worker_id', 'current_job_id',
+                'host', 'pid'}; 'status': 'stopped' deregisters the worker
+        
+        Returns:
+            Dict with held message IDs, jobs (job_id -> job row) of held
+            messages, top_priority and settings_version
+        """
+        held = self.job_store.renew_claims(account_id, [int(m) for m in message_ids or []])
+        if status:
+            self.job_store.update_account_status(account_id, status)
+        if circuit:
+            self.update_account_circuit(account_id, circuit['state'], circuit.get('reason'))
+        if metrics:
+            self.record_browser_metrics(account_id, metrics)
+        if pacing_state is not None:
+            self.job_store.save_pacing_state(account_id, pacing_state)
+        if worker:
+            if worker.get('status') == config.WORKER_STATUS_STOPPED:
+                self.deregister_worker(worker['worker_id'])
+            else:
+                self.worker_heartbeat(
+                    worker['worker_id'], account_id, current_job_id=worker.get('current_job_id'),
+                    host=worker.get('host'), pid=worker.get('pid')
+                )
+            self.reap_stale_workers()
+        
+        jobs = {}
+        for job_id in {message['job_id'] for message in held}:
+            jobs[job_id] = self.job_store.get_job_status(job_id)
+        
+        return {
+            'held': [message['message_id'] for message in held],
+            'jobs': jobs,
+            'top_priority': self.job_store.get_top_pending_priority(account_id),
+            'settings_version': self.job_store.get_settings_version(),
+        }
+    
+    def lease_report(self, account_id, results=None, pacing_decisions=None, release_all=False):
+        """
+        Apply a batch of results from a remote worker
+        Results for messages the account no longer holds are rejected, so a
+        worker whose lease expired cannot overwrite another worker's outcome
+        
+        Args:
+            account_id: ID of the account
+            results: List of {'message_id', 'outcome', 'error_message'} with
+                outcome one of LEASE_OUTCOMES ('sending' records the send intent)
+            pacing_decisions: List of {'job_id', 'decision', 'state'} to audit
+            release_all: Return every claim the account still holds to the queue
+        
+        Returns:
+            Dict with results: [{'message_id', 'ok', 'retry_count'}]
+        
+        Raises:
+            ValueError: If a result is malformed
+        """
+        results = results or []
+        for result in results:
+            if result.get('outcome') not in LEASE_OUTCOMES or result.get('message_id') is None:
+                raise ValueError(f"Invalid result {result} - outcome must be one of {', '.join(LEASE_OUTCOMES)}")
+        for entry in pacing_decisions or []:
+            if not isinstance(entry.get('decision'), dict):
+                raise ValueError(f"Invalid pacing decision {entry}")
+        
+        held = {message['message_id'] for message in self.job_store.get_held_messages(
+            account_id, [int(result['message_id']) for result in results]
+        )}
+        
+        applied = []
+        for result in results:
+            message_id = int(result['message_id'])
+            outcome = result['outcome']
+            entry = {'message_id': message_id, 'ok': True, 'retry_count': None}
+            if outcome == config.MESSAGE_STATUS_SENDING:
+                entry['ok'] = self.job_store.mark_message_sending(message_id, account_id)
+            elif message_id not in held:
+                entry['ok'] = False
+            elif outcome == config.MESSAGE_STATUS_SENT:
+                self.job_store.mark_message_sent(message_id)
+            elif outcome == config.MESSAGE_STATUS_FAILED:
+                entry['retry_count'] = self.mark_failed(message_id, result.get('error_message'))
+            else:
+                self.job_store.release_message(message_id, account_id)
+            applied.append(entry)
+        
+        for entry in pacing_decisions or []:
+            self.job_store.record_pacing_decision(
+                account_id, entry.get('job_id'), entry['decision'], entry.get('state')
+            )
+        
+        if release_all:
+            self.job_store.release_claims(account_id=account_id)
+        
+        return {'results': applied}
+    
+    def register_account(self, account_id, profile_dir=None, pid=None):
+        """
+        Register a worker account in the pool
+        
+        Args:
+            account_id: ID of the account
+            profile_dir: Chrome profile directory
+            pid: Worker process ID
+        """
+        self.job_store.register_account(account_id, profile_dir, pid)
+    
+    def update_account_status(self, account_id, status):
+        """
+        Update account health status
+        
+        Args:
+            account_id: ID of the account
+            status: New status
+        """
+        self.job_store.update_account_status(account_id, status)
+    
+    def record_browser_metrics(self, account_id, sample):
+        """
+        Store the latest browser resource sample of an account
+        
+        Args:
+            account_id: ID of the account
+            sample: Dict from BrowserWatchdog.sample()
+        """
+        self.job_store.record_browser_metrics(
+            account_id, sample['rss_mb'], sample['cpu_percent'], sample['process_count']
+        )
+    
+    def update_account_circuit(self, account_id, state, reason=None):
+        """
+        Record an account's circuit breaker state and pause or resume jobs for it
+        
+        An open circuit only stops its own account, which routing skips, so
+        jobs keep running on the other accounts. Running jobs are paused
+        (pause_reason "circuit_open:<account>: <class>") only when no other
+        account can send. Half-open resumes one of those jobs for the probe
+        send; closing the circuit resumes the rest.
+        
+        Args:
+            account_id: ID of the account
+            state: CIRCUIT_* state
+            reason: Error class that tripped the circuit (optional)
+        
+        Returns:
+            IDs of the jobs paused or resumed
+        """
+        self.job_store.update_account_circuit(account_id, state, reason)
+        
+        if state == config.CIRCUIT_OPEN:
+            if self.job_store.has_other_sending_account(account_id):
+                return []
+            paused = []
+            for job in self.job_store.get_active_jobs():
+                if job['status'] == config.JOB_STATUS_RUNNING:
+                    self.pause_job(job['job_id'], reason=f"{self.circuit_pause_prefix(account_id)} {reason}")
+                    paused.append(job['job_id'])
+            return paused
+        
+        jobs = self.job_store.get_paused_jobs(self.circuit_pause_prefix(account_id))
+        if state == config.CIRCUIT_HALF_OPEN:
+            jobs = jobs[:1]
+        for job in jobs:
+            self.resume_job(job['job_id'])
+        return [job['job_id'] for job in jobs]
+    
+    @staticmethod
+    def circuit_pause_prefix(account_id):
+        """
+        Get the pause reason prefix of jobs an account's circuit breaker paused
+        
+        Args:
+            account_id: ID of the account
+        
+        Returns:
+            Prefix string
+        """
+        return f"{config.CIRCUIT_PAUSE_REASON}:{account_id}:"
+    
+    def set_account_daily_cap(self, account_id, cap):
+        """
+        Set an account's daily send cap
+        Routing moves the account's queued recipients to other accounts once
+        the cap is reached, and back on the next (UTC) day
+        
+        Args:
+            account_id: ID of the account
+            cap: Sends per day (0 = unlimited, None = ACCOUNT_DAILY_CAP default)
+        
+        Returns:
+            True if the account exists
+        
+        Raises:
+            ValueError: If the cap is negative
+        """
+        if cap is not None:
+            cap = int(cap)
+            if cap < 0:
+                raise ValueError("daily_cap must be 0 (unlimited) or positive")
+        return self.job_store.set_account_daily_cap(account_id, cap)
+    
+    def get_accounts(self):
+        """
+        Get all worker accounts with health, throughput and routing
+        
+        Returns:
+            List of account dictionaries
+        """
+        return self.job_store.get_accounts()
+    
+    def worker_heartbeat(self, worker_id, account_id, current_job_id=None, host=None, pid=None):
+        """
+        Heartbeat a worker into the registry (the first heartbeat registers it)
+        
+        Args:
+            worker_id: Unique worker ID
+            account_id: Account the worker sends as
+            current_job_id: Job the worker is sending for (optional)
+            host: Host name the worker runs on
+            pid: Process ID on that host
+        """
+        previous = self.job_store.heartbeat_worker(worker_id, current_job_id)
+        if previous is None:
+            self.job_store.register_worker(worker_id, account_id, host=host, pid=pid)
+            self.job_store.heartbeat_worker(worker_id, current_job_id)
+            logger.info(f"Worker {worker_id} registered")
+        elif previous == config.WORKER_STATUS_STALE:
+            logger.warning(f"Worker {worker_id} is heartbeating again after being declared stale - "
+                           f"its claims were reassigned")
+            # Reaping stopped the account - route work to it again
+            self.job_store.update_account_status(account_id, config.ACCOUNT_STATUS_ACTIVE)
+    
+    def deregister_worker(self, worker_id):
+        """
+        Mark a worker as cleanly stopped
+        
+        Args:
+            worker_id: ID of the worker
+        """
+        self.job_store.deregister_worker(worker_id)
+    
+    def reap_stale_workers(self, stale_after_seconds=None):
+        """
+        Fail over workers that stopped heartbeating
+        Their claims go back to the queue for other workers, and sends they
+        were in the middle of are resolved without re-sending (see
+        recover_interrupted_sends) - without waiting for CLAIM_LEASE_SECONDS
+        
+        Args:
+            stale_after_seconds: Heartbeat age after which a worker is stale
+                (default WORKER_STALE_AFTER)
+        
+        Returns:
+            List of reaped worker dicts with released and resolved counts
+        """
+        stale = self.job_store.mark_stale_workers(stale_after_seconds or config.WORKER_STALE_AFTER)
+        for worker in stale:
+            worker['released'] = worker['resolved'] = 0
+            if worker.pop('orphaned'):
+                account_id = worker['account_id']
+                worker['resolved'] = self.job_store.recover_interrupted_sends(account_id)
+                worker['released'] = self.job_store.release_claims(account_id=account_id)
+                self.job_store.update_account_status(account_id, config.ACCOUNT_STATUS_STOPPED)
+                # Jobs its circuit breaker paused would otherwise wait for it forever
+                self.update_account_circuit(account_id, config.CIRCUIT_CLOSED)
+            logger.warning(
+                f"Worker {worker['worker_id']} missed its heartbeats (last {worker['heartbeat_at']}) - "
+                f"{worker['released']} claims reassigned, {worker['resolved']} interrupted sends resolved"
+            )
+        return stale
+    
+    def get_workers(self):
+        """
+        Get the worker registry (fleet view)
+        
+        Returns:
+            List of worker dictionaries
+        """
+        return self.job_store.get_workers()
+    
     def get_active_jobs(self):
         """
         Get all active jobs
@@ -0,0 +1,152 @@
+"""
+Account routing
+Assigns recipients to WhatsApp accounts with consistent hashing, so a number
+keeps hearing from the same account while that account is healthy and under
+its daily cap
+"""
+
+import bisect
+import hashlib
+from functools import lru_cache
+import config
+
+# Recipient hashes and ring points live in [0, RING_SIZE)
+RING_SIZE = 2 ** 32
+
+def route_hash(phone_number):
+    """
+    Get a recipient's position on the hash ring
+
+    Args:
+        phone_number: Normalized phone number
+
+    Returns:
+        Integer in [0, RING_SIZE)
+    """
+    return int.from_bytes(hashlib.md5(str(phone_number).encode('utf-8')).digest()[:4], 'big')
+
+def daily_cap(account):
+    """
+    Get an account's daily send cap
+
+    Args:
+        account: Account dict with daily_cap (None = configured default)
+
+    Returns:
+        Cap, or 0 for unlimited
+    """
+    if account.get('daily_cap') is not None:
+        return account['daily_cap']
+    return config.ACCOUNT_DAILY_CAPS.get(account['account_id'], config.ACCOUNT_DAILY_CAP)
+
+def is_capped(account, in_flight=0):
+    """
+    Check whether an account has reached its daily cap
+
+    Args:
+        account: Account dict with daily_cap and sent_today
+        in_flight: Messages the account holds claimed but not yet sent
+
+    Returns:
+        True if no more sends are allowed today
+    """
+    cap = daily_cap(account)
+    return cap > 0 and (account.get('sent_today') or 0) + in_flight >= cap
+
+def is_routable(account):
+    """
+    Check whether new recipients may be routed to an account
+    Only logged-in (active) accounts are on the ring - not starting, waiting
+    for login or stopped ones - and open circuits and reached caps are
+    skipped; a half-open circuit is routable so its probe has work
+
+    Args:
+        account: Account dict (status, circuit_state, daily_cap, sent_today)
+
+    Returns:
+        True if the account takes its share of the ring
+    """
+    return (account['status'] == config.ACCOUNT_STATUS_ACTIVE and
+            account.get('circuit_state') != config.CIRCUIT_OPEN and
+            not is_capped(account))
+
+@lru_cache(maxsize=32)
+def _ring(accounts, virtual_nodes):
+    """
+    Build the sorted ring points of a set of accounts
+
+    Returns:
+        (points, owners) - parallel tuples sorted by point
+    """
+    nodes = sorted(
+        (route_hash(f"{account}#{index}"), account)
+        for account in accounts
+        for index in range(virtual_nodes)
+    )
+    return tuple(point for point, _ in nodes), tuple(account for _, account in nodes)
+
+class AccountRouter:
+    """
+    Consistent-hash ring over the routable accounts
+
+    Each account owns ROUTING_VIRTUAL_NODES points; a recipient belongs to the
+    first point at or after its hash. Removing an account only moves the
+    recipients it owned, adding one only takes recipients from its neighbours,
+    so everyone else keeps their account.
+    """
+
+    def __init__(self, accounts, virtual_nodes=None):
+        """
+        Initialize router
+
+        Args:
+            accounts: Routable account IDs
+            virtual_nodes: Ring points per account (default from config)
+        """
+        self.accounts = tuple(sorted(set(accounts)))
+        self.virtual_nodes = virtual_nodes or config.ROUTING_VIRTUAL_NODES
+        self.points, self.owners = _ring(self.accounts, self.virtual_nodes)
+
+    def route(self, phone_number):
+        """
+        Get the account a recipient is routed to
+
+        Args:
+            phone_number: Normalized phone number
+
+        Returns:
+            Account ID, or None if no account is routable
+        """
+        if not self.points:
+            return None
+        index = bisect.bisect_left(self.points, route_hash(phone_number))
+        return self.owners[index % len(self.points)]
+
+    def segments(self):
+        """
+        Get the ring as hash ranges, merged where neighbours share an account
+        Lets a rebalance run one indexed range UPDATE per segment instead of
+        hashing every queued message again
+
+        Returns:
+            List of (low, high, account_id), inclusive bounds covering the ring
+        """
+        if not self.points:
+            return []
+
+        segments = []
+        low = 0
+        for point, account in zip(self.points, self.owners):
+            if segments and segments[-1][2] == account:
+                segments[-1] = (segments[-1][0], point, account)
+            elif point >= low:
+                segments.append((low, point, account))
+            low = point + 1
+
+        # Hashes after the last point wrap around to the first owner
+        if low < RING_SIZE:
+            if segments[-1][2] == self.owners[0]:
+                segments[-1] = (segments[-1][0], RING_SIZE - 1, self.owners[0])
+            else:
+                segments.append((low, RING_SIZE - 1, self.owners[0]))
+        return segments
@@ -6,21 +6,56 @@ Run this independently from Flask to process the message queue
 Usage:
     python run_worker.py
     python run_worker.py --db-path custom_path.db
+    python run_worker.py --account sales --profile-dir ./chrome_profiles/sales
+    python run_worker.py --pool 3
+    python run_worker.py --async
+    python run_worker.py --remote http://queue-host:8080 --api-key KEY --account sales
 """
 
-from worker.worker import Worker
+import argparse
 from utils.logger import logger
+import config
 import sys
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='WhatsApp Bulk Sender Worker')
+    parser.add_argument('--db-path', type=str, help='Path to SQLite database', default=None)
+    parser.add_argument('--account', type=str, help='Account ID this worker sends as', default=None)
+    parser.add_argument('--profile-dir', type=str, help='Chrome profile directory', default=None)
+    parser.add_argument('--pool', type=int, default=None,
+                        help='Run a pool of N workers, one WhatsApp account each '
+                             f'(default: {config.WORKER_POOL_SIZE})')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Use the asyncio runtime (background duties run as tasks beside sending)')
+    parser.add_argument('--remote', type=str, default=None, metavar='URL',
+                        help='Claim work from this API over HTTP instead of a local database')
+    parser.add_argument('--api-key', type=str, default=None,
+                        help='API key for --remote (default: config.API_KEY)')
+    args = parser.parse_args()
+    
     logger.info("Starting WhatsApp Bulk Sender Worker...")
     logger.info("Press Ctrl+C to stop the worker")
     logger.info("-" * 60)
     
-    worker = Worker()
+    pool_size = args.pool or config.WORKER_POOL_SIZE
     
     try:
-        worker.start()
+        if pool_size > 1:
+            from worker.pool import WorkerPool
+            WorkerPool(
+                size=pool_size, db_path=args.db_path, use_async=args.use_async,
+                remote_url=args.remote, api_key=args.api_key
+            ).start()
+        elif args.remote:
+            from worker.remote import run_remote_worker
+            run_remote_worker(args.remote, args.api_key, args.account, args.profile_dir, args.use_async)
+        else:
+            if args.use_async:
+                from worker.async_worker import AsyncWorker as Worker
+            else:
+                from worker.worker import Worker
+            worker = Worker(db_path=args.db_path, account_id=args.account, profile_dir=args.profile_dir)
+            worker.start()
     except KeyboardInterrupt:
         logger.info("\nWorker stopped by user")
         sys.exit(0)
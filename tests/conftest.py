@@ -0,0 +1,17 @@
+"""
+Shared pytest fixtures
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def queue_manager(tmp_path):
+    """QueueManager on a fresh SQLite database"""
+    from message_queue.queue_manager import QueueManager
+    return QueueManager(str(tmp_path / 'queue.db'))
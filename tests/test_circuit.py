@@ -0,0 +1,72 @@
+import sqlite3
+
+import config
+from utils.error_classifier import ERROR_CLASS_OTHER, ERROR_CLASS_TIMEOUT
+from worker.circuit_breaker import CircuitBreaker
+
+
+def _start(queue_manager, accounts, jobs=1):
+    for account_id in accounts:
+        queue_manager.register_account(account_id)
+        queue_manager.update_account_status(account_id, config.ACCOUNT_STATUS_ACTIVE)
+        queue_manager.worker_heartbeat(f'{account_id}@host:1', account_id)
+    job_ids = [queue_manager.enqueue_job([f'+1415555000{i}'], 'hello') for i in range(jobs)]
+    for job_id in job_ids:
+        queue_manager.update_job_status(job_id, config.JOB_STATUS_RUNNING)
+    return job_ids
+
+
+def _status(queue_manager, job_id):
+    return queue_manager.get_job_status(job_id)['status']
+
+
+def test_unclassified_errors_do_not_trip():
+    breaker = CircuitBreaker(window_seconds=60, min_samples=3, failure_ratio=0.5)
+    for _ in range(5):
+        assert breaker.record(ERROR_CLASS_OTHER) is None
+    assert breaker.state == config.CIRCUIT_CLOSED
+
+
+def test_systemic_errors_trip():
+    breaker = CircuitBreaker(window_seconds=60, min_samples=3, failure_ratio=0.5)
+    states = [breaker.record(ERROR_CLASS_TIMEOUT) for _ in range(3)]
+    assert states[-1] == config.CIRCUIT_OPEN
+
+
+def test_open_circuit_keeps_jobs_running_while_another_account_sends(queue_manager):
+    job_id, = _start(queue_manager, ['a', 'b'])
+
+    assert queue_manager.update_account_circuit('a', config.CIRCUIT_OPEN, ERROR_CLASS_TIMEOUT) == []
+    assert _status(queue_manager, job_id) == config.JOB_STATUS_RUNNING
+
+
+def test_half_open_resumes_one_job_and_close_the_rest(queue_manager):
+    job_ids = _start(queue_manager, ['a'], jobs=3)
+
+    assert sorted(queue_manager.update_account_circuit('a', config.CIRCUIT_OPEN, ERROR_CLASS_TIMEOUT)) == job_ids
+    assert all(_status(queue_manager, job_id) == config.JOB_STATUS_PAUSED for job_id in job_ids)
+
+    assert queue_manager.update_account_circuit('a', config.CIRCUIT_HALF_OPEN) == job_ids[:1]
+    assert [_status(queue_manager, job_id) for job_id in job_ids].count(config.JOB_STATUS_RUNNING) == 1
+
+    assert queue_manager.update_account_circuit('a', config.CIRCUIT_CLOSED) == job_ids[1:]
+    assert all(_status(queue_manager, job_id) == config.JOB_STATUS_RUNNING for job_id in job_ids)
+
+
+def test_other_account_does_not_resume_foreign_pauses(queue_manager):
+    job_id, = _start(queue_manager, ['a'])
+    queue_manager.update_account_circuit('a', config.CIRCUIT_OPEN, ERROR_CLASS_TIMEOUT)
+
+    assert queue_manager.update_account_circuit('b', config.CIRCUIT_CLOSED) == []
+    assert _status(queue_manager, job_id) == config.JOB_STATUS_PAUSED
+
+
+def test_reaper_resumes_jobs_paused_by_a_dead_worker(queue_manager):
+    job_id, = _start(queue_manager, ['a'])
+    queue_manager.update_account_circuit('a', config.CIRCUIT_OPEN, ERROR_CLASS_TIMEOUT)
+    with sqlite3.connect(queue_manager.job_store.db_path) as conn:
+        conn.execute(f"UPDATE {config.WORKERS_TABLE} SET heartbeat_at = datetime('now', ?)",
+                     (f'-{config.WORKER_STALE_AFTER + 5} seconds',))
+
+    assert queue_manager.reap_stale_workers()
+    assert _status(queue_manager, job_id) == config.JOB_STATUS_RUNNING
@@ -0,0 +1,81 @@
+import sqlite3
+
+import config
+
+
+def _age_claims(db_path, seconds):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"UPDATE {config.QUEUE_TABLE} SET claimed_at = datetime('now', ?)",
+                     (f'-{seconds} seconds',))
+
+
+def _age_heartbeat(db_path, worker_id, seconds):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"UPDATE {config.WORKERS_TABLE} SET heartbeat_at = datetime('now', ?) WHERE worker_id = ?",
+                     (f'-{seconds} seconds', worker_id))
+
+
+def _start(queue_manager, accounts, numbers):
+    for account_id in accounts:
+        queue_manager.register_account(account_id)
+        queue_manager.update_account_status(account_id, config.ACCOUNT_STATUS_ACTIVE)
+    return queue_manager.enqueue_job(numbers, 'hello')
+
+
+def test_expired_claim_of_live_worker_is_kept(queue_manager):
+    _start(queue_manager, ['a'], ['+14155550001'])
+    queue_manager.worker_heartbeat('a@host:1', 'a')
+    assert queue_manager.claim_next_message('a')
+    _age_claims(queue_manager.job_store.db_path, config.CLAIM_LEASE_SECONDS + 60)
+
+    assert queue_manager.release_claims(older_than_seconds=config.CLAIM_LEASE_SECONDS) == 0
+
+
+def test_expired_claim_of_silent_worker_is_released(queue_manager):
+    _start(queue_manager, ['a'], ['+14155550001'])
+    queue_manager.worker_heartbeat('a@host:1', 'a')
+    assert queue_manager.claim_next_message('a')
+    _age_claims(queue_manager.job_store.db_path, config.CLAIM_LEASE_SECONDS + 60)
+    _age_heartbeat(queue_manager.job_store.db_path, 'a@host:1', config.WORKER_STALE_AFTER + 5)
+
+    assert queue_manager.release_claims(older_than_seconds=config.CLAIM_LEASE_SECONDS) == 1
+
+
+def test_fresh_claim_is_kept(queue_manager):
+    _start(queue_manager, ['a'], ['+14155550001'])
+    assert queue_manager.claim_next_message('a')
+
+    assert queue_manager.release_claims(older_than_seconds=config.CLAIM_LEASE_SECONDS) == 0
+
+
+def test_release_message_requires_the_claim_holder(queue_manager):
+    _start(queue_manager, ['a'], ['+14155550001'])
+    message = queue_manager.claim_next_message('a')
+
+    assert not queue_manager.release_message(message['message_id'], 'b')
+    assert queue_manager.release_message(message['message_id'], 'a')
+
+
+def test_sweep_fails_expired_sends_of_dead_accounts(queue_manager):
+    _start(queue_manager, ['a'], ['+14155550001', '+14155550002'])
+    queue_manager.worker_heartbeat('a@host:1', 'a')
+    first = queue_manager.claim_next_message('a')
+    assert queue_manager.mark_sending(first['message_id'], 'a')
+    db_path = queue_manager.job_store.db_path
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"UPDATE {config.QUEUE_TABLE} SET last_attempt_at = datetime('now', '-1 hour')")
+
+    # Live worker - the send may still be in flight
+    queue_manager.release_claims(older_than_seconds=config.CLAIM_LEASE_SECONDS)
+    assert queue_manager.get_interrupted_sends('a')
+
+    _age_heartbeat(db_path, 'a@host:1', config.WORKER_STALE_AFTER + 5)
+    queue_manager.release_claims(older_than_seconds=config.CLAIM_LEASE_SECONDS)
+    assert queue_manager.get_interrupted_sends('a') == []
+    with sqlite3.connect(db_path) as conn:
+        status, = conn.execute(f"SELECT status FROM {config.QUEUE_TABLE} WHERE message_id = ?",
+                               (first['message_id'],)).fetchone()
+        state, = conn.execute(f"SELECT state FROM {config.SEND_JOURNAL_TABLE} WHERE message_id = ?",
+                              (first['message_id'],)).fetchone()
+    assert status == config.MESSAGE_STATUS_FAILED
+    assert state == config.JOURNAL_STATE_UNKNOWN
@@ -0,0 +1,29 @@
+import pytest
+
+from utils.error_classifier import (
+    classify_error, ERROR_CLASS_SESSION, ERROR_CLASS_INVALID_NUMBER, ERROR_CLASS_THROTTLED,
+    ERROR_CLASS_TIMEOUT, ERROR_CLASS_ELEMENT_NOT_FOUND, ERROR_CLASS_FILE_NOT_FOUND, ERROR_CLASS_OTHER,
+)
+
+
+@pytest.mark.parametrize('message, expected', [
+    ("InvalidSessionIdException: invalid session id", ERROR_CLASS_SESSION),
+    ("InvalidSessionIdException: Message: invalid session id: session deleted", ERROR_CLASS_SESSION),
+    ("NoSuchWindowException: no such window: target window already closed", ERROR_CLASS_SESSION),
+    ("WebDriverException: chrome not reachable", ERROR_CLASS_SESSION),
+    ("Phone number shared via url is invalid.", ERROR_CLASS_INVALID_NUMBER),
+    ("Invalid phone number", ERROR_CLASS_INVALID_NUMBER),
+    ("This number is not on WhatsApp", ERROR_CLASS_INVALID_NUMBER),
+    ("TimeoutException: timed out waiting for footer", ERROR_CLASS_TIMEOUT),
+    ("NoSuchElementException: no such element: Unable to locate element", ERROR_CLASS_ELEMENT_NOT_FOUND),
+    ("File not found", ERROR_CLASS_FILE_NOT_FOUND),
+    ("Too many messages - try again later", ERROR_CLASS_THROTTLED),
+    (None, ERROR_CLASS_OTHER),
+    ("Something unexpected", ERROR_CLASS_OTHER),
+])
+def test_classify_error(message, expected):
+    assert classify_error(message) == expected
+
+
+def test_invalid_selector_is_not_an_invalid_number():
+    assert classify_error("InvalidSelectorException: invalid selector: bad xpath") != ERROR_CLASS_INVALID_NUMBER
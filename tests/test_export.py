@@ -0,0 +1,29 @@
+import config
+
+NUMBERS = [f'+1415555{index:04d}' for index in range(25)]
+
+
+def test_chunks_cover_the_job_in_order(queue_manager):
+    job_id = queue_manager.enqueue_job(NUMBERS, 'hello')
+    other_job = queue_manager.enqueue_job(NUMBERS[:3], 'other')
+
+    chunks = list(queue_manager.job_store.iter_job_message_chunks(job_id, ['message_id', 'job_id'], chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    rows = [row for chunk in chunks for row in chunk]
+    assert [row[0] for row in rows] == sorted(row[0] for row in rows)
+    assert {row[1] for row in rows} == {job_id} != {other_job}
+
+
+def test_export_does_not_block_workers(queue_manager):
+    queue_manager.register_account('a')
+    queue_manager.update_account_status('a', config.ACCOUNT_STATUS_ACTIVE)
+    job_id = queue_manager.enqueue_job(NUMBERS, 'hello')
+    chunks = queue_manager.job_store.iter_job_message_chunks(job_id, ['message_id'], chunk_size=10)
+    next(chunks)
+
+    # Mid-export: claims and results must not wait for the export's read
+    message = queue_manager.claim_next_message('a')
+    assert queue_manager.mark_sending(message['message_id'], 'a')
+    queue_manager.mark_sent(message['message_id'])
+
+    assert sum(len(chunk) for chunk in chunks) == 15
@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.mark.parametrize('weight', [0, -1, float('nan'), float('inf')])
+def test_invalid_weight_is_rejected(queue_manager, weight):
+    with pytest.raises(ValueError):
+        queue_manager.enqueue_job(['+14155550001'], 'hello', weight=weight)
+
+
+def test_set_job_weight(queue_manager):
+    job_id = queue_manager.enqueue_job(['+14155550001'], 'hello', weight=2)
+
+    assert queue_manager.set_job_weight(job_id, 0.5)
+    assert queue_manager.get_job_status(job_id)['weight'] == 0.5
+    with pytest.raises(ValueError):
+        queue_manager.set_job_weight(job_id, float('inf'))
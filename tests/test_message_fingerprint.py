@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from utils.message_fingerprint import bubble_times, message_fingerprint, normalize_message_text
+
+
+def test_displayed_text_matches_typed_text():
+    assert normalize_message_text('Hello *World*!\n 👋') == normalize_message_text('hello world')
+    assert message_fingerprint('   ') is None
+
+
+def test_bubble_time_24_hour_day_first():
+    assert bubble_times('[14:05, 19/10/2026] Me: ') == [datetime(2026, 10, 19, 14, 5)]
+
+
+def test_bubble_time_12_hour_month_first():
+    assert bubble_times('[2:05 PM, 10/19/2026] Me: ') == [datetime(2026, 10, 19, 14, 5)]
+    assert bubble_times('[12:30 am, 10/19/26] Me: ') == [datetime(2026, 10, 19, 0, 30)]
+
+
+def test_ambiguous_bubble_date_gives_every_reading():
+    assert bubble_times('[09:00, 03/04/2026] Me: ') == [datetime(2026, 3, 4, 9, 0), datetime(2026, 4, 3, 9, 0)]
+
+
+def test_year_first_bubble_date():
+    assert bubble_times('[09:00, 2026-04-03] Me: ') == [datetime(2026, 4, 3, 9, 0)]
+
+
+def test_unreadable_bubble_header():
+    assert bubble_times(None) == []
+    assert bubble_times('yesterday') == []
@@ -0,0 +1,61 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import config
+from utils.timezones import quiet_until, timezone_for_number
+
+NUMBER = '+442071234567'
+
+
+def _window_around_now(zone_name, hours):
+    local = datetime.now(ZoneInfo(zone_name))
+    return ((local - timedelta(hours=hours)).strftime('%H:%M'),
+            (local + timedelta(hours=hours)).strftime('%H:%M'))
+
+
+def _enqueue(queue_manager, quiet_start, quiet_end):
+    queue_manager.register_account('a')
+    queue_manager.update_account_status('a', config.ACCOUNT_STATUS_ACTIVE)
+    return queue_manager.enqueue_job([NUMBER], 'hello', quiet_start=quiet_start, quiet_end=quiet_end)
+
+
+def test_quiet_until_handles_windows_past_midnight():
+    now = datetime(2026, 1, 15, 23, 30, tzinfo=timezone.utc)
+
+    assert quiet_until('UTC', '21:00', '08:00', now) == '2026-01-16 08:00:00'
+    assert quiet_until('UTC', '08:00', '21:00', now) is None
+
+
+def test_message_in_quiet_hours_is_deferred(queue_manager):
+    zone = timezone_for_number(NUMBER)
+    job_id = _enqueue(queue_manager, *_window_around_now(zone, 1))
+
+    assert queue_manager.claim_next_message('a') is None
+    message, = queue_manager.get_job_messages(job_id)
+    assert message['status'] == config.MESSAGE_STATUS_DEFERRED
+    assert message['not_before']
+
+
+def test_deferred_message_wakes_after_quiet_hours(queue_manager):
+    zone = timezone_for_number(NUMBER)
+    job_id = _enqueue(queue_manager, *_window_around_now(zone, 1))
+    assert queue_manager.claim_next_message('a') is None
+
+    # Quiet hours over: the wake-up time has passed and the window moved on
+    with sqlite3.connect(queue_manager.job_store.db_path) as conn:
+        conn.execute(f"UPDATE {config.QUEUE_TABLE} SET not_before = datetime('now', '-1 minute')")
+        conn.execute(f"UPDATE {config.JOBS_TABLE} SET quiet_start = ?, quiet_end = ? WHERE job_id = ?",
+                     (*_window_around_now(zone, -2), job_id))
+
+    message = queue_manager.claim_next_message('a')
+    assert message and message['job_id'] == job_id
+
+
+def test_message_outside_quiet_hours_is_claimed(queue_manager):
+    zone = timezone_for_number(NUMBER)
+    # A window that ends one hour before now and starts one hour after
+    quiet_end, quiet_start = _window_around_now(zone, 1)
+    _enqueue(queue_manager, quiet_start, quiet_end)
+
+    assert queue_manager.claim_next_message('a')
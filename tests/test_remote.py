@@ -0,0 +1,31 @@
+from worker.remote import RemoteQueueClient, OUTCOME_RELEASED
+
+
+def _client(monkeypatch, messages):
+    client = RemoteQueueClient('http://queue-host:8080', api_key='key')
+    client.account_id = 'a'
+    monkeypatch.setattr(client, '_post_lease', lambda path, payload: {'messages': messages})
+    return client
+
+
+def test_message_with_unavailable_attachment_is_released(monkeypatch):
+    client = _client(monkeypatch, [
+        {'message_id': 1, 'attachment_sha256': 'abc', 'attachment_name': 'a.png'},
+        {'message_id': 2},
+    ])
+
+    def fetch(digest, name=None):
+        raise ConnectionError("download failed")
+    monkeypatch.setattr(client.attachments, 'fetch', fetch)
+
+    message = client.claim_next_message('a')
+    assert message['message_id'] == 2
+    assert 1 not in client._held
+    assert client._results == [{'message_id': 1, 'outcome': OUTCOME_RELEASED, 'error_message': None}]
+
+
+def test_batch_is_handed_out_in_order(monkeypatch):
+    client = _client(monkeypatch, [{'message_id': 1}, {'message_id': 2}])
+
+    assert [client.claim_next_message('a')['message_id'] for _ in range(2)] == [1, 2]
+    assert set(client._held) == {1, 2}
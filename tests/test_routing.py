@@ -0,0 +1,89 @@
+import sqlite3
+
+import config
+from message_queue.router import AccountRouter, is_routable
+
+NUMBERS = [f'+1415555{index:04d}' for index in range(200)]
+
+
+def _account(account_id, status=config.ACCOUNT_STATUS_ACTIVE, **fields):
+    return dict({'account_id': account_id, 'status': status, 'circuit_state': None,
+                 'daily_cap': None, 'sent_today': 0}, **fields)
+
+
+def _activate(queue_manager, accounts):
+    for account_id in accounts:
+        queue_manager.register_account(account_id)
+        queue_manager.update_account_status(account_id, config.ACCOUNT_STATUS_ACTIVE)
+
+
+def test_router_is_deterministic_and_covers_all_accounts():
+    router = AccountRouter(['a', 'b', 'c'])
+
+    routes = [router.route(number) for number in NUMBERS]
+    assert routes == [AccountRouter(['c', 'b', 'a']).route(number) for number in NUMBERS]
+    assert set(routes) == {'a', 'b', 'c'}
+
+
+def test_removing_an_account_only_moves_its_recipients():
+    before = AccountRouter(['a', 'b', 'c'])
+    after = AccountRouter(['a', 'b'])
+
+    for number in NUMBERS:
+        if before.route(number) != 'c':
+            assert after.route(number) == before.route(number)
+
+
+def test_segments_cover_the_ring():
+    router = AccountRouter(['a', 'b'])
+
+    segments = router.segments()
+    assert segments[0][0] == 0
+    for (_, high, _), (low, _, _) in zip(segments, segments[1:]):
+        assert low == high + 1
+
+
+def test_only_ready_accounts_are_routable():
+    assert is_routable(_account('a'))
+    assert is_routable(_account('a', circuit_state=config.CIRCUIT_HALF_OPEN))
+    assert not is_routable(_account('a', config.ACCOUNT_STATUS_STARTING))
+    assert not is_routable(_account('a', config.ACCOUNT_STATUS_WAITING_FOR_LOGIN))
+    assert not is_routable(_account('a', config.ACCOUNT_STATUS_STOPPED))
+    assert not is_routable(_account('a', circuit_state=config.CIRCUIT_OPEN))
+    assert not is_routable(_account('a', daily_cap=5, sent_today=5))
+
+
+def test_enqueue_skips_accounts_still_logging_in(queue_manager):
+    _activate(queue_manager, ['a'])
+    queue_manager.register_account('b')
+    queue_manager.update_account_status('b', config.ACCOUNT_STATUS_WAITING_FOR_LOGIN)
+    job_id = queue_manager.enqueue_job(NUMBERS[:20], 'hello')
+
+    assert {message['account_id'] for message in queue_manager.get_job_messages(job_id)} == {'a'}
+
+
+def test_daily_cap_counts_held_claims(queue_manager):
+    _activate(queue_manager, ['a'])
+    queue_manager.set_account_daily_cap('a', 2)
+    queue_manager.enqueue_job(NUMBERS[:5], 'hello')
+
+    first = queue_manager.claim_next_message('a')
+    assert first
+    # Prefetch while the first one is still in flight
+    assert queue_manager.claim_next_message('a')
+    assert queue_manager.claim_next_message('a') is None
+
+    queue_manager.mark_sent(first['message_id'])
+    assert queue_manager.claim_next_message('a') is None
+
+
+def test_daily_cap_resets_on_a_new_day(queue_manager):
+    _activate(queue_manager, ['a'])
+    queue_manager.set_account_daily_cap('a', 1)
+    queue_manager.enqueue_job(NUMBERS[:2], 'hello')
+    queue_manager.mark_sent(queue_manager.claim_next_message('a')['message_id'])
+    assert queue_manager.claim_next_message('a') is None
+
+    with sqlite3.connect(queue_manager.job_store.db_path) as conn:
+        conn.execute(f"UPDATE {config.ACCOUNTS_TABLE} SET daily_date = date('now', '-1 day')")
+    assert queue_manager.claim_next_message('a')
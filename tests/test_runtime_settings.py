@@ -0,0 +1,44 @@
+import pytest
+
+import config
+from utils.runtime_settings import validate_settings
+
+
+@pytest.mark.parametrize('updates', [
+    {'max_delay': float('nan')},
+    {'max_delay': float('inf')},
+    {'long_pause_interval': float('inf')},
+    {'long_pause_interval': float('nan')},
+])
+def test_non_finite_values_are_rejected(updates):
+    with pytest.raises(ValueError):
+        validate_settings(updates, {})
+
+
+def test_inverted_bounds_are_rejected():
+    with pytest.raises(ValueError):
+        validate_settings({'min_delay': config.MAX_DELAY + 1}, {})
+
+
+def test_valid_update_is_coerced():
+    assert validate_settings({'long_pause_interval': 12.0, 'max_delay': None}, {}) == {
+        'long_pause_interval': 12, 'max_delay': None,
+    }
+
+
+def test_live_job_delays_can_change(queue_manager):
+    job_id = queue_manager.enqueue_job(['+14155550001'], 'hello')
+    version = queue_manager.get_job_status(job_id)['version']
+
+    assert queue_manager.set_job_delays(job_id, 6, 12)
+    job = queue_manager.get_job_status(job_id)
+    assert (job['delay_min'], job['delay_max']) == (6, 12)
+    assert job['version'] > version
+
+
+@pytest.mark.parametrize('delays', [(0, 5), (8, 4), (1, float('inf')), (float('nan'), 5)])
+def test_invalid_job_delays_are_rejected(queue_manager, delays):
+    job_id = queue_manager.enqueue_job(['+14155550001'], 'hello')
+
+    with pytest.raises(ValueError):
+        queue_manager.set_job_delays(job_id, *delays)
@@ -0,0 +1,107 @@
+import sqlite3
+
+import config
+
+
+def _sending(queue_manager, numbers=('+14155550001',), text='hello'):
+    queue_manager.register_account('a')
+    queue_manager.update_account_status('a', config.ACCOUNT_STATUS_ACTIVE)
+    queue_manager.enqueue_job(list(numbers), text)
+    message = queue_manager.claim_next_message('a')
+    assert queue_manager.mark_sending(message['message_id'], 'a')
+    return message
+
+
+def _state(queue_manager, message_id):
+    with sqlite3.connect(queue_manager.job_store.db_path) as conn:
+        return [state for state, in conn.execute(
+            f"SELECT state FROM {config.SEND_JOURNAL_TABLE} WHERE message_id = ? ORDER BY rowid",
+            (message_id,))]
+
+
+def _status(queue_manager, message_id):
+    with sqlite3.connect(queue_manager.job_store.db_path) as conn:
+        status, = conn.execute(f"SELECT status FROM {config.QUEUE_TABLE} WHERE message_id = ?",
+                               (message_id,)).fetchone()
+    return status
+
+
+def test_intent_is_journaled_and_confirmed(queue_manager):
+    message = _sending(queue_manager)
+    assert _state(queue_manager, message['message_id']) == [config.JOURNAL_STATE_INTENT]
+
+    queue_manager.mark_sent(message['message_id'])
+    assert _state(queue_manager, message['message_id']) == [config.JOURNAL_STATE_CONFIRMED]
+    assert queue_manager.get_interrupted_sends('a') == []
+
+
+def test_mark_sending_requires_the_claim(queue_manager):
+    _sending(queue_manager, numbers=('+14155550001', '+14155550002'))
+    other = queue_manager.claim_next_message('a')
+
+    assert not queue_manager.mark_sending(other['message_id'], 'b')
+
+
+def test_interrupted_send_found_in_chat_is_sent(queue_manager):
+    message = _sending(queue_manager)
+
+    assert queue_manager.recover_interrupted_sends('a', verify=lambda send: True) == 1
+    assert _status(queue_manager, message['message_id']) == config.MESSAGE_STATUS_SENT
+    assert _state(queue_manager, message['message_id']) == [config.JOURNAL_STATE_RECOVERED_SENT]
+
+
+def test_interrupted_send_missing_from_chat_is_queued_again(queue_manager):
+    message = _sending(queue_manager)
+
+    assert queue_manager.recover_interrupted_sends('a', verify=lambda send: False) == 1
+    assert _status(queue_manager, message['message_id']) == config.MESSAGE_STATUS_PENDING
+    assert _state(queue_manager, message['message_id']) == [config.JOURNAL_STATE_RECOVERED_UNSENT]
+
+
+def test_unverifiable_send_is_not_resent(queue_manager):
+    message = _sending(queue_manager)
+
+    def verify(send):
+        raise RuntimeError("chat did not load")
+
+    assert queue_manager.recover_interrupted_sends('a', verify=verify) == 1
+    assert _status(queue_manager, message['message_id']) == config.MESSAGE_STATUS_FAILED
+    assert _state(queue_manager, message['message_id']) == [config.JOURNAL_STATE_UNKNOWN]
+    assert queue_manager.claim_next_message('a') is None
+
+
+def test_repeated_text_is_flagged(queue_manager):
+    first = _sending(queue_manager, numbers=('+14155550001',))
+    queue_manager.mark_sent(first['message_id'])
+    queue_manager.enqueue_job(['+14155550001'], 'hello')
+    second = queue_manager.claim_next_message('a')
+    queue_manager.mark_sending(second['message_id'], 'a')
+
+    send, = queue_manager.get_interrupted_sends('a')
+    assert send['repeated']
+
+
+def test_failure_after_intent_is_not_retried(queue_manager):
+    message = _sending(queue_manager)
+
+    # ENTER raised after the intent was recorded - it may have gone out
+    queue_manager.mark_failed(message['message_id'], 'WebDriverException: tab crashed')
+    assert _status(queue_manager, message['message_id']) == config.MESSAGE_STATUS_FAILED
+    assert _state(queue_manager, message['message_id']) == [config.JOURNAL_STATE_UNKNOWN]
+    assert queue_manager.claim_next_message('a') is None
+
+
+def test_failure_before_intent_is_retried_unclaimed(queue_manager):
+    queue_manager.register_account('a')
+    queue_manager.update_account_status('a', config.ACCOUNT_STATUS_ACTIVE)
+    queue_manager.enqueue_job(['+14155550001'], 'hello')
+    message = queue_manager.claim_next_message('a')
+
+    queue_manager.mark_failed(message['message_id'], 'TimeoutException: chat did not load')
+    assert _status(queue_manager, message['message_id']) == config.MESSAGE_STATUS_PENDING
+    with sqlite3.connect(queue_manager.job_store.db_path) as conn:
+        claimed_by, failed = conn.execute(
+            f"SELECT q.claimed_by, a.failed_count FROM {config.QUEUE_TABLE} q, {config.ACCOUNTS_TABLE} a "
+            f"WHERE q.message_id = ? AND a.account_id = 'a'", (message['message_id'],)).fetchone()
+    assert claimed_by is None
+    assert failed == 1
@@ -0,0 +1,47 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import config
+from utils.timezones import SQLITE_UTC_FORMAT
+from worker.simulator import CampaignSimulator
+
+
+def test_zero_time_campaign_has_no_rate():
+    simulator = CampaignSimulator(delay_min=0, delay_max=0, send_seconds=0)
+
+    result = simulator.estimate(1)
+    assert result['seconds'] == 0
+    assert result['messages_per_hour'] is None
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'accounts': float('nan')},
+    {'delay_min': float('nan')},
+    {'delay_max': float('inf')},
+    {'send_seconds': -1},
+])
+def test_invalid_parameters_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        CampaignSimulator(**kwargs)
+
+
+def test_forecast_rate_uses_elapsed_window(queue_manager):
+    queue_manager.register_account('a')
+    queue_manager.update_account_status('a', config.ACCOUNT_STATUS_ACTIVE)
+    job_id = queue_manager.enqueue_job(['+14155550001'], 'hello')
+
+    # Two busy minutes, 30 and 10 minutes ago
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    with sqlite3.connect(queue_manager.job_store.db_path) as conn:
+        for minutes_ago in (30, 10):
+            conn.execute(f'''
+                INSERT INTO {config.ROLLUPS_TABLE}
+                (bucket, bucket_start, job_id, error_class, sent_count, failed_count, retry_count)
+                VALUES ('minute', ?, ?, '', 5, 0, 0)
+            ''', ((now - timedelta(minutes=minutes_ago)).strftime(SQLITE_UTC_FORMAT), job_id))
+
+    observed = queue_manager.get_forecast_inputs(job_id)['observed']
+    assert observed['attempts'] == 10
+    assert observed['minutes'] == 30
@@ -0,0 +1,50 @@
+"""
+Classifies send error messages into coarse error classes
+Used for analytics rollups and failure-rate tracking
+"""
+
+ERROR_CLASS_TIMEOUT = 'timeout'
+ERROR_CLASS_ELEMENT_NOT_FOUND = 'element_not_found'
+ERROR_CLASS_SESSION = 'session'
+ERROR_CLASS_FILE_NOT_FOUND = 'file_not_found'
+ERROR_CLASS_INVALID_NUMBER = 'invalid_number'
+ERROR_CLASS_THROTTLED = 'throttled'
+ERROR_CLASS_OTHER = 'other'
+
+# Ordered (class, keywords) pairs - first match wins
+_ERROR_KEYWORDS = [
+    (ERROR_CLASS_FILE_NOT_FOUND, ['file not found']),
+    (ERROR_CLASS_THROTTLED, ['too many', 'rate limit', 'rate-limit', 'try again later',
+                             'temporarily banned', 'temporarily blocked', 'send blocked']),
+    # Session before invalid number: "InvalidSessionIdException: invalid session id"
+    # is a dead browser, not a bad contact
+    (ERROR_CLASS_SESSION, ['invalid session id', 'invalidsessionid', 'no such window',
+                           'nosuchwindow', 'disconnected', 'session deleted',
+                           'chrome not reachable', 'logged out']),
+    (ERROR_CLASS_INVALID_NUMBER, ['invalid phone', 'invalid number', 'not on whatsapp',
+                                  'phone number shared via url is invalid']),
+    (ERROR_CLASS_TIMEOUT, ['timeout', 'timed out']),
+    (ERROR_CLASS_ELEMENT_NOT_FOUND, ['no such element', 'nosuchelement', 'unable to locate',
+                                     'stale element', 'staleelement', 'not interactable',
+                                     'notinteractable']),
+]
+
+def classify_error(error_message):
+    """
+    Map a free-form error message to an error class
+    
+    Args:
+        error_message: Error string returned by the sender (may be None)
+    
+    Returns:
+        One of the ERROR_CLASS_* constants
+    """
+    if not error_message:
+        return ERROR_CLASS_OTHER
+    
+    text = str(error_message).lower()
+    for error_class, keywords in _ERROR_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return error_class
+    
+    return ERROR_CLASS_OTHER
@@ -0,0 +1,82 @@
+"""
+Message fingerprints
+Compare a queued message with the text WhatsApp Web shows in the chat.
+Only letters and digits count: emoji are rendered as images, formatting
+markers are hidden and whitespace is reflowed, so everything else differs
+between what was typed and what is displayed
+"""
+
+import hashlib
+import re
+from datetime import datetime
+
+_NOT_ALPHANUMERIC = re.compile(r'[\W_]+')
+
+# Bubble header (data-pre-plain-text), e.g. '[14:05, 19/10/2026] Name: ' or
+# '[2:05 PM, 10/19/2026] Name: ' - time and date order follow the locale
+_BUBBLE_TIME = re.compile(
+    r'^\[(\d{1,2}):(\d{2})\s*(?:([AaPp])\.?\s*[Mm]\.?)?,\s*(\d{1,4})[/.-](\d{1,2})[/.-](\d{1,4})\.?\]'
+)
+
+def normalize_message_text(text):
+    """
+    Reduce message text to its comparable part
+
+    Args:
+        text: Typed or displayed message text
+
+    Returns:
+        Lowercased letters and digits only ('' for no text)
+    """
+    return _NOT_ALPHANUMERIC.sub('', (text or '').casefold())
+
+def message_fingerprint(text):
+    """
+    Get a short fingerprint of a message's comparable text
+
+    Args:
+        text: Message text
+
+    Returns:
+        Hex digest, or None if the text has nothing comparable
+    """
+    normalized = normalize_message_text(text)
+    if not normalized:
+        return None
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]
+
+def bubble_times(pre_plain_text):
+    """
+    Read when a chat bubble was sent from its data-pre-plain-text header
+    The date order depends on the browser locale, so every reading that is
+    a valid date is returned; a caller that needs proof checks all of them
+
+    Args:
+        pre_plain_text: Bubble header, e.g. '[14:05, 19/10/2026] Name: '
+
+    Returns:
+        List of naive datetimes in the browser's local time, minute precision
+        (empty if the header cannot be read)
+    """
+    match = _BUBBLE_TIME.match((pre_plain_text or '').strip())
+    if not match:
+        return []
+
+    hour, minute, meridiem, first, second, third = match.groups()
+    hour, minute = int(hour), int(minute)
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.lower() == 'p' else 0)
+
+    if len(first) == 4:
+        orders = [(int(first), int(second), int(third))]  # y/m/d
+    else:
+        year = int(third) + (2000 if len(third) <= 2 else 0)
+        orders = [(year, int(second), int(first)), (year, int(first), int(second))]  # d/m/y, m/d/y
+
+    times = set()
+    for year, month, day in orders:
+        try:
+            times.add(datetime(year, month, day, hour, minute))
+        except ValueError:
+            continue
+    return sorted(times)
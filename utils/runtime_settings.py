@@ -0,0 +1,171 @@
+"""
+Runtime settings
+Config constants that may be changed while workers run. Overrides are stored
+in the database (see JobStore.update_runtime_settings) and applied onto the
+config module, so code reading config.X at use time picks them up; objects
+that copy a value at construction re-read it in their apply_settings()
+"""
+
+import math
+import time
+from utils.logger import logger
+import config
+
+# Tunable setting name (lowercase config constant) -> (type, minimum)
+TUNABLE_SETTINGS = {
+    'min_delay': (float, 0),
+    'max_delay': (float, 0),
+    'long_pause_interval': (int, 1),
+    'long_pause_min': (float, 0),
+    'long_pause_max': (float, 0),
+    'pacing_decrease_step': (float, 0),
+    'pacing_backoff_factor': (float, 1),
+    'pacing_jitter': (float, 0),
+    'max_retry_attempts': (int, 1),
+    'worker_poll_interval': (float, 0.1),
+    'worker_idle_delay': (float, 0.1),
+    'worker_notify_fallback_poll': (float, 1),
+    'session_check_interval': (float, 1),
+    'session_check_interval_max': (float, 1),
+}
+
+# (lower, upper) pairs that must stay ordered
+_ORDERED_SETTINGS = (
+    ('min_delay', 'max_delay'),
+    ('long_pause_min', 'long_pause_max'),
+    ('session_check_interval', 'session_check_interval_max'),
+)
+
+# Values from config.py, restored when an override is removed
+DEFAULTS = {name: getattr(config, name.upper()) for name in TUNABLE_SETTINGS}
+
+def current_settings():
+    """
+    Get the values in effect in this process
+
+    Returns:
+        Dict of setting name -> value
+    """
+    return {name: getattr(config, name.upper()) for name in TUNABLE_SETTINGS}
+
+def validate_settings(updates, overrides):
+    """
+    Check and coerce a settings update
+
+    Args:
+        updates: Dict of setting name -> new value (None = back to default)
+        overrides: Overrides currently stored
+
+    Returns:
+        Dict of setting name -> coerced value (None kept for resets)
+
+    Raises:
+        ValueError: Unknown setting, wrong type, not finite, below minimum,
+            or bounds that would end up inverted
+    """
+    if not isinstance(updates, dict) or not updates:
+        raise ValueError("settings must be a non-empty object")
+
+    coerced = {}
+    for name, value in updates.items():
+        if name not in TUNABLE_SETTINGS:
+            raise ValueError(f"Unknown setting {name!r}")
+        if value is None:
+            coerced[name] = None
+            continue
+
+        kind, minimum = TUNABLE_SETTINGS[name]
+        if kind is bool:
+            if not isinstance(value, bool):
+                raise ValueError(f"{name} must be true or false")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{name} must be a number")
+        elif not math.isfinite(value):
+            # NaN passes every comparison below; int(Infinity) overflows
+            raise ValueError(f"{name} must be a finite number")
+        elif kind is int and value != int(value):
+            raise ValueError(f"{name} must be a whole number")
+        else:
+            value = kind(value)
+            if value < minimum:
+                raise ValueError(f"{name} must be at least {minimum}")
+        coerced[name] = value
+
+    merged = dict(DEFAULTS, **overrides)
+    merged.update((name, DEFAULTS[name] if value is None else value) for name, value in coerced.items())
+    for lower, upper in _ORDERED_SETTINGS:
+        if merged[lower] > merged[upper]:
+            raise ValueError(f"{lower} ({merged[lower]}) must not exceed {upper} ({merged[upper]})")
+    return coerced
+
+def apply_settings(overrides):
+    """
+    Apply stored overrides onto the config module (others back to default)
+
+    Args:
+        overrides: Dict of setting name -> value
+
+    Returns:
+        Names of the settings whose value changed
+    """
+    changed = []
+    for name, default in DEFAULTS.items():
+        value = overrides.get(name, default)
+        if getattr(config, name.upper()) != value:
+            setattr(config, name.upper(), value)
+            changed.append(name)
+    return changed
+
+class SettingsWatcher:
+    """
+    Keeps this process's config in step with the stored overrides
+
+    refresh() costs one version lookup every SETTINGS_REFRESH_INTERVAL
+    seconds; the overrides are only read again when the version moved, so a
+    change reaches every worker within that interval without a restart.
+    """
+
+    def __init__(self, queue_manager, interval=None):
+        """
+        Initialize watcher
+
+        Args:
+            queue_manager: QueueManager (or RemoteQueueClient) holding the settings
+            interval: Seconds between version checks (default from config)
+        """
+        self.queue_manager = queue_manager
+        self.interval = config.SETTINGS_REFRESH_INTERVAL if interval is None else interval
+        self.version = None
+        self.checked_at = None
+
+    def refresh(self, force=False):
+        """
+        Apply the stored overrides if they changed since the last refresh
+
+        Args:
+            force: Check the version now instead of waiting for the interval
+
+        Returns:
+            Names of the settings whose value changed (empty if none)
+        """
+        now = time.monotonic()
+        if not force and self.checked_at is not None and now - self.checked_at < self.interval:
+            return []
+        self.checked_at = now
+
+        try:
+            if self.queue_manager.get_settings_version() == self.version:
+                return []
+            stored = self.queue_manager.get_runtime_settings()
+        except Exception as e:
+            logger.error(f"Could not refresh runtime settings: {str(e)}")
+            return []
+
+        self.version = stored['version']
+        changed = apply_settings(stored['overrides'])
+        if changed:
+            logger.info(
+                f"Runtime settings v{self.version}: " +
+                ", ".join(f"{name}={getattr(config, name.upper())}" for name in changed)
+            )
+        return changed
@@ -0,0 +1,205 @@
+"""
+Recipient time zones and quiet hours
+Derives a time zone from the E.164 country prefix of a normalized number
+"""
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# E.164 calling-code prefix -> representative IANA zone. Countries spanning
+# several zones map to their most populous one; use a per-contact override
+# where that matters. Longest prefix wins (e.g. +1 vs +1-8xx is not split)
+COUNTRY_PREFIX_TIMEZONES = {
+    '1': 'America/New_York',
+    '7': 'Europe/Moscow',
+    '20': 'Africa/Cairo',
+    '27': 'Africa/Johannesburg',
+    '30': 'Europe/Athens',
+    '31': 'Europe/Amsterdam',
+    '32': 'Europe/Brussels',
+    '33': 'Europe/Paris',
+    '34': 'Europe/Madrid',
+    '36': 'Europe/Budapest',
+    '39': 'Europe/Rome',
+    '40': 'Europe/Bucharest',
+    '41': 'Europe/Zurich',
+    '43': 'Europe/Vienna',
+    '44': 'Europe/London',
+    '45': 'Europe/Copenhagen',
+    '46': 'Europe/Stockholm',
+    '47': 'Europe/Oslo',
+    '48': 'Europe/Warsaw',
+    '49': 'Europe/Berlin',
+    '51': 'America/Lima',
+    '52': 'America/Mexico_City',
+    '53': 'America/Havana',
+    '54': 'America/Argentina/Buenos_Aires',
+    '55': 'America/Sao_Paulo',
+    '56': 'America/Santiago',
+    '57': 'America/Bogota',
+    '58': 'America/Caracas',
+    '60': 'Asia/Kuala_Lumpur',
+    '61': 'Australia/Sydney',
+    '62': 'Asia/Jakarta',
+    '63': 'Asia/Manila',
+    '64': 'Pacific/Auckland',
+    '65': 'Asia/Singapore',
+    '66': 'Asia/Bangkok',
+    '81': 'Asia/Tokyo',
+    '82': 'Asia/Seoul',
+    '84': 'Asia/Ho_Chi_Minh',
+    '86': 'Asia/Shanghai',
+    '90': 'Europe/Istanbul',
+    '91': 'Asia/Kolkata',
+    '92': 'Asia/Karachi',
+    '93': 'Asia/Kabul',
+    '94': 'Asia/Colombo',
+    '95': 'Asia/Yangon',
+    '98': 'Asia/Tehran',
+    '211': 'Africa/Juba',
+    '212': 'Africa/Casablanca',
+    '213': 'Africa/Algiers',
+    '216': 'Africa/Tunis',
+    '218': 'Africa/Tripoli',
+    '220': 'Africa/Banjul',
+    '221': 'Africa/Dakar',
+    '225': 'Africa/Abidjan',
+    '233': 'Africa/Accra',
+    '234': 'Africa/Lagos',
+    '237': 'Africa/Douala',
+    '251': 'Africa/Addis_Ababa',
+    '254': 'Africa/Nairobi',
+    '255': 'Africa/Dar_es_Salaam',
+    '256': 'Africa/Kampala',
+    '260': 'Africa/Lusaka',
+    '263': 'Africa/Harare',
+    '351': 'Europe/Lisbon',
+    '352': 'Europe/Luxembourg',
+    '353': 'Europe/Dublin',
+    '358': 'Europe/Helsinki',
+    '359': 'Europe/Sofia',
+    '380': 'Europe/Kyiv',
+    '381': 'Europe/Belgrade',
+    '385': 'Europe/Zagreb',
+    '420': 'Europe/Prague',
+    '421': 'Europe/Bratislava',
+    '852': 'Asia/Hong_Kong',
+    '855': 'Asia/Phnom_Penh',
+    '880': 'Asia/Dhaka',
+    '886': 'Asia/Taipei',
+    '960': 'Indian/Maldives',
+    '961': 'Asia/Beirut',
+    '962': 'Asia/Amman',
+    '963': 'Asia/Damascus',
+    '964': 'Asia/Baghdad',
+    '965': 'Asia/Kuwait',
+    '966': 'Asia/Riyadh',
+    '967': 'Asia/Aden',
+    '968': 'Asia/Muscat',
+    '970': 'Asia/Gaza',
+    '971': 'Asia/Dubai',
+    '972': 'Asia/Jerusalem',
+    '973': 'Asia/Bahrain',
+    '974': 'Asia/Qatar',
+    '975': 'Asia/Thimphu',
+    '977': 'Asia/Kathmandu',
+    '994': 'Asia/Baku',
+    '995': 'Asia/Tbilisi',
+    '998': 'Asia/Tashkent',
+}
+
+_MAX_PREFIX_LENGTH = max(len(prefix) for prefix in COUNTRY_PREFIX_TIMEZONES)
+
+# SQLite datetime('now') format - not_before values compare as strings
+SQLITE_UTC_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def timezone_for_number(phone_number):
+    """
+    Derive a recipient time zone from a normalized (+E.164) number
+
+    Args:
+        phone_number: Number as produced by normalize_phone_number
+
+    Returns:
+        IANA zone name, or None if the prefix is unknown
+    """
+    if not phone_number or not str(phone_number).startswith('+'):
+        return None
+
+    digits = str(phone_number)[1:]
+    for length in range(min(_MAX_PREFIX_LENGTH, len(digits)), 0, -1):
+        zone = COUNTRY_PREFIX_TIMEZONES.get(digits[:length])
+        if zone:
+            return zone
+    return None
+
+def is_valid_timezone(name):
+    """
+    Check whether a string is a known IANA zone name
+
+    Returns:
+        True if zoneinfo can load it
+    """
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return False
+
+def parse_clock_time(value):
+    """
+    Parse an 'HH:MM' quiet-hours boundary
+
+    Args:
+        value: 'HH:MM' string
+
+    Returns:
+        (hour, minute) tuple
+
+    Raises:
+        ValueError: If the value is not a valid HH:MM time
+    """
+    try:
+        hour, minute = (int(part) for part in str(value).split(':'))
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}' - expected HH:MM")
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time '{value}' - expected HH:MM")
+    return hour, minute
+
+def quiet_until(zone_name, quiet_start, quiet_end, now=None):
+    """
+    Check whether it is quiet hours for a recipient and until when
+
+    Args:
+        zone_name: Recipient IANA zone
+        quiet_start: 'HH:MM' local start of quiet hours
+        quiet_end: 'HH:MM' local end of quiet hours (may be past midnight)
+        now: Aware datetime to evaluate at (default: now)
+
+    Returns:
+        UTC 'YYYY-MM-DD HH:MM:SS' when quiet hours end, or None if sending is allowed now
+    """
+    if not (zone_name and quiet_start and quiet_end):
+        return None
+    try:
+        zone = ZoneInfo(zone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+    local = (now or datetime.now(timezone.utc)).astimezone(zone)
+    start = parse_clock_time(quiet_start)
+    end = parse_clock_time(quiet_end)
+    current = (local.hour, local.minute)
+
+    if start <= end:
+        quiet = start <= current < end
+    else:  # Window wraps midnight, e.g. 21:00-08:00
+        quiet = current >= start or current < end
+    if not quiet:
+        return None
+
+    end_local = local.replace(hour=end[0], minute=end[1], second=0, microsecond=0)
+    if end_local <= local:
+        end_local = (end_local.replace(tzinfo=None) + timedelta(days=1)).replace(tzinfo=zone)
+    return end_local.astimezone(timezone.utc).strftime(SQLITE_UTC_FORMAT)
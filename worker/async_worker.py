@@ -0,0 +1,397 @@
+"""
+asyncio worker runtime
+Runs the worker's duties as cooperating tasks instead of one blocking loop:
+sending, session health, job-control watching, browser metrics, runtime
+settings and status flushing. Blocking Selenium and SQLite calls go through bounded executors.
+"""
+
+import asyncio
+import functools
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from message_queue.notifier import QueueListener, EVENT_PAUSE, EVENT_STOP
+from worker.worker import Worker
+from worker.watchdog import watchdog_available
+from utils.logger import logger
+import config
+
+# Marks the end of the status-flush queue
+_FLUSH_STOP = None
+
+class AsyncWorker(Worker):
+    """
+    Worker whose send path never waits behind background duties
+
+    send        - claim and send; owns the single-thread send executor, where
+                  every WebDriver call and the send path's own SQLite writes
+                  (claim, mark_sending, mark_sent/failed) run in order
+    health      - session probes while the browser is idle (between sends
+                  they only run inside the pacing refill)
+    job-control - queue notifications plus a poll of the current job, so a
+                  pause/stop aborts a paced send even without notifications
+    metrics     - browser watchdog samples
+    flush       - pacing audit, browser metrics and pacing checkpoints,
+                  written from the ASYNC_DB_THREADS executor
+    heartbeat   - worker registry heartbeats and stale-worker failover,
+                  running from registration on (also while waiting for login)
+    """
+
+    def __init__(self, db_path=None, account_id=None, profile_dir=None, queue_manager=None, job_cache=None):
+        """
+        Initialize async worker
+
+        Args:
+            db_path: Path to SQLite database (default: from config)
+            account_id: WhatsApp account this worker sends as (default from config)
+            profile_dir: Chrome profile directory for the account (optional)
+            queue_manager: Queue to work from (default: QueueManager on db_path)
+            job_cache: Job row cache (default: JobCache on db_path)
+        """
+        super().__init__(
+            db_path=db_path, account_id=account_id, profile_dir=profile_dir,
+            queue_manager=queue_manager, job_cache=job_cache
+        )
+        # Selenium drivers are not thread-safe - one thread owns the browser
+        self._send_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="send")
+        self._db_executor = ThreadPoolExecutor(max_workers=config.ASYNC_DB_THREADS, thread_name_prefix="db")
+        # Notification waits and watchdog samples
+        self._background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="background")
+        self.watchdog.on_sample = lambda sample: self._defer(
+            self.queue_manager.record_browser_metrics, self.account_id, sample
+        )
+        self._session_lost = False
+        self._loop = None
+        self._stopping = None
+        self._wake = None
+        self._send_lock = None
+        self._flush_queue = None
+
+    def start(self):
+        """
+        Start the worker process (runs the event loop until shutdown)
+        """
+        asyncio.run(self.run())
+
+    async def run(self):
+        """
+        Run all worker tasks until shutdown
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+        self._flush_queue = asyncio.Queue()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            self._loop.add_signal_handler(signum, self._on_signal, signum)
+
+        logger.info("=" * 60)
+        logger.info(f"WhatsApp Bulk Sender Worker (async) - Starting (account {self.account_id})")
+        logger.info("=" * 60)
+
+        self.running = True
+        self.listener = QueueListener()
+        await self._in_send(self._register)
+        heartbeat = asyncio.create_task(self._heartbeat_loop(), name="heartbeat")
+
+        if not await self._in_send(self._open_session):
+            self._stop_background()
+            await heartbeat
+            await self._in_db(self.heartbeat.stop)
+            self.listener.close()
+            self._shutdown_executors()
+            return
+
+        flusher = asyncio.create_task(self._flush_loop(), name="status-flush")
+        background = [
+            asyncio.create_task(self._health_loop(), name="session-health"),
+            asyncio.create_task(self._control_loop(), name="job-control"),
+            asyncio.create_task(self._metrics_loop(), name="browser-metrics"),
+            asyncio.create_task(self._settings_loop(), name="runtime-settings"),
+        ]
+
+        try:
+            await self._send_loop()
+        except Exception as e:
+            logger.error(f"Fatal error in worker: {str(e)}", exc_info=True)
+        finally:
+            self.running = False
+            self._stop_background()
+            await asyncio.gather(heartbeat, *background, return_exceptions=True)
+            # Everything the send path deferred is written before the checkpoint
+            self._flush_queue.put_nowait(_FLUSH_STOP)
+            await flusher
+            await self._in_send(self._cleanup)
+            self._shutdown_executors()
+
+    def _on_signal(self, signum):
+        """
+        Handle SIGINT/SIGTERM inside the event loop
+        The first signal drains like the blocking worker; a second one forces exit
+        """
+        self._signal_handler(signum, None)
+        self._stop_background()
+
+    def _stop_background(self):
+        """
+        Wake every task so it notices the shutdown
+        """
+        self._stopping.set()
+        self._wake.set()
+        if self.listener:
+            self.listener.wake()
+
+    def _shutdown_executors(self):
+        """
+        Release the executor threads
+        """
+        for executor in (self._send_executor, self._db_executor, self._background_executor):
+            executor.shutdown(wait=False)
+
+    async def _in_send(self, function, *args, **kwargs):
+        """
+        Run a blocking call on the send executor (browser + send-path SQLite)
+        """
+        async with self._send_lock:
+            return await self._loop.run_in_executor(
+                self._send_executor, functools.partial(function, *args, **kwargs)
+            )
+
+    async def _in_db(self, function, *args, **kwargs):
+        """
+        Run a blocking SQLite call that is not on the send path
+        """
+        return await self._loop.run_in_executor(
+            self._db_executor, functools.partial(function, *args, **kwargs)
+        )
+
+    async def _wait(self, event, timeout):
+        """
+        Wait for an event or a timeout
+
+        Returns:
+            True if the event was set
+        """
+        try:
+            await asyncio.wait_for(event.wait(), max(0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _defer(self, function, *args):
+        """
+        Queue a non-critical status write for the flush task (thread-safe)
+        """
+        self._loop.call_soon_threadsafe(self._flush_queue.put_nowait, (function, args))
+
+    def _record_pacing(self, job_id, decision):
+        """
+        Audit a pacing decision from the flush task instead of the send path
+        """
+        self._defer(
+            self.queue_manager.record_pacing_decision,
+            self.account_id, job_id, decision, self.delay_generator.get_state()
+        )
+
+    def _probe_fits(self):
+        """
+        Check whether a due health probe may run between two sends
+        It must fit into the pacing refill (ASYNC_PROBE_HEADROOM) so the next
+        send is not delayed, unless the probe is a full interval overdue
+
+        Returns:
+            True if the probe should run now
+        """
+        overdue = -self.health_schedule.time_until_due()
+        if overdue < 0:
+            return False
+        return (self.delay_generator.time_until_token() >= config.ASYNC_PROBE_HEADROOM or
+                overdue >= self.health_schedule.interval)
+
+    async def _send_loop(self):
+        """
+        Send task - the critical path
+        """
+        while self.running and not self.shutdown_requested:
+            try:
+                if self._session_lost:
+                    logger.warning("Session lost - pausing worker")
+                    await self._in_send(self._handle_session_loss)
+                    self._session_lost = False
+                    await self._wait(self._stopping, 5)  # Wait before retry
+                    continue
+
+                # Fresh browser on the same profile between messages
+                if self.session_manager.recycle_due() or self.watchdog.restart_requested():
+                    await self._in_send(self._recycle_browser)
+                    continue
+
+                if self._probe_fits() and not await self._in_send(self._check_session):
+                    self._session_lost = True
+                    continue
+
+                # Failure storm - hold sends until the half-open probe is due
+                if not await self._in_send(self._circuit_allows_send):
+                    await self._wait(self._stopping, self.circuit_breaker.time_until_probe())
+                    continue
+
+                # Notifications arriving from here on wake the idle wait below
+                self._wake.clear()
+                message = await self._in_send(self._next_claim)
+                if not message:
+                    await self._idle()
+                    continue
+
+                await self._in_send(self._process_message, message)
+
+            except Exception as e:
+                logger.error(f"Error in processing loop: {str(e)}", exc_info=True)
+                await self._wait(self._stopping, config.WORKER_POLL_INTERVAL)
+
+    async def _idle(self):
+        """
+        Wait until the job-control task signals new or resumed work
+        """
+        # Recover messages claimed by workers that died mid-send
+        await self._in_db(self.queue_manager.release_claims, older_than_seconds=config.CLAIM_LEASE_SECONDS)
+
+        if self.listener.active:
+            timeout = config.WORKER_NOTIFY_FALLBACK_POLL
+        elif not await self._in_db(self.queue_manager.get_active_jobs):
+            timeout = config.WORKER_IDLE_DELAY
+        else:
+            timeout = config.WORKER_POLL_INTERVAL
+
+        if await self._wait(self._wake, timeout):
+            logger.debug(f"Woken by queue notifications: {self._take_events()}")
+
+    async def _health_loop(self):
+        """
+        Session-health task - probes while the browser is idle
+        """
+        while not self._stopping.is_set():
+            try:
+                wait = self.health_schedule.time_until_due()
+                if wait > 0:
+                    await self._wait(self._stopping, wait)
+                    continue
+                if self._send_lock.locked() or self._session_lost:
+                    # Busy sending - the send task probes inside pacing refills
+                    await self._wait(self._stopping, config.WORKER_POLL_INTERVAL)
+                    continue
+                if not await self._in_send(self._check_session):
+                    self._session_lost = True
+                    self._wake.set()
+            except Exception as e:
+                logger.error(f"Session health check failed: {str(e)}")
+                await self._wait(self._stopping, config.SESSION_CHECK_INTERVAL)
+
+    async def _control_loop(self):
+        """
+        Job-control task - forwards queue notifications and polls the current
+        job so pause/stop interrupt a paced send within ASYNC_JOB_POLL_INTERVAL
+        """
+        polled = None  # (job_id, status) seen by the last poll
+        while not self._stopping.is_set():
+            try:
+                events = await self._loop.run_in_executor(
+                    self._background_executor, self.listener.wait, config.ASYNC_JOB_POLL_INTERVAL
+                )
+                if self._stopping.is_set():
+                    break
+
+                job_id = self.current_job_id
+                if job_id is not None:
+                    job = await self._in_db(self.queue_manager.get_job_status, job_id)
+                    status = job['status'] if job else None
+                    if (job_id, status) != polled:
+                        polled = (job_id, status)
+                        if status == config.JOB_STATUS_PAUSED:
+                            events.append((EVENT_PAUSE, job_id))
+                        elif status == config.JOB_STATUS_STOPPED:
+                            events.append((EVENT_STOP, job_id))
+
+                if events:
+                    self.clock.interrupt(events)
+                    self._wake.set()
+            except Exception as e:
+                logger.error(f"Job-control watcher failed: {str(e)}")
+                await self._wait(self._stopping, config.WORKER_POLL_INTERVAL)
+
+    async def _heartbeat_loop(self):
+        """
+        Heartbeat task - keeps the registry row fresh and reaps stale workers
+        """
+        while True:
+            await self._in_db(self.heartbeat.beat)
+            if await self._wait(self._stopping, self.heartbeat.interval):
+                return
+
+    async def _metrics_loop(self):
+        """
+        Browser-metrics task - watchdog samples off the send path
+        """
+        if not watchdog_available():
+            logger.warning("psutil not installed - browser watchdog disabled (pip install psutil)")
+            return
+
+        while not await self._wait(self._stopping, self.watchdog.interval):
+            await self._loop.run_in_executor(self._background_executor, self.watchdog.poll)
+
+    async def _settings_loop(self):
+        """
+        Runtime-settings task - applies changed settings every SETTINGS_REFRESH_INTERVAL
+        Runs on the send executor: the delay generator it updates is only
+        used there, so a change never lands in the middle of a send
+        """
+        while not await self._wait(self._stopping, self.settings.interval):
+            await self._in_send(self._refresh_settings, True)
+
+    async def _flush_loop(self):
+        """
+        Status-flush task - writes deferred status updates and checkpoints
+        pacing every ASYNC_CHECKPOINT_INTERVAL seconds; runs until _FLUSH_STOP
+        """
+        next_checkpoint = time.monotonic() + config.ASYNC_CHECKPOINT_INTERVAL
+        while True:
+            try:
+                item = await asyncio.wait_for(
+                    self._flush_queue.get(), max(0, next_checkpoint - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                item = None
+            else:
+                if item is _FLUSH_STOP:
+                    return
+
+            try:
+                if item:
+                    function, args = item
+                    await self._in_db(function, *args)
+                if time.monotonic() >= next_checkpoint:
+                    next_checkpoint = time.monotonic() + config.ASYNC_CHECKPOINT_INTERVAL
+                    await self._in_db(
+                        self.queue_manager.save_pacing_state, self.account_id,
+                        self.delay_generator.get_state()
+                    )
+            except Exception as e:
+                logger.error(f"Status flush failed: {str(e)}")
+
+
+def main():
+    """
+    Entry point for the async worker process
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='WhatsApp Bulk Sender Worker (asyncio runtime)')
+    parser.add_argument('--db-path', type=str, help='Path to SQLite database', default=None)
+    parser.add_argument('--account', type=str, help='Account ID this worker sends as', default=None)
+    parser.add_argument('--profile-dir', type=str, help='Chrome profile directory', default=None)
+    args = parser.parse_args()
+
+    AsyncWorker(db_path=args.db_path, account_id=args.account, profile_dir=args.profile_dir).start()
+
+
+if __name__ == '__main__':
+    main()
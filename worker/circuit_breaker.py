@@ -0,0 +1,139 @@
+"""
+Circuit breaker for systemic send failures
+Trips when one error class dominates recent sends (e.g. a changed selector
+makes every send time out) so a failure storm stops burning retries
+"""
+
+import time
+from collections import deque
+from utils.error_classifier import (
+    ERROR_CLASS_TIMEOUT, ERROR_CLASS_ELEMENT_NOT_FOUND, ERROR_CLASS_SESSION,
+    ERROR_CLASS_THROTTLED
+)
+from utils.logger import logger
+import config
+
+# Error classes that point at the browser/WhatsApp Web rather than the number.
+# invalid_number, file_not_found and unclassified (other) errors are
+# per-message and count as healthy sends
+SYSTEMIC_ERROR_CLASSES = (
+    ERROR_CLASS_TIMEOUT,
+    ERROR_CLASS_ELEMENT_NOT_FOUND,
+    ERROR_CLASS_SESSION,
+    ERROR_CLASS_THROTTLED,
+)
+
+class CircuitBreaker:
+    """
+    Tracks send outcomes over a sliding time window
+
+    closed    - sends flow; trips to open when at least CIRCUIT_MIN_SAMPLES
+                sends are in the window and one systemic error class makes up
+                CIRCUIT_FAILURE_RATIO of them
+    open      - no sends until the probe interval elapses
+    half_open - exactly one probe send; success closes the circuit, failure
+                re-opens it with the probe interval doubled (up to the max)
+    """
+
+    def __init__(self, window_seconds=None, min_samples=None, failure_ratio=None,
+                 probe_interval=None, probe_interval_max=None):
+        """
+        Initialize circuit breaker
+
+        Args:
+            window_seconds: Sliding window length (default from config)
+            min_samples: Sends needed in the window before tripping (default from config)
+            failure_ratio: Share of one error class that trips the circuit (default from config)
+            probe_interval: Seconds open before the first probe (default from config)
+            probe_interval_max: Upper bound for the backed-off probe interval (default from config)
+        """
+        self.window_seconds = window_seconds or config.CIRCUIT_WINDOW_SECONDS
+        self.min_samples = min_samples or config.CIRCUIT_MIN_SAMPLES
+        self.failure_ratio = failure_ratio or config.CIRCUIT_FAILURE_RATIO
+        self.base_probe_interval = probe_interval or config.CIRCUIT_PROBE_INTERVAL
+        self.probe_interval_max = probe_interval_max or config.CIRCUIT_PROBE_INTERVAL_MAX
+
+        self.state = config.CIRCUIT_CLOSED
+        self.reason = None  # Error class that tripped the circuit
+        self.probe_interval = self.base_probe_interval
+        self.opened_at = None
+        self._samples = deque()  # (monotonic time, error class or None)
+
+    def _trim(self, now):
+        """
+        Drop samples older than the window
+        """
+        while self._samples and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+
+    def allow_send(self):
+        """
+        Check whether a send may be attempted now
+        Moves an open circuit to half-open once the probe interval has elapsed
+
+        Returns:
+            True if a send (or the half-open probe) may go ahead
+        """
+        if self.state == config.CIRCUIT_OPEN and time.monotonic() - self.opened_at >= self.probe_interval:
+            self.state = config.CIRCUIT_HALF_OPEN
+            logger.info(f"Circuit half-open - probing with one send ({self.reason})")
+        return self.state != config.CIRCUIT_OPEN
+
+    def time_until_probe(self):
+        """
+        Get the seconds left until the next half-open probe
+
+        Returns:
+            Seconds to wait (0 unless the circuit is open)
+        """
+        if self.state != config.CIRCUIT_OPEN:
+            return 0
+        return max(0, self.opened_at + self.probe_interval - time.monotonic())
+
+    def record(self, error_class=None):
+        """
+        Record the outcome of a send
+
+        Args:
+            error_class: ERROR_CLASS_* of the failure, or None for a success
+
+        Returns:
+            The new state if it changed, otherwise None
+        """
+        now = time.monotonic()
+        systemic = error_class in SYSTEMIC_ERROR_CLASSES
+
+        if self.state == config.CIRCUIT_HALF_OPEN:
+            if systemic:
+                self.probe_interval = min(self.probe_interval * 2, self.probe_interval_max)
+                return self._open(now, error_class)
+            logger.info("Circuit closed - probe send succeeded")
+            self.state = config.CIRCUIT_CLOSED
+            self.reason = None
+            self.probe_interval = self.base_probe_interval
+            self._samples.clear()
+            return config.CIRCUIT_CLOSED
+
+        self._samples.append((now, error_class if systemic else None))
+        self._trim(now)
+
+        if self.state != config.CIRCUIT_CLOSED or not systemic or len(self._samples) < self.min_samples:
+            return None
+
+        failures = sum(1 for _, sample_class in self._samples if sample_class == error_class)
+        if failures / len(self._samples) >= self.failure_ratio:
+            return self._open(now, error_class)
+        return None
+
+    def _open(self, now, error_class):
+        """
+        Trip the circuit
+        """
+        self.state = config.CIRCUIT_OPEN
+        self.reason = error_class
+        self.opened_at = now
+        logger.warning(
+            f"Circuit open - '{error_class}' failures dominate recent sends; "
+            f"next probe in {self.probe_interval:.0f}s"
+        )
+        return config.CIRCUIT_OPEN
@@ -0,0 +1,79 @@
+"""
+Interruptible clock for worker waits
+Every pacing, polling and reconnect wait goes through one clock so job-control
+notifications and shutdown wake the worker immediately instead of after a sleep
+"""
+
+import threading
+import time
+
+class InterruptibleClock:
+    """
+    sleep() blocks until the timeout, an interrupt() issued after the sleep
+    began, or stop(). Interrupts carry queue events ((event, job_id) tuples)
+    that callers collect with take_events(). A clock nobody interrupts behaves
+    like time.sleep, so components can default to a private one.
+    """
+
+    def __init__(self):
+        """
+        Initialize clock
+        """
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._events = []
+        self.stopped = False
+
+    def sleep(self, seconds):
+        """
+        Sleep until the timeout or an interrupt
+
+        Args:
+            seconds: Maximum seconds to sleep
+
+        Returns:
+            True if woken early (interrupt or stop), False on timeout
+        """
+        deadline = time.monotonic() + max(0, seconds)
+        with self._condition:
+            generation = self._generation
+            while not self.stopped and generation == self._generation:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def interrupt(self, events=None):
+        """
+        Wake every current sleeper
+
+        Args:
+            events: Optional list of (event, job_id) tuples to hand to take_events()
+        """
+        with self._condition:
+            if events:
+                self._events.extend(events)
+                # Bound memory if nobody collects events for a while
+                del self._events[:-100]
+            self._generation += 1
+            self._condition.notify_all()
+
+    def take_events(self):
+        """
+        Collect the events delivered since the last call
+
+        Returns:
+            List of (event, job_id) tuples
+        """
+        with self._condition:
+            events, self._events = self._events, []
+            return events
+
+    def stop(self):
+        """
+        Wake all sleepers and make every further sleep return immediately
+        """
+        with self._condition:
+            self.stopped = True
+            self._condition.notify_all()
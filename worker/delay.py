@@ -1,10 +1,21 @@
 """
 Human-like delay generator with randomization
 Implements base delays and periodic long pauses
+
+Pacing is a token bucket of capacity one, measured between send *starts*:
+each send consumes the token and the next token is refilled after a random
+delay in [min_delay, max_delay]. Every LONG_PAUSE_INTERVAL sends the bucket
+is drained for an extra LONG_PAUSE_MIN..LONG_PAUSE_MAX seconds. Page loads
+and typing for the next message happen while the bucket refills, so the
+real send rate matches the configured delays instead of delay + overhead.
+With PACING_ADAPTIVE the random delay is drawn around an AIMD target
+(worker/pacing.py) that moves inside the bounds with send outcomes.
 """
 
 import random
 import time
+from worker.clock import InterruptibleClock
+from worker.pacing import AdaptivePacer, PACING_BACKOFF
 from utils.logger import logger
 import config
 
@@ -13,20 +24,60 @@ class DelayGenerator:
     Generates randomized delays to simulate human behavior
     """
     
-    def __init__(self, min_delay=None, max_delay=None):
+    def __init__(self, min_delay=None, max_delay=None, clock=None, adaptive=None):
         """
         Initialize delay generator
         
         Args:
             min_delay: Minimum delay in seconds (default from config)
             max_delay: Maximum delay in seconds (default from config)
+            clock: InterruptibleClock used for waits (default: a private one)
+            adaptive: Adapt delays to send outcomes (default from config)
         """
+        self.clock = clock or InterruptibleClock()
+        adaptive = config.PACING_ADAPTIVE if adaptive is None else adaptive
+        self.pacer = AdaptivePacer() if adaptive else None
         self.min_delay = min_delay or config.MIN_DELAY
         self.max_delay = max_delay or config.MAX_DELAY
         self.message_count = 0
         self.long_pause_interval = config.LONG_PAUSE_INTERVAL
         self.long_pause_min = config.LONG_PAUSE_MIN
         self.long_pause_max = config.LONG_PAUSE_MAX
+        self.next_token_at = None  # time.monotonic() when the bucket refills
+        self.last_token_at = None  # time.monotonic() of the last consumed token
+    
+    def set_bounds(self, min_delay=None, max_delay=None):
+        """
+        Change delay bounds without resetting the bucket
+        Used when the worker moves to a job with different pacing. If the
+        pending refill is shorter than the new minimum (e.g. returning to a
+        bulk job after a faster priority send) it is re-drawn from the new
+        bounds, so every job's own spacing rules still hold
+        
+        Args:
+            min_delay: Minimum delay in seconds (default from config)
+            max_delay: Maximum delay in seconds (default from config)
+        """
+        self.min_delay = min_delay or config.MIN_DELAY
+        self.max_delay = max_delay or config.MAX_DELAY
+        
+        if self.next_token_at is not None and self.last_token_at is not None:
+            if self.next_token_at - self.last_token_at < self.min_delay:
+                self.next_token_at = self.last_token_at + random.uniform(self.min_delay, self.max_delay)
+    
+    def apply_settings(self):
+        """
+        Re-read the long-pause cadence and AIMD parameters from config
+        Called when runtime settings change; the bucket, the message count and
+        the pacing position are kept, so a live campaign continues smoothly
+        """
+        self.long_pause_interval = config.LONG_PAUSE_INTERVAL
+        self.long_pause_min = config.LONG_PAUSE_MIN
+        self.long_pause_max = config.LONG_PAUSE_MAX
+        if self.pacer:
+            self.pacer.decrease_step = config.PACING_DECREASE_STEP
+            self.pacer.backoff_factor = config.PACING_BACKOFF_FACTOR
+            self.pacer.jitter = config.PACING_JITTER
     
     def get_delay(self):
         """
@@ -37,8 +88,11 @@ class DelayGenerator:
         """
         self.message_count += 1
         
-        # Base delay (randomized)
-        delay = random.uniform(self.min_delay, self.max_delay)
+        # Base delay (randomized, around the adaptive target if enabled)
+        if self.pacer:
+            delay = self.pacer.sample_delay(self.min_delay, self.max_delay)
+        else:
+            delay = random.uniform(self.min_delay, self.max_delay)
         
         # Add long pause every N messages
         if self.message_count % self.long_pause_interval == 0:
@@ -48,16 +102,119 @@ class DelayGenerator:
         
         return delay
     
+    def time_until_token(self):
+        """
+        Get the seconds left until the next send is allowed
+        
+        Returns:
+            Seconds to wait (0 if a token is available now)
+        """
+        if self.next_token_at is None:
+            return 0
+        return max(0, self.next_token_at - time.monotonic())
+    
+    def acquire(self, should_abort=None):
+        """
+        Block until a send token is available, then consume it
+        Call immediately before the send action (pressing Enter)
+        
+        Args:
+            should_abort: Optional callable checked before waiting and each
+                time the clock is interrupted; when it returns True the wait
+                ends without consuming the token
+        
+        Returns:
+            True if the token was consumed, False if aborted
+        """
+        remaining = self.time_until_token()
+        if remaining > 0:
+            logger.debug(f"Pacing: holding send for {remaining:.1f} seconds...")
+        while remaining > 0:
+            if self.clock.stopped or (should_abort and should_abort()):
+                return False
+            self.clock.sleep(remaining)
+            remaining = self.time_until_token()
+        
+        if should_abort and should_abort():
+            return False
+        
+        # Consume the token - schedule the refill from this send's start
+        self.last_token_at = time.monotonic()
+        self.next_token_at = self.last_token_at + self.get_delay()
+        return True
+    
+    def record_outcome(self, error_class=None):
+        """
+        Feed a send outcome to the adaptive pacer
+        A back-off also stretches the refill already scheduled
+        
+        Args:
+            error_class: ERROR_CLASS_* of the failure, or None for a success
+        
+        Returns:
+            Decision dict from AdaptivePacer.record(), or None if nothing changed
+        """
+        if not self.pacer:
+            return None
+        
+        decision = self.pacer.record(error_class, self.min_delay, self.max_delay)
+        if decision:
+            if decision['action'] == PACING_BACKOFF and self.last_token_at is not None:
+                self.next_token_at = max(self.next_token_at or 0,
+                                         self.last_token_at + decision['delay_after'])
+            logger.info(
+                f"Pacing {decision['action']}: target {decision['delay_before']:.1f}s -> "
+                f"{decision['delay_after']:.1f}s" +
+                (f" ({error_class})" if error_class else "")
+            )
+        return decision
+    
+    def get_state(self):
+        """
+        Get a checkpoint of the bucket that survives a process restart
+        
+        Returns:
+            Dict with message_count, the wall-clock time of the next token and
+            the adaptive pacing position
+        """
+        return {
+            'message_count': self.message_count,
+            'next_token_at': time.time() + self.time_until_token() if self.next_token_at else None,
+            'pacing_position': self.pacer.position if self.pacer else None,
+        }
+    
+    def restore_state(self, state):
+        """
+        Restore a checkpoint written by get_state()
+        A restart keeps the long-pause cadence and any refill still owed
+        
+        Args:
+            state: Dict from get_state() (None is ignored)
+        """
+        if not state:
+            return
+        self.message_count = int(state.get('message_count') or 0)
+        if self.pacer and state.get('pacing_position') is not None:
+            self.pacer.position = min(1.0, max(0.0, float(state['pacing_position'])))
+        next_token_at = state.get('next_token_at')
+        if next_token_at:
+            remaining = next_token_at - time.time()
+            if remaining > 0:
+                self.last_token_at = time.monotonic()
+                self.next_token_at = self.last_token_at + remaining
+    
     def wait(self):
         """
         Wait for the calculated delay duration
         """
         delay = self.get_delay()
         logger.debug(f"Waiting {delay:.1f} seconds...")
-        time.sleep(delay)
+        self.clock.sleep(delay)
     
     def reset(self):
         """
-        Reset message counter (useful for new jobs)
+        Reset message counter and refill the bucket (useful for new jobs)
         """
         self.message_count = 0
+        self.next_token_at = None
+        self.last_token_at = None
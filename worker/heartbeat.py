@@ -0,0 +1,90 @@
+"""
+Worker heartbeat
+Keeps this worker's row in the worker registry fresh and fails over the work
+of workers that stopped heartbeating
+"""
+
+import os
+import socket
+import threading
+from utils.logger import logger
+import config
+
+class WorkerHeartbeat:
+    """
+    Every WORKER_HEARTBEAT_INTERVAL seconds the worker refreshes its registry
+    row (current job, throughput) and reaps workers silent for longer than
+    WORKER_STALE_AFTER. Every live worker reaps, so a crashed worker's claims
+    return to the queue at most WORKER_STALE_AFTER + WORKER_HEARTBEAT_INTERVAL
+    after its last heartbeat instead of after CLAIM_LEASE_SECONDS.
+
+    The heartbeat runs in its own thread, so a worker busy in a long browser
+    call still counts as alive - hangs are the watchdog's business.
+    """
+
+    def __init__(self, queue_manager, account_id, current_job=None, interval=None):
+        """
+        Initialize heartbeat
+
+        Args:
+            queue_manager: QueueManager (or RemoteQueueClient) to heartbeat into
+            account_id: Account the worker sends as
+            current_job: Optional callable returning the job being sent
+            interval: Seconds between heartbeats (default from config)
+        """
+        self.queue_manager = queue_manager
+        self.account_id = account_id
+        self.current_job = current_job
+        self.interval = interval or config.WORKER_HEARTBEAT_INTERVAL
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+        self.worker_id = f"{account_id}@{self.host}:{self.pid}"
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the heartbeat thread (the first heartbeat registers the worker)
+        """
+        self._thread = threading.Thread(target=self._run, name="worker-heartbeat", daemon=True)
+        self._thread.start()
+        logger.info(f"Worker {self.worker_id} heartbeating every {self.interval}s")
+
+    def stop(self):
+        """
+        Stop heartbeating and mark the worker stopped in the registry
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.queue_manager.deregister_worker(self.worker_id)
+        except Exception as e:
+            logger.error(f"Could not deregister worker {self.worker_id}: {str(e)}")
+
+    def _run(self):
+        """
+        Heartbeat loop
+        """
+        while True:
+            self.beat()
+            if self._stop.wait(self.interval):
+                break
+
+    def beat(self):
+        """
+        Send one heartbeat and reap stale workers
+        Called by the heartbeat thread, or directly by a runtime that
+        schedules heartbeats itself (see AsyncWorker)
+        """
+        try:
+            self.queue_manager.worker_heartbeat(
+                self.worker_id, self.account_id,
+                current_job_id=self.current_job() if self.current_job else None,
+                host=self.host, pid=self.pid
+            )
+            self.queue_manager.reap_stale_workers()
+        except Exception as e:
+            logger.error(f"Worker heartbeat failed: {str(e)}")
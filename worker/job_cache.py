@@ -0,0 +1,96 @@
+"""
+Worker-side job state cache
+Avoids opening a SQLite connection per message to re-read the job row
+"""
+
+import sqlite3
+import time
+import config
+
+class JobCache:
+    """
+    Caches job rows keyed by job_id, revalidated through jobs.version
+    
+    A cached row is trusted for JOB_CACHE_MAX_AGE seconds; after that a
+    single indexed version lookup on a persistent connection decides whether
+    the row must be re-read. Pause/stop therefore take effect within
+    JOB_CACHE_MAX_AGE seconds. Counters (sent_count, ...) in cached rows may
+    be stale - use QueueManager.get_job_status() when they matter.
+    """
+    
+    def __init__(self, db_path=None, max_age=None):
+        """
+        Initialize job cache
+        
+        Args:
+            db_path: Path to SQLite database (default: from config)
+            max_age: Seconds a cached row is trusted (default from config)
+        """
+        self.db_path = db_path or config.DB_PATH
+        self.max_age = config.JOB_CACHE_MAX_AGE if max_age is None else max_age
+        self._conn = None
+        self._entries = {}  # job_id -> (version, checked_at, row)
+    
+    def _connection(self):
+        """
+        Get the persistent read connection (opened lazily)
+        """
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+            self._conn.row_factory = sqlite3.Row
+        return self._conn
+    
+    def get(self, job_id):
+        """
+        Get a job row, revalidating it if the cached copy is too old
+        
+        Args:
+            job_id: ID of the job
+        
+        Returns:
+            Job information as dict, or None if not found
+        """
+        now = time.monotonic()
+        entry = self._entries.get(job_id)
+        if entry and now - entry[1] < self.max_age:
+            return entry[2]
+        
+        conn = self._connection()
+        if entry:
+            row = conn.execute(
+                f"SELECT version FROM {config.JOBS_TABLE} WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row and row['version'] == entry[0]:
+                self._entries[job_id] = (entry[0], now, entry[2])
+                return entry[2]
+        
+        row = conn.execute(
+            f"SELECT * FROM {config.JOBS_TABLE} WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if not row:
+            self._entries.pop(job_id, None)
+            return None
+        
+        job = dict(row)
+        self._entries[job_id] = (job['version'], now, job)
+        return job
+    
+    def invalidate(self, job_id=None):
+        """
+        Drop cached rows (after this worker changes a job itself)
+        
+        Args:
+            job_id: ID of the job to drop (default: all)
+        """
+        if job_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(job_id, None)
+    
+    def close(self):
+        """
+        Close the persistent connection
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,108 @@
+"""
+Adaptive AIMD pacing controller
+Shortens delays additively while sends succeed and backs off multiplicatively
+on throttling-type failures, always inside the job's hard delay bounds
+"""
+
+import random
+from utils.error_classifier import ERROR_CLASS_THROTTLED, ERROR_CLASS_TIMEOUT
+import config
+
+PACING_DECREASE = 'decrease'
+PACING_BACKOFF = 'backoff'
+
+# Failures that suggest we are sending too fast
+THROTTLE_ERROR_CLASSES = (ERROR_CLASS_THROTTLED, ERROR_CLASS_TIMEOUT)
+
+class AdaptivePacer:
+    """
+    Keeps one target delay per account as a position inside the current job's
+    [min_delay, max_delay] (0 = min_delay, 1 = max_delay), so the learned
+    speed carries over between jobs with different bounds. Each send delay is
+    drawn with +/- PACING_JITTER around the target and clipped to the bounds.
+    """
+
+    def __init__(self, position=None, decrease_step=None, backoff_factor=None, jitter=None, rng=None):
+        """
+        Initialize pacer
+
+        Args:
+            position: Starting position inside the bounds (default from config)
+            decrease_step: Seconds removed from the target per success (default from config)
+            backoff_factor: Target multiplier on a throttling failure (default from config)
+            jitter: Relative spread of each delay around the target (default from config)
+            rng: random.Random used for delays (default: the module-level generator)
+        """
+        self.rng = rng or random
+        self.position = config.PACING_START_POSITION if position is None else position
+        self.decrease_step = decrease_step or config.PACING_DECREASE_STEP
+        self.backoff_factor = backoff_factor or config.PACING_BACKOFF_FACTOR
+        self.jitter = config.PACING_JITTER if jitter is None else jitter
+
+    def target_delay(self, min_delay, max_delay):
+        """
+        Get the current target delay for a job's bounds
+
+        Returns:
+            Target delay in seconds
+        """
+        return min_delay + self.position * (max_delay - min_delay)
+
+    def sample_range(self, min_delay, max_delay):
+        """
+        Get the interval each delay is drawn from
+
+        Returns:
+            (low, high) tuple within [min_delay, max_delay]
+        """
+        target = self.target_delay(min_delay, max_delay)
+        spread = target * self.jitter
+        return max(min_delay, target - spread), min(max_delay, target + spread)
+
+    def sample_delay(self, min_delay, max_delay):
+        """
+        Draw a randomized delay around the target
+
+        Returns:
+            Delay in seconds within [min_delay, max_delay]
+        """
+        return self.rng.uniform(*self.sample_range(min_delay, max_delay))
+
+    def record(self, error_class, min_delay, max_delay):
+        """
+        Adapt the target delay to a send outcome
+
+        Args:
+            error_class: ERROR_CLASS_* of the failure, or None for a success
+            min_delay: Hard lower bound of the current job
+            max_delay: Hard upper bound of the current job
+
+        Returns:
+            Decision dict (action, error_class, delay_before, delay_after,
+            position) if the target changed, otherwise None
+        """
+        if max_delay <= min_delay:
+            return None
+
+        before = self.target_delay(min_delay, max_delay)
+        if error_class is None:
+            action = PACING_DECREASE
+            after = max(min_delay, before - self.decrease_step)
+        elif error_class in THROTTLE_ERROR_CLASSES:
+            action = PACING_BACKOFF
+            after = min(max_delay, before * self.backoff_factor)
+        else:
+            # Per-number failures say nothing about the send rate
+            return None
+
+        if after == before:
+            return None
+
+        self.position = (after - min_delay) / (max_delay - min_delay)
+        return {
+            'action': action,
+            'error_class': error_class,
+            'delay_before': round(before, 2),
+            'delay_after': round(after, 2),
+            'position': round(self.position, 4),
+        }
@@ -0,0 +1,168 @@
+"""
+Worker pool supervisor
+Runs one worker process per WhatsApp account, all claiming from the shared queue
+"""
+
+import os
+import time
+import signal
+import multiprocessing
+from utils.logger import logger
+import config
+
+def run_account_worker(account_id, profile_dir, db_path=None, use_async=False, remote_url=None, api_key=None):
+    """
+    Process entry point for a single pooled worker
+
+    Args:
+        account_id: Account ID the worker sends as
+        profile_dir: Chrome profile directory for the account
+        db_path: Path to SQLite database (default: from config)
+        use_async: Run the asyncio runtime (worker/async_worker.py)
+        remote_url: Claim through this API's lease endpoints instead of db_path
+        api_key: API key for remote_url (default from config)
+    """
+    # Imported here so the supervisor itself never loads Selenium
+    if remote_url:
+        from worker.remote import run_remote_worker
+        run_remote_worker(remote_url, api_key, account_id, profile_dir, use_async)
+        return
+    if use_async:
+        from worker.async_worker import AsyncWorker as Worker
+    else:
+        from worker.worker import Worker
+
+    worker = Worker(db_path=db_path, account_id=account_id, profile_dir=profile_dir)
+    worker.start()
+
+def default_accounts(size):
+    """
+    Get the account IDs for a pool of the given size
+
+    Args:
+        size: Number of accounts
+
+    Returns:
+        List of account IDs (config.WORKER_ACCOUNTS first, then account1..accountN)
+    """
+    accounts = list(config.WORKER_ACCOUNTS[:size])
+    index = 1
+    while len(accounts) < size:
+        account_id = f"account{index}"
+        if account_id not in accounts:
+            accounts.append(account_id)
+        index += 1
+    return accounts
+
+class WorkerPool:
+    """
+    Launches and supervises N worker processes, one per account
+    Each worker gets its own Chrome profile, login state and DelayGenerator
+    """
+
+    def __init__(self, size=None, accounts=None, db_path=None, use_async=False, remote_url=None, api_key=None):
+        """
+        Initialize worker pool
+
+        Args:
+            size: Number of workers (default from config)
+            accounts: Explicit list of account IDs (overrides size)
+            db_path: Path to SQLite database (default: from config)
+            use_async: Run each worker on the asyncio runtime
+            remote_url: Claim through this API's lease endpoints (remote host)
+            api_key: API key for remote_url (default from config)
+        """
+        self.accounts = accounts or default_accounts(size or config.WORKER_POOL_SIZE)
+        self.db_path = db_path
+        self.use_async = use_async
+        self.remote_url = remote_url
+        self.api_key = api_key
+        self.processes = {}
+        self.running = False
+
+    def profile_dir(self, account_id):
+        """
+        Get the Chrome profile directory for an account
+
+        Args:
+            account_id: ID of the account
+
+        Returns:
+            Absolute profile directory path
+        """
+        return os.path.join(config.CHROME_PROFILE_ROOT, account_id)
+
+    def _spawn(self, account_id):
+        """
+        Start the worker process for an account
+        """
+        process = multiprocessing.Process(
+            target=run_account_worker,
+            args=(account_id, self.profile_dir(account_id), self.db_path, self.use_async,
+                  self.remote_url, self.api_key),
+            name=f"worker-{account_id}"
+        )
+        process.start()
+        self.processes[account_id] = process
+        logger.info(f"Started worker for account {account_id} (pid {process.pid})")
+
+    def start(self):
+        """
+        Start all workers and supervise them until shutdown
+        Crashed workers are restarted after WORKER_RESTART_DELAY seconds
+        """
+        logger.info(f"Starting worker pool with {len(self.accounts)} accounts: {', '.join(self.accounts)}")
+        self.running = True
+
+        signal.signal(signal.SIGINT, self._signal_handler)
+        signal.signal(signal.SIGTERM, self._signal_handler)
+
+        for account_id in self.accounts:
+            self._spawn(account_id)
+
+        restart_at = {}
+        try:
+            while self.running:
+                for account_id, process in list(self.processes.items()):
+                    if process.is_alive():
+                        continue
+
+                    if account_id not in restart_at:
+                        logger.warning(
+                            f"Worker for account {account_id} exited with code {process.exitcode} - "
+                            f"restarting in {config.WORKER_RESTART_DELAY}s"
+                        )
+                        restart_at[account_id] = time.time() + config.WORKER_RESTART_DELAY
+                    elif time.time() >= restart_at[account_id]:
+                        del restart_at[account_id]
+                        self._spawn(account_id)
+                time.sleep(1)
+        finally:
+            self.stop()
+
+    def _signal_handler(self, signum, frame):
+        """
+        Handle shutdown signals by stopping supervision
+        """
+        logger.info(f"Pool received signal {signum}, stopping workers...")
+        self.running = False
+
+    def stop(self, timeout=60):
+        """
+        Ask every worker to shut down gracefully and wait for them
+
+        Args:
+            timeout: Seconds to wait for each worker before killing it
+        """
+        for process in self.processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+        for account_id, process in self.processes.items():
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Worker for account {account_id} did not stop - terminating")
+                process.terminate()
+                process.join()
+
+        logger.info("Worker pool stopped")
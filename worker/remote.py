@@ -0,0 +1,701 @@
+"""
+Remote worker client
+Lets a worker run on another host than the SQLite database: the QueueManager
+calls a Worker makes are served by the API's lease endpoints instead
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from message_queue.notifier import EVENT_PAUSE, EVENT_STOP
+from utils.logger import logger
+import config
+
+# Outcomes reported through /lease/report (see QueueManager.lease_report)
+OUTCOME_SENDING = config.MESSAGE_STATUS_SENDING
+OUTCOME_SENT = config.MESSAGE_STATUS_SENT
+OUTCOME_FAILED = config.MESSAGE_STATUS_FAILED
+OUTCOME_RELEASED = 'released'
+
+class RemoteQueueClient:
+    """
+    Stands in for QueueManager inside a Worker on another host
+
+    Claims are fetched REMOTE_CLAIM_BATCH at a time and handed out one by
+    one; sent/failed/released results are buffered and reported in batches by
+    a heartbeat thread that also renews the leases of everything held. Only
+    the send intent is synchronous - it must be recorded before ENTER - and
+    it carries any buffered results with it. A crash loses at most the
+    buffered results: those messages are still 'sending' on the server and
+    are checked against the chat by the next run (/lease/interrupted,
+    /lease/resolve) instead of being re-sent.
+    """
+
+    def __init__(self, base_url, api_key=None):
+        """
+        Initialize client
+
+        Args:
+            base_url: API base URL, e.g. http://queue-host:8080
+            api_key: API key (default from config)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key or config.API_KEY
+        self.account_id = None
+        self.attachments = AttachmentCache(self)
+        self.on_jobs_changed = None  # Callback(events) when a held job is paused or stopped
+
+        self._lock = threading.Lock()
+        self._claims = deque()  # Claimed messages not yet handed to the worker
+        self._held = {}  # message_id -> message, claimed and not yet reported
+        self._results = []  # Buffered results
+        self._decisions = []  # Buffered pacing decisions
+        self._jobs = {}  # job_id -> (job row, monotonic time received)
+        self._top_priority = 0
+        self._pacing_state = None
+        self._settings_version = None
+        self._kick = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- HTTP ----
+
+    def _open(self, method, path, payload=None):
+        """
+        Send a request to the API
+
+        Returns:
+            HTTP response (caller closes it), or None for 404
+
+        Raises:
+            ConnectionError: If the API is unreachable or returns an error
+        """
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={'X-API-KEY': self.api_key, 'Content-Type': 'application/json'}
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=config.REMOTE_TIMEOUT)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise ConnectionError(f"{method} {path} failed: HTTP {e.code} {e.read()[:200]!r}")
+        except OSError as e:
+            raise ConnectionError(f"{method} {path} failed: {str(e)}")
+
+    def _request(self, method, path, payload=None):
+        """
+        Send a JSON request to the API
+
+        Returns:
+            Decoded JSON response, or None for 404
+        """
+        response = self._open(method, path, payload)
+        if response is None:
+            return None
+        with response:
+            return json.loads(response.read() or b'null')
+
+    def _post_lease(self, path, payload):
+        """
+        POST to a lease endpoint on behalf of this client's account
+        """
+        return self._request('POST', path, dict(payload, account_id=self.account_id))
+
+    # ---- Lifecycle ----
+
+    def register_account(self, account_id, profile_dir=None, pid=None):
+        """
+        Register the account and start the heartbeat thread
+        The API also releases the previous run's claims
+        """
+        self.account_id = account_id
+        result = self._post_lease('/lease/register', {'profile_dir': profile_dir, 'pid': pid})
+        self._pacing_state = result.get('pacing_state')
+        self._settings_version = result.get('settings_version')
+
+        if not self._thread:
+            self._thread = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+            self._thread.start()
+        logger.info(f"Registered account {account_id} with {self.base_url}")
+
+    def close(self):
+        """
+        Stop the heartbeat thread and report what is still buffered
+        """
+        self._stop.set()
+        self._kick.set()
+        if self._thread:
+            self._thread.join(timeout=config.REMOTE_TIMEOUT)
+            self._thread = None
+        try:
+            self.flush()
+        except ConnectionError as e:
+            logger.warning(f"Final result report failed: {str(e)}")
+
+    def _heartbeat_loop(self):
+        """
+        Background thread: flush results and renew leases
+        """
+        while not self._stop.is_set():
+            self._kick.wait(config.REMOTE_HEARTBEAT_INTERVAL)
+            self._kick.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+                self._heartbeat()
+            except ConnectionError as e:
+                logger.warning(f"Lease heartbeat failed: {str(e)}")
+
+    def _heartbeat(self, **fields):
+        """
+        Renew held leases, optionally storing account state
+
+        Args:
+            fields: status, circuit, metrics or pacing_state for /lease/heartbeat
+        """
+        with self._lock:
+            message_ids = list(self._held)
+        result = self._post_lease('/lease/heartbeat', dict(fields, message_ids=message_ids))
+        self._apply_lease(result)
+
+        lost = set(message_ids) - set(result.get('held') or [])
+        if lost:
+            with self._lock:
+                for message_id in lost:
+                    self._held.pop(message_id, None)
+                self._claims = deque(m for m in self._claims if m['message_id'] not in lost)
+            logger.warning(f"Lost the lease on messages {sorted(lost)} - they will not be sent by this worker")
+
+    def _send_state(self, **fields):
+        """
+        Store account state right away (status, circuit, metrics, pacing)
+        """
+        try:
+            self._heartbeat(**fields)
+        except ConnectionError as e:
+            logger.warning(f"Could not report {', '.join(fields)}: {str(e)}")
+
+    def _apply_lease(self, result):
+        """
+        Take job rows and the priority-lane head from a lease response
+        Held jobs that became paused or stopped are passed to on_jobs_changed
+        """
+        now = time.monotonic()
+        events = []
+        with self._lock:
+            self._top_priority = result.get('top_priority') or 0
+            self._settings_version = result.get('settings_version', self._settings_version)
+            for job_id, job in (result.get('jobs') or {}).items():
+                job_id = int(job_id)
+                previous = self._jobs.get(job_id)
+                self._jobs[job_id] = (job, now)
+                if job and previous and previous[0] and previous[0]['status'] != job['status']:
+                    if job['status'] == config.JOB_STATUS_PAUSED:
+                        events.append((EVENT_PAUSE, job_id))
+                    elif job['status'] == config.JOB_STATUS_STOPPED:
+                        events.append((EVENT_STOP, job_id))
+        if events and self.on_jobs_changed:
+            self.on_jobs_changed(events)
+
+    # ---- Claims ----
+
+    def claim_next_message(self, account_id, job_id=None):
+        """
+        Hand out the next claimed message, fetching a batch when needed
+        A priority-lane message newer than the prefetched ones is fetched first
+
+        Returns:
+            Message dict, or None if nothing is pending
+        """
+        with self._lock:
+            head = self._claims[0] if self._claims else None
+        if head is None:
+            self._fetch_claims(config.REMOTE_CLAIM_BATCH)
+        elif self._top_priority > (head.get('priority') or 0):
+            self._fetch_claims(1, urgent=True)
+
+        with self._lock:
+            return self._claims.popleft() if self._claims else None
+
+    def _fetch_claims(self, limit, urgent=False):
+        """
+        Claim messages through the API
+
+        Args:
+            limit: Messages to claim
+            urgent: Put them before the prefetched ones
+        """
+        result = self._post_lease('/lease/claim', {'limit': limit})
+        self._apply_lease(result)
+
+        messages = []
+        for message in result.get('messages') or []:
+            with self._lock:
+                self._held[message['message_id']] = message
+            if message.get('attachment_sha256'):
+                try:
+                    message['attachment_path'] = self.attachments.fetch(
+                        message['attachment_sha256'], message.get('attachment_name')
+                    )
+                except ConnectionError as e:
+                    logger.warning(f"Attachment of message {message['message_id']} unavailable: {str(e)}")
+                    self.release_message(message['message_id'], self.account_id)
+                    continue
+            messages.append(message)
+
+        with self._lock:
+            if urgent:
+                self._claims.extendleft(reversed(messages))
+            else:
+                self._claims.extend(messages)
+
+    def has_priority_pending(self, above=0, account_id=None):
+        """
+        Check the priority-lane head seen in the last lease response
+        (the API computes it for this client's account)
+
+        Returns:
+            True if a message with priority greater than `above` was pending
+        """
+        return self._top_priority > above
+
+    def release_claims(self, account_id=None, older_than_seconds=None):
+        """
+        Return this account's claims to the queue
+        Expired leases are reaped by the API on every claim, so calls with
+        only older_than_seconds are no-ops here
+
+        Returns:
+            Number of prefetched messages returned
+        """
+        if account_id is None:
+            return 0
+        if not self.account_id:
+            return 0  # Not registered yet - /lease/register already released them
+
+        with self._lock:
+            released = len(self._claims)
+            self._claims.clear()
+            results, self._results = self._results, []
+            decisions, self._decisions = self._decisions, []
+        self._post_lease('/lease/report', {
+            'results': results, 'pacing_decisions': decisions, 'release_all': True
+        })
+        with self._lock:
+            self._held.clear()
+        return released
+
+    def recover_interrupted_sends(self, account_id, verify=None):
+        """
+        Resolve the sends this account's previous run left ambiguous
+        The chats are checked here (verify); the API records the outcomes
+
+        Args:
+            account_id: ID of the account
+            verify: Optional callable(send) -> True/False/None; without it
+                every interrupted send is failed as delivery unknown
+
+        Returns:
+            Number of messages resolved
+        """
+        if verify is None:
+            return self._post_lease('/lease/resolve', {'resolutions': None})['resolved']
+
+        resolutions = []
+        for send in self._post_lease('/lease/interrupted', {})['sends']:
+            try:
+                delivered = verify(send)
+            except Exception as e:
+                logger.error(f"Could not verify interrupted send {send['message_id']}: {str(e)}")
+                delivered = None
+            resolutions.append({'message_id': send['message_id'], 'delivered': delivered})
+        if not resolutions:
+            return 0
+
+        resolved = self._post_lease('/lease/resolve', {'resolutions': resolutions})['resolved']
+        logger.warning(f"Account {account_id} recovered {resolved} interrupted sends")
+        return resolved
+
+    # ---- Results ----
+
+    def mark_sending(self, message_id, account_id):
+        """
+        Record the send intent (synchronous, carries buffered results)
+
+        Returns:
+            True if the lease was still held and the intent recorded
+        """
+        with self._lock:
+            results, self._results = self._results, []
+            decisions, self._decisions = self._decisions, []
+        results.append({'message_id': message_id, 'outcome': OUTCOME_SENDING})
+
+        try:
+            response = self._post_lease('/lease/report', {'results': results, 'pacing_decisions': decisions})
+        except ConnectionError as e:
+            with self._lock:
+                self._results[:0] = results[:-1]
+                self._decisions[:0] = decisions
+            logger.warning(f"Send intent for message {message_id} not recorded: {str(e)}")
+            return False
+
+        outcomes = response['results']
+        self._log_rejected(outcomes[:-1])
+        return outcomes[-1]['ok']
+
+    def mark_sent(self, message_id):
+        """
+        Buffer a sent result
+        """
+        self._buffer_result(message_id, OUTCOME_SENT)
+
+    def mark_failed(self, message_id, error_message=None):
+        """
+        Buffer a failed attempt
+
+        Returns:
+            Expected retry count after the failure
+        """
+        with self._lock:
+            message = self._held.get(message_id)
+        self._buffer_result(message_id, OUTCOME_FAILED, error_message)
+        return (message.get('retry_count') or 0) + 1 if message else 1
+
+    def release_message(self, message_id, account_id=None):
+        """
+        Buffer a release (message goes back to the queue unattempted)
+        The API only applies it while this client's account holds the claim
+        """
+        self._buffer_result(message_id, OUTCOME_RELEASED)
+
+    def _buffer_result(self, message_id, outcome, error_message=None):
+        """
+        Queue a result for the next report; a full batch wakes the heartbeat thread
+        """
+        with self._lock:
+            self._held.pop(message_id, None)
+            self._results.append({
+                'message_id': message_id, 'outcome': outcome, 'error_message': error_message
+            })
+            if len(self._results) >= config.REMOTE_REPORT_BATCH:
+                self._kick.set()
+
+    def record_pacing_decision(self, account_id, job_id, decision, state):
+        """
+        Buffer a pacing decision for the next report
+        """
+        with self._lock:
+            self._decisions.append({'job_id': job_id, 'decision': decision, 'state': state})
+
+    def flush(self):
+        """
+        Report buffered results and pacing decisions
+
+        Raises:
+            ConnectionError: If the API is unreachable (results stay buffered)
+        """
+        with self._lock:
+            results, self._results = self._results, []
+            decisions, self._decisions = self._decisions, []
+        if not results and not decisions:
+            return
+
+        try:
+            response = self._post_lease('/lease/report', {'results': results, 'pacing_decisions': decisions})
+        except ConnectionError:
+            with self._lock:
+                self._results[:0] = results
+                self._decisions[:0] = decisions
+            raise
+        self._log_rejected(response['results'])
+
+    def _log_rejected(self, outcomes):
+        """
+        Warn about results the API rejected because the lease was lost
+        """
+        rejected = [outcome['message_id'] for outcome in outcomes if not outcome['ok']]
+        if rejected:
+            logger.warning(f"Results for messages {rejected} rejected - lease no longer held")
+
+    # ---- Runtime settings ----
+
+    def get_settings_version(self):
+        """
+        Get the settings version seen in the last lease response
+        """
+        return self._settings_version
+
+    def get_runtime_settings(self):
+        """
+        Get the stored runtime setting overrides from the API
+
+        Returns:
+            Dict with version and overrides
+        """
+        return self._request('GET', '/settings')
+
+    # ---- Account state ----
+
+    def get_pacing_state(self, account_id):
+        """
+        Get the pacing checkpoint returned by /lease/register
+        """
+        return self._pacing_state
+
+    def save_pacing_state(self, account_id, state):
+        """
+        Checkpoint pacing state on the API
+        """
+        self._send_state(pacing_state=state)
+
+    def update_account_status(self, account_id, status):
+        """
+        Update the account status on the API
+        """
+        self._send_state(status=status)
+
+    def update_account_circuit(self, account_id, state, reason=None):
+        """
+        Update the account's circuit breaker state on the API
+        """
+        self._send_state(circuit={'state': state, 'reason': reason})
+
+    def record_browser_metrics(self, account_id, sample):
+        """
+        Store a browser resource sample on the API
+        """
+        self._send_state(metrics=sample)
+
+    def worker_heartbeat(self, worker_id, account_id, current_job_id=None, host=None, pid=None):
+        """
+        Heartbeat this worker into the API's registry
+        """
+        self._send_state(worker={
+            'worker_id': worker_id, 'current_job_id': current_job_id, 'host': host, 'pid': pid
+        })
+
+    def deregister_worker(self, worker_id):
+        """
+        Mark this worker stopped in the API's registry
+        """
+        self._send_state(worker={'worker_id': worker_id, 'status': config.WORKER_STATUS_STOPPED})
+
+    def reap_stale_workers(self, stale_after_seconds=None):
+        """
+        Stale workers are reaped by the API on every claim and heartbeat
+
+        Returns:
+            Empty list
+        """
+        return []
+
+    # ---- Jobs ----
+
+    def get_job_status(self, job_id):
+        """
+        Get a job row from the API
+
+        Returns:
+            Job dict, or None if not found
+        """
+        job = self._request('GET', f'/status/{job_id}')
+        with self._lock:
+            self._jobs[job_id] = (job, time.monotonic())
+        return job
+
+    def cached_job(self, job_id, max_age):
+        """
+        Get a job row seen in a lease response or fetch it
+
+        Args:
+            job_id: ID of the job
+            max_age: Seconds a received row is trusted
+        """
+        with self._lock:
+            entry = self._jobs.get(job_id)
+        if entry and time.monotonic() - entry[1] < max_age:
+            return entry[0]
+        return self.get_job_status(job_id)
+
+    def forget_job(self, job_id=None):
+        """
+        Drop received job rows (all if job_id is None)
+        """
+        with self._lock:
+            if job_id is None:
+                self._jobs.clear()
+            else:
+                self._jobs.pop(job_id, None)
+
+    def get_active_jobs(self):
+        """
+        Get running, paused and waiting jobs from the API
+        """
+        return self._request('GET', '/jobs')['jobs']
+
+    def get_paused_jobs(self, reason_prefix):
+        """
+        Get paused jobs whose pause reason starts with a prefix
+        """
+        return [
+            job for job in self.get_active_jobs()
+            if job['status'] == config.JOB_STATUS_PAUSED and (job.get('pause_reason') or '').startswith(reason_prefix)
+        ]
+
+    def pause_job(self, job_id, reason=None):
+        """
+        Pause a job on the API (e.g. when the circuit breaker trips)
+        """
+        self._request('POST', f'/pause/{job_id}', {'reason': reason})
+
+    def resume_job(self, job_id):
+        """
+        Resume a job on the API
+        """
+        self._request('POST', f'/resume/{job_id}', {})
+
+    def start_job(self, job_id):
+        """
+        Jobs are started by the API when it hands out their first messages
+        """
+        self.forget_job(job_id)
+
+    def update_job_status(self, job_id, status, started_at=None, completed_at=None):
+        """
+        Not forwarded: job status changes on session loss are local to one
+        host, and a remote account losing its session must not hold jobs for
+        the rest of the fleet - its account status reports the loss instead
+        """
+        logger.debug(f"Job {job_id} status {status} not forwarded by remote worker")
+
+class RemoteJobCache:
+    """
+    JobCache replacement for remote workers
+    Job rows arrive with every claim and heartbeat, so a row is trusted for
+    two heartbeat intervals before it is fetched again
+    """
+
+    def __init__(self, client, max_age=None):
+        """
+        Initialize cache
+
+        Args:
+            client: RemoteQueueClient
+            max_age: Seconds a row is trusted (default: two heartbeat intervals)
+        """
+        self.client = client
+        self.max_age = max_age or config.REMOTE_HEARTBEAT_INTERVAL * 2
+
+    def get(self, job_id):
+        """
+        Get a job row
+
+        Returns:
+            Job dict, or None if not found
+        """
+        return self.client.cached_job(job_id, self.max_age)
+
+    def invalidate(self, job_id=None):
+        """
+        Drop cached rows
+        """
+        self.client.forget_job(job_id)
+
+    def close(self):
+        """
+        Nothing to close - rows live in the client
+        """
+
+class AttachmentCache:
+    """
+    Local copies of attachments, fetched from the API once per content hash
+    Stored as <cache>/<sha256>/<original name> so the recipient sees the real file name
+    """
+
+    def __init__(self, client, directory=None):
+        """
+        Initialize cache
+
+        Args:
+            client: RemoteQueueClient used for downloads
+            directory: Cache directory (default from config)
+        """
+        self.client = client
+        self.directory = directory or config.REMOTE_ATTACHMENT_CACHE
+
+    def fetch(self, digest, name=None):
+        """
+        Get the local path of an attachment, downloading it if needed
+
+        Args:
+            digest: SHA-256 hex digest from the claim
+            name: Original file name
+
+        Returns:
+            Local file path
+
+        Raises:
+            ConnectionError: If the download fails or does not match the digest
+        """
+        if len(digest) != 64 or any(c not in '0123456789abcdef' for c in digest):
+            raise ConnectionError(f"Invalid attachment digest {digest!r}")
+
+        folder = os.path.join(self.directory, digest)
+        path = os.path.join(folder, os.path.basename(name or '').strip('. ') or 'attachment')
+        if os.path.isfile(path):
+            return path
+
+        os.makedirs(folder, exist_ok=True)
+        response = self.client._open('GET', f'/lease/attachments/{digest}')
+        if response is None:
+            raise ConnectionError(f"Attachment {digest} not found on the API")
+
+        partial = f"{path}.part"
+        sha = hashlib.sha256()
+        with response, open(partial, 'wb') as f:
+            for block in iter(lambda: response.read(1024 * 1024), b''):
+                sha.update(block)
+                f.write(block)
+        if sha.hexdigest() != digest:
+            os.remove(partial)
+            raise ConnectionError(f"Attachment {digest} failed its hash check")
+
+        os.replace(partial, path)
+        logger.info(f"Cached attachment {name} ({digest[:12]})")
+        return path
+
+def run_remote_worker(server_url, api_key=None, account_id=None, profile_dir=None, use_async=False):
+    """
+    Run a worker that claims work through the API's lease endpoints
+
+    Args:
+        server_url: API base URL
+        api_key: API key (default from config)
+        account_id: Account ID this worker sends as (default from config)
+        profile_dir: Chrome profile directory (optional)
+        use_async: Run the asyncio runtime
+    """
+    if use_async:
+        from worker.async_worker import AsyncWorker as Worker
+    else:
+        from worker.worker import Worker
+
+    client = RemoteQueueClient(server_url, api_key)
+    worker = Worker(
+        account_id=account_id, profile_dir=profile_dir,
+        queue_manager=client, job_cache=RemoteJobCache(client)
+    )
+    # Pause/stop seen in heartbeats interrupt a paced send like local notifications
+    client.on_jobs_changed = worker.clock.interrupt
+    try:
+        worker.start()
+    finally:
+        client.close()
@@ -5,8 +5,12 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from utils.logger import logger
+from utils.message_fingerprint import bubble_times
 import config
 
+# Error returned when before_send declines the send (nothing was sent)
+SEND_ABANDONED = "Send abandoned before ENTER"
+
 
 class MessageSender:
 
@@ -17,21 +21,26 @@ class MessageSender:
     # =====================================================
     # PUBLIC
     # =====================================================
-    def send_message(self, phone_number, message_text=None, attachment_path=None):
+    def send_message(self, phone_number, message_text=None, attachment_path=None, before_send=None):
+        # before_send (optional) is called right before the final ENTER so
+        # pacing can hold the send while navigation and typing already happened;
+        # returning False abandons the send (result SEND_ABANDONED).
+        # Chats are opened one at a time in the single tab: WhatsApp Web
+        # allows one active tab per session (a second one shows "Use here"
+        # and can take the session over), so the next chat is not pre-opened.
         try:
-            phone = phone_number.replace("+", "").replace(" ", "")
-            url = config.WHATSAPP_SEND_URL_TEMPLATE.format(phone)
-
-            logger.info(f"Opening chat URL for {phone_number}")
-            self.driver.get(url)
-            time.sleep(1)
+            self._navigate(phone_number)
 
             if attachment_path:
-                return self._send_attachment(attachment_path, message_text)
+                return self._send_attachment(attachment_path, message_text, before_send)
 
             if message_text:
                 box = self._wait_footer_box()
                 box.send_keys(message_text)
+
+                if before_send and before_send() is False:
+                    box.send_keys(Keys.CONTROL + "a", Keys.DELETE)
+                    return False, SEND_ABANDONED
                 box.send_keys(Keys.ENTER)
                 return True, "Text sent"
 
@@ -39,12 +48,46 @@ class MessageSender:
 
         except Exception as e:
             logger.error(f"Send failed: {e}")
-            return False, str(e)
+            # Keep the exception type so failures can be classified later
+            return False, f"{type(e).__name__}: {e}"
+
+    # =====================================================
+    # RECOVERY
+    # =====================================================
+    def last_outgoing_message(self, phone_number):
+        # Newest outgoing bubble in the chat as {'text', 'sent_at'}: text is
+        # '' for media without a caption, sent_at the local times its header
+        # may mean (see bubble_times; empty if unreadable). None if the chat
+        # shows no outgoing bubble. Raises if the chat does not load.
+        # Used after a crash to tell whether an interrupted send went out.
+        self._navigate(phone_number)
+        self._wait_footer_box()
+
+        bubbles = self.driver.find_elements(By.XPATH, "//div[contains(@class,'message-out')]")
+        if not bubbles:
+            return None
+        spans = bubbles[-1].find_elements(By.XPATH, ".//span[contains(@class,'selectable-text')]")
+        headers = bubbles[-1].find_elements(By.XPATH, ".//div[@data-pre-plain-text]")
+        return {
+            'text': spans[-1].text if spans else "",
+            'sent_at': bubble_times(headers[-1].get_attribute('data-pre-plain-text')) if headers else [],
+        }
+
+    # =====================================================
+    # NAVIGATION
+    # =====================================================
+    def _navigate(self, phone_number):
+        phone = phone_number.replace("+", "").replace(" ", "")
+        url = config.WHATSAPP_SEND_URL_TEMPLATE.format(phone)
+
+        logger.info(f"Opening chat URL for {phone_number}")
+        self.driver.get(url)
+        time.sleep(1)
 
     # =====================================================
     # ATTACHMENT (FINAL FIX)
     # =====================================================
-    def _send_attachment(self, path, caption=None):
+    def _send_attachment(self, path, caption=None, before_send=None):
         path = os.path.abspath(path)
         if not os.path.exists(path):
             return False, "File not found"
@@ -87,6 +130,9 @@ class MessageSender:
         # 🔥 SEND USING ACTIVE ELEMENT (NOT FOOTER)
         logger.info("Sending using ENTER on active element")
         time.sleep(0.2)
+        if before_send and before_send() is False:
+            self.driver.switch_to.active_element.send_keys(Keys.ESCAPE)
+            return False, SEND_ABANDONED
         self.driver.switch_to.active_element.send_keys(Keys.ENTER)
 
         logger.info("Attachment sent")
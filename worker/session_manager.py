@@ -7,24 +7,122 @@ import os
 import time
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from worker.clock import InterruptibleClock
 from utils.logger import logger
 import config
 
+# Page states reported by SessionManager.probe_state()
+SESSION_STATE_LOGGED_IN = 'logged_in'
+SESSION_STATE_QR = 'qr'
+SESSION_STATE_LOADING = 'loading'
+SESSION_STATE_UNKNOWN = 'unknown'
+SESSION_STATE_DEAD = 'dead'
+
+# Single round-trip probe - CSS lookups only, no XPath
+SESSION_PROBE_SCRIPT = """
+if (document.querySelector("#side, div[contenteditable='true'][data-tab='3']")) {
+    return 'logged_in';
+}
+if (document.querySelector("div[data-ref], canvas[aria-label]")) {
+    return 'qr';
+}
+if (document.readyState !== 'complete' || document.querySelector("progress, #startup, #initial_startup")) {
+    return 'loading';
+}
+return 'unknown';
+"""
+
+class HealthCheckSchedule:
+    """
+    Adaptive session health-check schedule
+    Backs off while sends keep succeeding and probes eagerly after failures
+    """
+    
+    def __init__(self, min_interval=None, max_interval=None):
+        """
+        Initialize schedule
+        
+        Args:
+            min_interval: Check interval after failures (default from config)
+            max_interval: Longest interval while healthy (default from config)
+        """
+        self.min_interval = min_interval or config.SESSION_CHECK_INTERVAL
+        self.max_interval = max_interval or config.SESSION_CHECK_INTERVAL_MAX
+        self.interval = self.min_interval
+        self.last_check = time.monotonic()
+    
+    def apply_settings(self):
+        """
+        Re-read the interval bounds from config (runtime settings changed)
+        """
+        self.min_interval = config.SESSION_CHECK_INTERVAL
+        self.max_interval = config.SESSION_CHECK_INTERVAL_MAX
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+    
+    def due(self):
+        """
+        Check whether a health check should run now
+        
+        Returns:
+            True if the current interval has elapsed
+        """
+        return time.monotonic() - self.last_check >= self.interval
+    
+    def time_until_due(self):
+        """
+        Get the seconds until the next health check is due
+        
+        Returns:
+            Seconds to wait (negative when overdue)
+        """
+        return self.last_check + self.interval - time.monotonic()
+    
+    def checked(self, healthy):
+        """
+        Record the result of a health check
+        
+        Args:
+            healthy: True if the session was logged in
+        """
+        self.last_check = time.monotonic()
+        if not healthy:
+            self.interval = self.min_interval
+    
+    def record_success(self):
+        """
+        A send succeeded - the session is evidently fine, so check less often
+        """
+        self.interval = min(self.max_interval, self.interval * 2)
+    
+    def record_failure(self):
+        """
+        A send failed - check the session before the next send
+        """
+        self.interval = self.min_interval
+        self.last_check = time.monotonic() - self.interval
+
 class SessionManager:
     """
     Manages WhatsApp Web session lifecycle
     Handles login detection, session health, and reconnection
     """
     
-    def __init__(self):
+    def __init__(self, profile_dir=None, lean=None, clock=None):
         """
         Initialize session manager
+        
+        Args:
+            profile_dir: Chrome profile directory (default: ./chrome_profile)
+            lean: Run the resource-lean headless browser (default from config)
+            clock: InterruptibleClock used for waits (default: a private one)
         """
+        self.clock = clock or InterruptibleClock()
+        self.profile_dir = profile_dir or "./chrome_profile"
+        self.lean = config.CHROME_LEAN_MODE if lean is None else lean
         self.driver = None
         self.is_logged_in = False
+        self.started_at = None  # time.monotonic() of the current browser start
+        self.messages_sent = 0  # Messages sent by the current browser
         self._init_chrome_options()
     
     def _init_chrome_options(self):
@@ -33,16 +131,26 @@ class SessionManager:
         """
         self.chrome_options = Options()
         
-        # Use persistent profile (relative path like original)
-        chrome_profile_dir = "./chrome_profile"
-        os.makedirs(chrome_profile_dir, exist_ok=True)
-        self.chrome_options.add_argument(f"--user-data-dir={chrome_profile_dir}")
+        # Use persistent profile (one per account so logins stay separate)
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self.chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
         
         # Chrome options for stability (matching original working config)
         self.chrome_options.add_argument("--disable-blink-features=AutomationControlled")
         self.chrome_options.add_argument("--no-sandbox")
         self.chrome_options.add_argument("--disable-dev-shm-usage")
         
+        # Lean mode: no visible window, extensions or animations
+        if self.lean:
+            width, height = config.CHROME_WINDOW_SIZE
+            self.chrome_options.add_argument("--headless=new")
+            self.chrome_options.add_argument(f"--window-size={width},{height}")
+            self.chrome_options.add_argument("--disable-extensions")
+            self.chrome_options.add_argument("--disable-gpu")
+            self.chrome_options.add_argument("--force-prefers-reduced-motion")
+            self.chrome_options.add_argument("--mute-audio")
+            self.chrome_options.add_argument("--disable-background-networking")
+        
         # Experimental options
         self.chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         self.chrome_options.add_experimental_option('useAutomationExtension', False)
@@ -59,25 +167,30 @@ class SessionManager:
             # Use Selenium Manager (built-in with Selenium 4.6+) - automatically handles driver setup
             self.driver = webdriver.Chrome(options=self.chrome_options)
             
+            self.started_at = time.monotonic()
+            self.messages_sent = 0
+            
             # Small delay to let Chrome fully initialize
-            time.sleep(2)
+            self.clock.sleep(2)
             
-            # Maximize window (works better than --start-maximized on macOS)
-            try:
-                self.driver.maximize_window()
-            except Exception as e:
-                logger.debug(f"Could not maximize window: {str(e)}")
-                # Fallback if maximize doesn't work
+            # Maximize window (works better than --start-maximized on macOS);
+            # lean mode keeps the small --window-size
+            if not self.lean:
                 try:
-                    self.driver.set_window_size(1920, 1080)
-                except:
-                    pass
+                    self.driver.maximize_window()
+                except Exception as e:
+                    logger.debug(f"Could not maximize window: {str(e)}")
+                    # Fallback if maximize doesn't work
+                    try:
+                        self.driver.set_window_size(1920, 1080)
+                    except:
+                        pass
             
             logger.info("Navigating to WhatsApp Web...")
             self.driver.get(config.WHATSAPP_BASE_URL)
             
             # Small delay after navigation to let page load
-            time.sleep(2)
+            self.clock.sleep(2)
             
             return True
         except Exception as e:
@@ -106,29 +219,38 @@ class SessionManager:
             return False
         
         timeout = timeout or config.SESSION_TIMEOUT
-        wait = WebDriverWait(self.driver, timeout)
+        deadline = time.monotonic() + timeout
         
-        try:
-            # Look for indicators that user is logged in
-            # Search box, chat list, or side panel indicates login
-            search_box = wait.until(
-                EC.any_of(
-                    EC.presence_of_element_located((By.XPATH, "//div[@contenteditable='true'][@data-tab='3']")),
-                    EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'search')]")),
-                    EC.presence_of_element_located((By.XPATH, "//div[@id='side']"))
-                )
-            )
-            
-            if search_box:
+        # Poll the cheap JS probe until logged in (QR scan may take a while)
+        while True:
+            state = self.probe_state()
+            if state == SESSION_STATE_LOGGED_IN:
                 logger.info("Login detected - user is logged in")
                 self.is_logged_in = True
                 return True
-        except Exception as e:
-            logger.debug(f"Login check: {str(e)}")
+            if state == SESSION_STATE_DEAD or self.clock.stopped or time.monotonic() >= deadline:
+                break
+            self.clock.sleep(min(1, max(0, deadline - time.monotonic())))
         
         self.is_logged_in = False
         return False
     
+    def probe_state(self):
+        """
+        Determine the WhatsApp Web page state in one execute_script round trip
+        
+        Returns:
+            One of the SESSION_STATE_* constants
+        """
+        if not self.driver:
+            return SESSION_STATE_DEAD
+        
+        try:
+            return self.driver.execute_script(SESSION_PROBE_SCRIPT) or SESSION_STATE_UNKNOWN
+        except Exception as e:
+            logger.warning(f"Session probe failed (browser closed or crashed): {str(e)}")
+            return SESSION_STATE_DEAD
+    
     def wait_for_login(self, timeout=None):
         """
         Wait for user to scan QR code and log in
@@ -146,6 +268,12 @@ class SessionManager:
         if self.check_login_status(timeout=5):
             return True
         
+        if self.lean:
+            logger.warning(
+                "Not logged in and running headless - the QR code cannot be scanned. "
+                "Log in once with CHROME_LEAN_MODE disabled for this profile"
+            )
+        
         # Wait for login with longer timeout
         return self.check_login_status(timeout=timeout)
     
@@ -174,38 +302,21 @@ class SessionManager:
         Returns:
             True if still logged in, False if logged out or session dead
         """
-        if not self.is_session_alive():
-            self.is_logged_in = False
-            return False
+        state = self.probe_state()
         
-        try:
-            # Quick check: look for search box or chat list
-            wait = WebDriverWait(self.driver, config.LOGIN_CHECK_TIMEOUT)
-            search_box = wait.until(
-                EC.any_of(
-                    EC.presence_of_element_located((By.XPATH, "//div[@contenteditable='true'][@data-tab='3']")),
-                    EC.presence_of_element_located((By.XPATH, "//div[@id='side']"))
-                )
-            )
-            
-            if search_box:
-                self.is_logged_in = True
-                return True
-        except Exception:
-            pass
+        # Only keep probing while the page is still loading (mid-navigation);
+        # unknown, QR and dead are answers, not reasons to wait
+        deadline = time.monotonic() + config.LOGIN_CHECK_TIMEOUT
+        while (state == SESSION_STATE_LOADING
+               and not self.clock.stopped and time.monotonic() < deadline):
+            self.clock.sleep(config.SESSION_PROBE_POLL)
+            state = self.probe_state()
         
-        # Check for QR code (logged out)
-        try:
-            qr_elements = self.driver.find_elements(By.XPATH, "//div[@data-ref] | //canvas")
-            if qr_elements:
-                logger.warning("QR code detected - user logged out")
-                self.is_logged_in = False
-                return False
-        except:
-            pass
+        if state == SESSION_STATE_QR:
+            logger.warning("QR code detected - user logged out")
         
-        self.is_logged_in = False
-        return False
+        self.is_logged_in = state == SESSION_STATE_LOGGED_IN
+        return self.is_logged_in
     
     def get_driver(self):
         """
@@ -230,6 +341,41 @@ class SessionManager:
                 self.driver = None
                 self.is_logged_in = False
     
+    def record_message(self):
+        """
+        Count a message handled by the current browser (for recycling)
+        """
+        self.messages_sent += 1
+    
+    def recycle_due(self):
+        """
+        Check whether the browser has reached its recycling limits
+        
+        Returns:
+            True if BROWSER_RECYCLE_MESSAGES or BROWSER_RECYCLE_HOURS was reached
+        """
+        if not self.driver or self.started_at is None:
+            return False
+        if config.BROWSER_RECYCLE_MESSAGES and self.messages_sent >= config.BROWSER_RECYCLE_MESSAGES:
+            return True
+        if config.BROWSER_RECYCLE_HOURS:
+            return time.monotonic() - self.started_at >= config.BROWSER_RECYCLE_HOURS * 3600
+        return False
+    
+    def recycle(self):
+        """
+        Replace the browser with a fresh one on the same profile
+        The persisted profile keeps the login, so no QR rescan is needed
+        
+        Returns:
+            True if the new browser is logged in
+        """
+        hours = (time.monotonic() - self.started_at) / 3600 if self.started_at else 0
+        logger.info(f"Recycling browser after {self.messages_sent} messages / {hours:.1f} hours")
+        if not self.restart_session():
+            return False
+        return self.wait_for_login(timeout=30)
+    
     def restart_session(self):
         """
         Restart the browser session (close and reopen)
@@ -239,5 +385,5 @@ class SessionManager:
         """
         logger.info("Restarting browser session...")
         self.close_session()
-        time.sleep(2)  # Brief pause before restart
+        self.clock.sleep(2)  # Brief pause before restart
         return self.start_session()
@@ -0,0 +1,395 @@
+"""
+Campaign ETA simulator
+Models a worker's send loop - token-bucket pacing (DelayGenerator), adaptive
+targets (AdaptivePacer), long pauses, browser time per send and retries - on a
+virtual clock. estimate() works analytically, so it answers in constant time
+however many messages a job has. simulate() replays single sends with a
+seeded generator and is meant for checking estimates on small jobs.
+
+Not modelled: quiet-hours deferral, circuit-breaker pauses, logins and
+browser recycling. The live forecast blends in observed rates to cover them.
+"""
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from worker.pacing import AdaptivePacer, PACING_BACKOFF
+from utils.error_classifier import ERROR_CLASS_THROTTLED, ERROR_CLASS_OTHER
+from utils.timezones import SQLITE_UTC_FORMAT
+import config
+
+# z-score of the 10th/90th percentile (normal approximation of the total time)
+_Z90 = 1.2816
+
+# Expected-value steps after which an adaptive target that is still moving
+# is treated as settled
+_MAX_SETTLE_STEPS = 10000
+
+def expected_attempts(failure_rate, attempts_left):
+    """
+    Get the mean and variance of send attempts for one message
+    A failed attempt is retried until the message has used MAX_RETRY_ATTEMPTS
+
+    Args:
+        failure_rate: Probability that one attempt fails
+        attempts_left: Attempts the message may still use
+
+    Returns:
+        (mean, variance) tuple
+    """
+    if attempts_left <= 0:
+        return 0.0, 0.0
+
+    mean = second = 0.0
+    for k in range(1, attempts_left + 1):
+        # Attempt k happens after k-1 failures; the last allowed one always ends it
+        probability = failure_rate ** (k - 1) * ((1 - failure_rate) if k < attempts_left else 1)
+        mean += k * probability
+        second += k * k * probability
+    return mean, max(0.0, second - mean * mean)
+
+def _interval_moments(low, high, floor):
+    """
+    Get the mean and variance of max(uniform(low, high), floor)
+    The bucket refill (low..high) hides browser time (floor) unless it is longer
+
+    Returns:
+        (mean, variance) tuple
+    """
+    if high <= low or floor >= high:
+        value = max(low, floor)
+        return value, 0.0
+    if floor <= low:
+        return (low + high) / 2, (high - low) ** 2 / 12
+
+    width = high - low
+    mean = (floor * (floor - low) + (high ** 2 - floor ** 2) / 2) / width
+    second = (floor ** 2 * (floor - low) + (high ** 3 - floor ** 3) / 3) / width
+    return mean, max(0.0, second - mean * mean)
+
+class CampaignSimulator:
+    """
+    Virtual-clock model of one job's sends spread over `accounts` workers
+    Each worker paces its own sends, so accounts split the attempts evenly;
+    a fractional value models a job's fair share of the pool.
+    """
+
+    def __init__(self, delay_min=None, delay_max=None, failure_rate=0.0, throttle_share=0.0,
+                 accounts=1, send_seconds=None, adaptive=None, pacing_position=None,
+                 message_count=0):
+        """
+        Initialize simulator
+
+        Args:
+            delay_min: Job's minimum delay in seconds (default from config)
+            delay_max: Job's maximum delay in seconds (default from config)
+            failure_rate: Probability that a send attempt fails (0..1)
+            throttle_share: Share of failures that are throttling (trigger a pacing back-off)
+            accounts: Workers sending for the job (may be fractional)
+            send_seconds: Browser time per send (default from config)
+            adaptive: Model adaptive pacing (default from config)
+            pacing_position: Starting pacer position (default from config)
+            message_count: Sends already made by each worker (long-pause cadence)
+
+        Raises:
+            ValueError: If a parameter is out of range
+        """
+        self.delay_min = config.MIN_DELAY if delay_min is None else float(delay_min)
+        self.delay_max = config.MAX_DELAY if delay_max is None else float(delay_max)
+        self.send_seconds = config.FORECAST_SEND_SECONDS if send_seconds is None else float(send_seconds)
+        # NaN passes every comparison below and infinities overflow the totals
+        if not all(math.isfinite(value) for value in (self.delay_min, self.delay_max, self.send_seconds,
+                                                      failure_rate, throttle_share, accounts)):
+            raise ValueError("Simulation parameters must be finite numbers")
+        if self.delay_min < 0 or self.delay_max < self.delay_min:
+            raise ValueError("delay_min must be >= 0 and <= delay_max")
+        if self.send_seconds < 0:
+            raise ValueError("send_seconds must be >= 0")
+        if not 0 <= failure_rate <= 1:
+            raise ValueError("failure_rate must be between 0 and 1")
+        if not 0 <= throttle_share <= 1:
+            raise ValueError("throttle_share must be between 0 and 1")
+        if accounts <= 0:
+            raise ValueError("accounts must be greater than 0")
+
+        self.failure_rate = float(failure_rate)
+        self.throttle_share = float(throttle_share)
+        self.accounts = float(accounts)
+        self.adaptive = config.PACING_ADAPTIVE if adaptive is None else adaptive
+        self.pacing_position = pacing_position
+        self.message_count = int(message_count or 0)
+        self.long_pause_interval = config.LONG_PAUSE_INTERVAL
+        self.long_pause_min = config.LONG_PAUSE_MIN
+        self.long_pause_max = config.LONG_PAUSE_MAX
+
+    def _pacer(self, rng=None):
+        """
+        Create the pacer a worker would start with
+
+        Returns:
+            AdaptivePacer, or None without adaptive pacing
+        """
+        if not self.adaptive:
+            return None
+        return AdaptivePacer(position=self.pacing_position, rng=rng)
+
+    def _attempt_moments(self, backlog):
+        """
+        Get the attempt totals for a backlog
+
+        Args:
+            backlog: Number of fresh messages, or dict of retries used -> messages
+
+        Returns:
+            Tuple of (messages, mean attempts, attempt variance, expected failures)
+        """
+        if not isinstance(backlog, dict):
+            backlog = {0: backlog}
+
+        messages = mean = variance = failures = 0
+        for retries_used, count in backlog.items():
+            attempts_left = max(0, config.MAX_RETRY_ATTEMPTS - int(retries_used))
+            if attempts_left == 0:
+                attempts_left = 1  # Re-queued past the limit - one more try
+            attempt_mean, attempt_variance = expected_attempts(self.failure_rate, attempts_left)
+            messages += count
+            mean += count * attempt_mean
+            variance += count * attempt_variance
+            failures += count * self.failure_rate ** attempts_left
+        return messages, mean, variance, failures
+
+    def _interval_profile(self, intervals):
+        """
+        Get the expected total and variance of the refill intervals between sends
+        With adaptive pacing the target follows its expected path - down by the
+        decrease step per success, up by the back-off factor per throttling
+        failure - until it settles; the rest is closed form at the settled target
+
+        Args:
+            intervals: Number of intervals (may be fractional)
+
+        Returns:
+            (total seconds, variance, hidden) tuple - hidden is the browser time
+            per interval at the settled target that the delay does not cover
+        """
+        pacer = self._pacer()
+        if not pacer or self.delay_max <= self.delay_min:
+            mean, variance = _interval_moments(self.delay_min, self.delay_max, self.send_seconds)
+            hidden = mean - (self.delay_min + self.delay_max) / 2
+            return intervals * mean, intervals * variance, hidden
+
+        success = 1 - self.failure_rate
+        throttled = self.failure_rate * self.throttle_share
+        total = variance = 0.0
+        done = 0
+        while done < intervals:
+            low, high = pacer.sample_range(self.delay_min, self.delay_max)
+            mean, spread = _interval_moments(low, high, self.send_seconds)
+
+            target = pacer.target_delay(self.delay_min, self.delay_max)
+            expected = (success * max(self.delay_min, target - pacer.decrease_step) +
+                        throttled * min(self.delay_max, target * pacer.backoff_factor) +
+                        (self.failure_rate - throttled) * target)
+            position = (expected - self.delay_min) / (self.delay_max - self.delay_min)
+
+            if abs(position - pacer.position) < 1e-6 or done >= _MAX_SETTLE_STEPS:
+                remaining = intervals - done
+                return total + remaining * mean, variance + remaining * spread, mean - (low + high) / 2
+
+            step = min(1, intervals - done)
+            total += step * mean
+            variance += step * spread
+            pacer.position = position
+            done += 1
+        low, high = pacer.sample_range(self.delay_min, self.delay_max)
+        return total, variance, _interval_moments(low, high, self.send_seconds)[0] - (low + high) / 2
+
+    def estimate(self, backlog):
+        """
+        Estimate the time to finish a backlog analytically
+
+        Args:
+            backlog: Number of fresh messages, or dict of retries used -> messages
+
+        Returns:
+            Dict with messages, attempts, expected_failed, long_pauses, seconds,
+            p10_seconds, p90_seconds and messages_per_hour
+        """
+        messages, attempts, attempt_variance, failures = self._attempt_moments(backlog)
+        if attempts <= 0:
+            return {
+                'messages': messages, 'attempts': 0, 'expected_failed': 0, 'long_pauses': 0,
+                'seconds': 0, 'p10_seconds': 0, 'p90_seconds': 0, 'messages_per_hour': None,
+            }
+
+        # Attempts per worker; the first send goes out at once and the last
+        # one only needs its browser time
+        per_account = attempts / self.accounts
+        intervals = max(0.0, per_account - 1)
+        seconds, variance, hidden = self._interval_profile(intervals)
+
+        # A long pause is added to the delay, so it also covers the browser
+        # time already counted for its interval
+        long_pauses = (math.floor((self.message_count + intervals) / self.long_pause_interval) -
+                       math.floor(self.message_count / self.long_pause_interval))
+        long_pause = (self.long_pause_min + self.long_pause_max) / 2
+        seconds += long_pauses * max(0.0, long_pause - hidden)
+        variance += long_pauses * (self.long_pause_max - self.long_pause_min) ** 2 / 12
+
+        # Uncertainty in the number of retries, at the mean cost of one attempt
+        seconds_per_attempt = seconds / per_account
+        variance += attempt_variance / self.accounts ** 2 * seconds_per_attempt ** 2
+        seconds += self.send_seconds
+
+        spread = _Z90 * math.sqrt(variance)
+        return {
+            'messages': messages,
+            'attempts': round(attempts, 1),
+            'expected_failed': round(failures, 1),
+            'long_pauses': long_pauses,
+            'seconds': round(seconds, 1),
+            'p10_seconds': round(max(self.send_seconds, seconds - spread), 1),
+            'p90_seconds': round(seconds + spread, 1),
+            # Zero delays and browser time - no meaningful rate
+            'messages_per_hour': round(messages / seconds * 3600, 1) if seconds > 0 else None,
+        }
+
+    def simulate(self, messages, seed=0):
+        """
+        Replay a job send by send on a virtual clock
+        Deterministic for a given seed. Retries follow their failed attempt
+        directly, as a re-queued message is the oldest pending one
+
+        Args:
+            messages: Number of fresh messages
+            seed: Random seed
+
+        Returns:
+            Dict with messages, attempts, sent, failed and seconds
+
+        Raises:
+            ValueError: If messages exceeds SIMULATION_MAX_MESSAGES
+        """
+        if messages > config.SIMULATION_MAX_MESSAGES:
+            raise ValueError(
+                f"Simulations are limited to {config.SIMULATION_MAX_MESSAGES} messages - use estimate()"
+            )
+
+        rng = random.Random(seed)
+        workers = max(1, round(self.accounts))
+        attempts = sent = failed = 0
+        finish = 0.0
+
+        for worker_index in range(workers):
+            share = messages // workers + (1 if worker_index < messages % workers else 0)
+            pacer = self._pacer(rng)
+            message_count = self.message_count
+            next_token = ready = 0.0
+
+            for _ in range(share):
+                for attempt in range(1, config.MAX_RETRY_ATTEMPTS + 1):
+                    start = max(next_token, ready)
+                    ready = start + self.send_seconds
+
+                    # DelayGenerator.get_delay()
+                    message_count += 1
+                    if pacer:
+                        delay = pacer.sample_delay(self.delay_min, self.delay_max)
+                    else:
+                        delay = rng.uniform(self.delay_min, self.delay_max)
+                    if message_count % self.long_pause_interval == 0:
+                        delay += rng.uniform(self.long_pause_min, self.long_pause_max)
+                    next_token = start + delay
+                    attempts += 1
+
+                    error_class = None
+                    if rng.random() < self.failure_rate:
+                        error_class = (ERROR_CLASS_THROTTLED if rng.random() < self.throttle_share
+                                       else ERROR_CLASS_OTHER)
+
+                    # DelayGenerator.record_outcome()
+                    if pacer:
+                        decision = pacer.record(error_class, self.delay_min, self.delay_max)
+                        if decision and decision['action'] == PACING_BACKOFF:
+                            next_token = max(next_token, start + decision['delay_after'])
+
+                    if error_class is None:
+                        sent += 1
+                        break
+                else:
+                    failed += 1
+
+            finish = max(finish, ready)
+
+        return {
+            'messages': messages,
+            'attempts': attempts,
+            'sent': sent,
+            'failed': failed,
+            'seconds': round(finish, 1),
+        }
+
+def forecast_job(inputs, now=None):
+    """
+    Forecast when a job finishes from its live state
+    The simulator runs with the measured failure rate; its ETA is blended with
+    the ETA at the measured attempt rate, weighted by how many attempts were
+    observed (FORECAST_TRUST_ATTEMPTS for full weight)
+
+    Args:
+        inputs: Dict from QueueManager.get_forecast_inputs()
+        now: Aware datetime the ETA is relative to (default: now)
+
+    Returns:
+        Forecast dictionary
+    """
+    job = inputs['job']
+    observed = inputs['observed']
+
+    failure_rate = 0.0
+    throttle_share = 0.0
+    if observed['attempts'] >= config.FORECAST_MIN_ATTEMPTS:
+        failure_rate = observed['failures'] / observed['attempts']
+        if observed['failures']:
+            throttle_share = observed['throttled'] / observed['failures']
+
+    simulator = CampaignSimulator(
+        delay_min=job.get('delay_min'),
+        delay_max=job.get('delay_max'),
+        failure_rate=failure_rate,
+        throttle_share=throttle_share,
+        # No running worker yet - forecast from the moment one picks the job up
+        accounts=inputs['accounts'] * inputs['share'] or 1,
+    )
+    simulated = simulator.estimate(inputs['backlog'])
+
+    observed_seconds = None
+    observed_rate = None
+    if observed['minutes'] and observed['attempts']:
+        observed_rate = observed['attempts'] / (observed['minutes'] * 60)
+        observed_seconds = round(simulated['attempts'] / observed_rate, 1)
+
+    trust = min(1.0, observed['attempts'] / config.FORECAST_TRUST_ATTEMPTS)
+    seconds = simulated['seconds']
+    if observed_seconds is not None:
+        seconds = round(trust * observed_seconds + (1 - trust) * simulated['seconds'], 1)
+
+    now = now or datetime.now(timezone.utc)
+    return {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'remaining': simulated['messages'],
+        'accounts': inputs['accounts'],
+        'share': round(inputs['share'], 3),
+        'failure_rate': round(failure_rate, 4),
+        'simulated': simulated,
+        'observed': {
+            'attempts': observed['attempts'],
+            'minutes': observed['minutes'],
+            'attempts_per_hour': round(observed_rate * 3600, 1) if observed_rate else None,
+            'seconds': observed_seconds,
+        },
+        'observed_weight': round(trust, 3),
+        'seconds': seconds,
+        'eta': (now + timedelta(seconds=seconds)).strftime(SQLITE_UTC_FORMAT) if seconds else None,
+    }
@@ -0,0 +1,204 @@
+"""
+Browser resource watchdog
+Samples RSS and CPU of the Chrome process tree in a background thread and
+asks the worker to restart the browser before it degrades into an outage
+"""
+
+import threading
+import time
+from utils.logger import logger
+import config
+
+try:
+    import psutil
+except ImportError:  # The watchdog is optional
+    psutil = None
+
+def watchdog_available():
+    """
+    Check whether the browser watchdog can run (psutil installed)
+
+    Returns:
+        True if psutil can be used
+    """
+    return psutil is not None
+
+class BrowserWatchdog:
+    """
+    Samples the chromedriver process and all its descendants (browser,
+    renderers, GPU and utility processes) every BROWSER_WATCHDOG_INTERVAL
+    seconds. Restart is requested when total RSS exceeds BROWSER_RSS_LIMIT_MB,
+    or total CPU stays above BROWSER_CPU_LIMIT_PERCENT for
+    BROWSER_CPU_SUSTAIN_SAMPLES samples in a row. The watchdog never touches
+    the browser itself - the worker restarts it between messages.
+    """
+
+    def __init__(self, session_manager, on_sample=None, interval=None,
+                 rss_limit_mb=None, cpu_limit_percent=None, cpu_sustain_samples=None):
+        """
+        Initialize watchdog
+
+        Args:
+            session_manager: SessionManager whose driver is watched
+            on_sample: Optional callback(sample dict) for exporting metrics
+            interval: Seconds between samples (default from config)
+            rss_limit_mb: Total RSS limit in MB (default from config)
+            cpu_limit_percent: Sustained CPU limit, 100 = one core (default from config)
+            cpu_sustain_samples: Consecutive samples over the CPU limit (default from config)
+        """
+        self.session_manager = session_manager
+        self.on_sample = on_sample
+        self.interval = interval or config.BROWSER_WATCHDOG_INTERVAL
+        self.rss_limit_mb = rss_limit_mb or config.BROWSER_RSS_LIMIT_MB
+        self.cpu_limit_percent = cpu_limit_percent or config.BROWSER_CPU_LIMIT_PERCENT
+        self.cpu_sustain_samples = cpu_sustain_samples or config.BROWSER_CPU_SUSTAIN_SAMPLES
+
+        self.last_sample = None
+        self.restart_reason = None
+        self._cpu_over = 0
+        self._processes = {}  # pid -> psutil.Process (kept so cpu_percent has a baseline)
+        self._restart = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the sampling thread
+
+        Returns:
+            True if the watchdog is running
+        """
+        if not watchdog_available():
+            logger.warning("psutil not installed - browser watchdog disabled (pip install psutil)")
+            return False
+
+        self._thread = threading.Thread(target=self._run, name="browser-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Browser watchdog started (every {self.interval}s, RSS limit {self.rss_limit_mb} MB, "
+            f"CPU limit {self.cpu_limit_percent}%)"
+        )
+        return True
+
+    def stop(self):
+        """
+        Stop the sampling thread
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def restart_requested(self):
+        """
+        Check whether a browser restart was requested
+
+        Returns:
+            True if a threshold was crossed since the last reset()
+        """
+        return self._restart.is_set()
+
+    def reset(self):
+        """
+        Clear the restart request and baselines (call after restarting the browser)
+        """
+        self._restart.clear()
+        self.restart_reason = None
+        self._cpu_over = 0
+        self._processes = {}
+
+    def _run(self):
+        """
+        Sampling loop
+        """
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        """
+        Take one sample, export it and check the thresholds
+        Called by the sampling thread, or directly by a runtime that schedules
+        sampling itself (see AsyncWorker)
+        """
+        try:
+            sample = self.sample()
+        except Exception as e:
+            logger.debug(f"Browser watchdog sample failed: {str(e)}")
+            return
+        if sample:
+            self._evaluate(sample)
+
+    def _root_pid(self):
+        """
+        Get the chromedriver PID of the current session
+
+        Returns:
+            PID, or None if no browser is running
+        """
+        driver = self.session_manager.get_driver()
+        service = getattr(driver, 'service', None) if driver else None
+        process = getattr(service, 'process', None) if service else None
+        return process.pid if process else None
+
+    def sample(self):
+        """
+        Take one sample of the browser process tree
+
+        Returns:
+            Dict with rss_mb, cpu_percent, process_count and sampled_at, or None
+        """
+        root_pid = self._root_pid()
+        if not root_pid:
+            return None
+
+        try:
+            root = psutil.Process(root_pid)
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+
+        rss = 0
+        cpu = 0.0
+        processes = {}
+        for process in tree:
+            # Reuse Process objects so cpu_percent measures since the last sample
+            process = self._processes.get(process.pid, process)
+            try:
+                rss += process.memory_info().rss
+                cpu += process.cpu_percent(None)
+            except psutil.Error:
+                continue
+            processes[process.pid] = process
+        self._processes = processes
+
+        sample = {
+            'rss_mb': round(rss / (1024 * 1024), 1),
+            'cpu_percent': round(cpu, 1),
+            'process_count': len(processes),
+            'sampled_at': time.time(),
+        }
+        self.last_sample = sample
+        return sample
+
+    def _evaluate(self, sample):
+        """
+        Export a sample and request a restart when thresholds are crossed
+        """
+        if self.on_sample:
+            try:
+                self.on_sample(sample)
+            except Exception as e:
+                logger.debug(f"Browser metrics export failed: {str(e)}")
+
+        self._cpu_over = self._cpu_over + 1 if sample['cpu_percent'] > self.cpu_limit_percent else 0
+
+        reason = None
+        if sample['rss_mb'] > self.rss_limit_mb:
+            reason = f"RSS {sample['rss_mb']:.0f} MB > {self.rss_limit_mb} MB"
+        elif self._cpu_over >= self.cpu_sustain_samples:
+            reason = f"CPU {sample['cpu_percent']:.0f}% > {self.cpu_limit_percent}% for {self._cpu_over} samples"
+
+        if reason and not self._restart.is_set():
+            self.restart_reason = reason
+            logger.warning(f"Browser watchdog: {reason} - restart requested")
+            self._restart.set()
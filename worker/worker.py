@@ -3,14 +3,25 @@ Main worker process that processes the message queue
 Long-running process that sends messages via WhatsApp Web
 """
 
-import time
+import os
 import signal
 import sys
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from message_queue.queue_manager import QueueManager
-from worker.session_manager import SessionManager
-from worker.sender import MessageSender
+from message_queue.notifier import QueueListener, EVENT_PAUSE, EVENT_STOP
+from worker.clock import InterruptibleClock
+from worker.session_manager import SessionManager, HealthCheckSchedule
+from worker.sender import MessageSender, SEND_ABANDONED
 from worker.delay import DelayGenerator
+from worker.job_cache import JobCache
+from worker.watchdog import BrowserWatchdog
+from worker.heartbeat import WorkerHeartbeat
+from worker.circuit_breaker import CircuitBreaker
+from utils.error_classifier import classify_error
+from utils.message_fingerprint import message_fingerprint, normalize_message_text
+from utils.runtime_settings import SettingsWatcher
+from utils.timezones import SQLITE_UTC_FORMAT
 from utils.logger import logger
 import config
 
@@ -20,20 +31,46 @@ class Worker:
     Handles session management, sending, and job control
     """
     
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, account_id=None, profile_dir=None, queue_manager=None, job_cache=None):
         """
         Initialize worker
         
         Args:
             db_path: Path to SQLite database (default: from config)
+            account_id: WhatsApp account this worker sends as (default from config)
+            profile_dir: Chrome profile directory for the account (optional)
+            queue_manager: Queue to work from (default: QueueManager on db_path;
+                           remote workers pass a RemoteQueueClient)
+            job_cache: Job row cache (default: JobCache on db_path)
         """
-        self.queue_manager = QueueManager(db_path)
-        self.session_manager = SessionManager()
+        self.account_id = account_id or config.DEFAULT_ACCOUNT_ID
+        self.queue_manager = queue_manager or QueueManager(db_path)
+        self.job_cache = job_cache or JobCache(db_path)
+        # Every wait goes through this clock - notifications and shutdown interrupt it
+        self.clock = InterruptibleClock()
+        self.session_manager = SessionManager(profile_dir, clock=self.clock)
         self.sender = None
-        self.delay_generator = None
+        # One pacing bucket per account - kept across jobs, only bounds change
+        self.delay_generator = DelayGenerator(clock=self.clock)
         self.running = False
         self.current_job_id = None
+        self.current_bounds = None  # (delay_min, delay_max) applied to the delay generator
         self.shutdown_requested = False
+        self.listener = None
+        self.listener_thread = None
+        self.health_schedule = HealthCheckSchedule()
+        # Runtime settings (PUT /settings) are re-read without a restart
+        self.settings = SettingsWatcher(self.queue_manager)
+        self.circuit_breaker = CircuitBreaker()
+        self.watchdog = BrowserWatchdog(
+            self.session_manager,
+            on_sample=lambda sample: self.queue_manager.record_browser_metrics(self.account_id, sample)
+        )
+        
+        # Registry row kept fresh from a thread; also fails over dead workers
+        self.heartbeat = WorkerHeartbeat(
+            self.queue_manager, self.account_id, current_job=lambda: self.current_job_id
+        )
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -42,96 +79,285 @@ class Worker:
     def _signal_handler(self, signum, frame):
         """
         Handle shutdown signals gracefully
+        The first signal drains: an in-flight send either completes and is
+        recorded, or is abandoned before ENTER. A second signal forces exit
         """
-        logger.info(f"Received signal {signum}, shutting down gracefully...")
+        if self.shutdown_requested:
+            logger.warning(f"Received signal {signum} again, forcing shutdown")
+            raise SystemExit(1)
+        
+        logger.info(f"Received signal {signum}, draining and shutting down...")
         self.shutdown_requested = True
         self.running = False
+        # The handler may interrupt the main thread inside clock.sleep (holding
+        # the clock's lock), so stop the clock from another thread
+        threading.Thread(target=self.clock.stop, daemon=True).start()
     
     def start(self):
         """
         Start the worker process (main loop)
         """
         logger.info("=" * 60)
-        logger.info("WhatsApp Bulk Sender Worker - Starting")
+        logger.info(f"WhatsApp Bulk Sender Worker - Starting (account {self.account_id})")
         logger.info("=" * 60)
         
         self.running = True
+        self._register()
+        self.heartbeat.start()
+        
+        # Wake-up channel signalled by the API on enqueue/resume/pause/stop,
+        # pumped into the clock by a background thread
+        self.listener = QueueListener()
+        self.listener_thread = threading.Thread(
+            target=self._pump_notifications, name="queue-listener", daemon=True
+        )
+        self.listener_thread.start()
+        
+        if not self._open_session():
+            self.heartbeat.stop()
+            return
+        self.watchdog.start()
         
+        # Main processing loop
+        try:
+            self._process_loop()
+        except Exception as e:
+            logger.error(f"Fatal error in worker: {str(e)}", exc_info=True)
+        finally:
+            self._cleanup()
+    
+    def _register(self):
+        """
+        Register the account and release the claims a previous run left behind
+        (its interrupted sends are checked once logged in, see _recover_sends)
+        """
+        self.queue_manager.register_account(
+            self.account_id,
+            profile_dir=self.session_manager.profile_dir,
+            pid=os.getpid()
+        )
+        self.queue_manager.update_account_circuit(self.account_id, config.CIRCUIT_CLOSED)
+        # A previous run's plain claims go back to the queue
+        self.queue_manager.release_claims(account_id=self.account_id)
+        self._refresh_settings(force=True)
+        # Continue the previous run's pacing (refill owed, long-pause cadence)
+        self.delay_generator.restore_state(self.queue_manager.get_pacing_state(self.account_id))
+    
+    def _open_session(self):
+        """
+        Start the browser, wait for login and create the sender
+        
+        Returns:
+            True if the worker is logged in and ready to send
+        """
         # Start browser session
         if not self.session_manager.start_session():
             logger.error("Failed to start browser session")
-            return
+            self.queue_manager.update_account_status(self.account_id, config.ACCOUNT_STATUS_STOPPED)
+            return False
         
         # Wait for login
         logger.info("Waiting for WhatsApp Web login...")
+        self.queue_manager.update_account_status(self.account_id, config.ACCOUNT_STATUS_WAITING_FOR_LOGIN)
         if not self.session_manager.wait_for_login():
             logger.error("Login timeout - please scan QR code and restart worker")
             self.session_manager.close_session()
-            return
+            self.queue_manager.update_account_status(self.account_id, config.ACCOUNT_STATUS_STOPPED)
+            return False
         
         logger.info("Login successful! Starting message processing...")
+        self.queue_manager.update_account_status(self.account_id, config.ACCOUNT_STATUS_ACTIVE)
         
         # Initialize sender
         driver = self.session_manager.get_driver()
         if not driver:
             logger.error("Driver not available")
-            return
+            self.queue_manager.update_account_status(self.account_id, config.ACCOUNT_STATUS_STOPPED)
+            return False
         
         self.sender = MessageSender(driver)
+        self._recover_sends()
+        return True
+    
+    def _refresh_settings(self, force=False):
+        """
+        Pick up changed runtime settings (at most every SETTINGS_REFRESH_INTERVAL)
+        Values read from config at use time need nothing more; objects that
+        copied them are told to re-read
         
-        # Main processing loop
-        try:
-            self._process_loop()
-        except Exception as e:
-            logger.error(f"Fatal error in worker: {str(e)}", exc_info=True)
-        finally:
-            self._cleanup()
+        Args:
+            force: Check now instead of waiting for the interval
+        """
+        if not self.settings.refresh(force):
+            return
+        self.delay_generator.apply_settings()
+        self.health_schedule.apply_settings()
+    
+    def _recover_sends(self):
+        """
+        Resolve the sends a previous run was killed in the middle of
+        With SEND_RECOVERY_VERIFY each one is checked against the chat's last
+        outgoing message (one chat load per interrupted send), otherwise all
+        are failed as delivery unknown - neither way re-sends blindly
+        """
+        verify = self._verify_send if config.SEND_RECOVERY_VERIFY else None
+        self.queue_manager.recover_interrupted_sends(self.account_id, verify=verify)
+    
+    def _verify_send(self, send):
+        """
+        Check whether an interrupted send reached the chat
+        
+        Args:
+            send: Interrupted send dict (see QueueManager.get_interrupted_sends)
+        
+        Returns:
+            True if delivered, False only on proof it was not (the chat loaded
+            and its newest outgoing bubble predates the intent), None if the
+            chat cannot tell - the message is then parked as delivery unknown
+        """
+        expected = message_fingerprint(send['message_text'])
+        if send['repeated'] or expected is None:
+            # Same text sent to this number before, or nothing to compare with
+            return None
+        
+        last = self.sender.last_outgoing_message(send['phone_number'])
+        if last is None:
+            # No outgoing bubble - history may not have synced after the crash
+            return None
+        if normalize_message_text(last['text']) == normalize_message_text(send['message_text']):
+            return True
+        
+        # A different newest bubble only proves non-delivery if it is older
+        # than the intent; bubbles show local time to the minute
+        if not last['sent_at'] or not send.get('intent_at'):
+            return None
+        intent_at = datetime.strptime(send['intent_at'], SQLITE_UTC_FORMAT).replace(tzinfo=timezone.utc)
+        intent_minute = intent_at.astimezone().replace(tzinfo=None, second=0, microsecond=0)
+        if all(sent_at < intent_minute for sent_at in last['sent_at']):
+            return False
+        return None
     
     def _process_loop(self):
         """
         Main processing loop - continuously processes messages from queue
         """
-        last_session_check = time.time()
-        
         while self.running and not self.shutdown_requested:
             try:
-                # Check session health periodically
-                current_time = time.time()
-                if current_time - last_session_check > config.SESSION_CHECK_INTERVAL:
-                    if not self.session_manager.verify_logged_in():
+                self._refresh_settings()
+                
+                # Check session health when the adaptive schedule says so
+                if self.health_schedule.due():
+                    if not self._check_session():
                         logger.warning("Session lost - pausing worker")
                         self._handle_session_loss()
-                        last_session_check = current_time
-                        time.sleep(5)  # Wait before retry
+                        self.clock.sleep(5)  # Wait before retry
                         continue
-                    last_session_check = current_time
                 
-                # Get next pending message
-                message = self.queue_manager.dequeue_next_message()
+                # Fresh browser on the same profile between messages - on
+                # schedule, or early when the watchdog saw it degrading
+                if self.session_manager.recycle_due() or self.watchdog.restart_requested():
+                    self._recycle_browser()
+                    continue
+                
+                # Failure storm - hold sends until the half-open probe is due
+                if not self._circuit_allows_send():
+                    self.clock.sleep(self.circuit_breaker.time_until_probe())
+                    continue
                 
+                message = self._next_claim()
                 if not message:
-                    # No pending messages - check for active jobs
-                    active_jobs = self.queue_manager.get_active_jobs()
-                    if not active_jobs:
-                        # No active jobs - idle
-                        time.sleep(config.WORKER_IDLE_DELAY)
-                    else:
-                        # Jobs exist but no pending messages - wait
-                        time.sleep(config.WORKER_POLL_INTERVAL)
+                    self._wait_for_work()
                     continue
                 
                 # Process message
                 self._process_message(message)
                 
-                # Small delay between processing
-                time.sleep(0.5)
-                
             except KeyboardInterrupt:
                 logger.info("Keyboard interrupt received")
                 break
             except Exception as e:
                 logger.error(f"Error in processing loop: {str(e)}", exc_info=True)
-                time.sleep(config.WORKER_POLL_INTERVAL)
+                self.clock.sleep(config.WORKER_POLL_INTERVAL)
+    
+    def _check_session(self):
+        """
+        Run a session health check and record it in the schedule
+        
+        Returns:
+            True if the session is logged in
+        """
+        healthy = self.session_manager.verify_logged_in()
+        self.health_schedule.checked(healthy)
+        return healthy
+    
+    def _next_claim(self):
+        """
+        Get the next message to send
+        
+        Returns:
+            Claimed message dictionary, or None if nothing is pending
+        """
+        # Claim next pending message (shared queue across the pool)
+        return self.queue_manager.claim_next_message(self.account_id)
+    
+    def _wait_for_work(self):
+        """
+        Block until the API signals new or resumed work
+        Falls back to polling when notifications are unavailable or missed
+        """
+        # Recover messages claimed by workers that died mid-send
+        self.queue_manager.release_claims(older_than_seconds=config.CLAIM_LEASE_SECONDS)
+        
+        if self.listener and self.listener.active:
+            timeout = config.WORKER_NOTIFY_FALLBACK_POLL
+        elif not self.queue_manager.get_active_jobs():
+            # No active jobs - idle
+            timeout = config.WORKER_IDLE_DELAY
+        else:
+            # Jobs exist but no pending messages - wait
+            timeout = config.WORKER_POLL_INTERVAL
+        
+        if self.clock.sleep(timeout):
+            logger.debug(f"Woken by queue notifications: {self._take_events()}")
+    
+    def _pump_notifications(self):
+        """
+        Background thread: forward queue notifications to the clock
+        """
+        while not self.clock.stopped:
+            events = self.listener.wait(config.WORKER_NOTIFY_FALLBACK_POLL)
+            if events and not self.clock.stopped:
+                self.clock.interrupt(events)
+    
+    def _take_events(self):
+        """
+        Collect delivered queue notifications and drop cached jobs they changed
+        
+        Returns:
+            List of (event, job_id) tuples
+        """
+        events = self.clock.take_events()
+        for event, job_id in events:
+            if job_id is not None and event in (EVENT_PAUSE, EVENT_STOP):
+                self.job_cache.invalidate(job_id)
+        return events
+    
+    def _send_halted(self, job_id):
+        """
+        Check whether a send waiting for its pacing slot must be abandoned
+        Evaluated when the clock is interrupted, so pause/stop/shutdown act at once
+        
+        Args:
+            job_id: Job of the waiting send
+        
+        Returns:
+            True on shutdown or if the job is no longer runnable
+        """
+        if self.shutdown_requested:
+            return True
+        self._take_events()
+        job = self.job_cache.get(job_id)
+        return not job or job['status'] in (config.JOB_STATUS_PAUSED, config.JOB_STATUS_STOPPED)
     
     def _process_message(self, message):
         """
@@ -146,91 +372,182 @@ class Worker:
         message_text = message['message_text']
         attachment_path = message['attachment_path']
         
+        # Check job status (cached - revalidated via jobs.version)
+        job = self.job_cache.get(job_id)
+        
         # Update current job if changed
-        if self.current_job_id != job_id:
+        if job and self.current_job_id != job_id:
             self.current_job_id = job_id
-            job = self.queue_manager.get_job_status(job_id)
-            if job:
-                # Initialize delay generator for this job
-                self.delay_generator = DelayGenerator(
-                    min_delay=job['delay_min'],
-                    max_delay=job['delay_max']
-                )
-                # Start job if pending
-                if job['status'] == config.JOB_STATUS_PENDING:
-                    self.queue_manager.start_job(job_id)
         
-        # Check job status
-        job = self.queue_manager.get_job_status(job_id)
+        # Apply this job's pacing bounds to the account's bucket - also when
+        # they were changed on the live job (POST /jobs/<id>/delays)
+        if job and self.current_bounds != (job['delay_min'], job['delay_max']):
+            self.current_bounds = (job['delay_min'], job['delay_max'])
+            self.delay_generator.set_bounds(
+                min_delay=job['delay_min'],
+                max_delay=job['delay_max']
+            )
+        
+        # Start job if pending
+        if job and job['status'] == config.JOB_STATUS_PENDING:
+            self.queue_manager.start_job(job_id)
+            self.job_cache.invalidate(job_id)
+            job = self.job_cache.get(job_id)
+        
         if not job:
             logger.warning(f"Job {job_id} not found, skipping message {message_id}")
+            self.queue_manager.release_message(message_id, self.account_id)
             return
         
         # Handle different job statuses
         if job['status'] == config.JOB_STATUS_STOPPED:
             logger.info(f"Job {job_id} is stopped, skipping message {message_id}")
+            self.queue_manager.release_message(message_id, self.account_id)
             return
         elif job['status'] == config.JOB_STATUS_PAUSED:
             logger.debug(f"Job {job_id} is paused, waiting...")
-            time.sleep(config.WORKER_POLL_INTERVAL)
+            self.queue_manager.release_message(message_id, self.account_id)
+            self.clock.sleep(config.WORKER_POLL_INTERVAL)
             return
         elif job['status'] == config.JOB_STATUS_WAITING_FOR_LOGIN:
             logger.debug(f"Job {job_id} waiting for login, checking...")
             if self.session_manager.verify_logged_in():
                 self.queue_manager.update_job_status(job_id, config.JOB_STATUS_RUNNING)
+                self.job_cache.invalidate(job_id)
             else:
-                time.sleep(config.WORKER_POLL_INTERVAL)
+                self.queue_manager.release_message(message_id, self.account_id)
+                self.clock.sleep(config.WORKER_POLL_INTERVAL)
                 return
         
         # Send message
         logger.info(f"Sending message {message_id} to {phone_number} (job {job_id})")
         
+        paced = []
+        
+        def before_send():
+            # Hold the actual ENTER until the pacing bucket allows it; a
+            # shutdown, pause or stop while waiting abandons the send before
+            # anything is sent
+            if not self.delay_generator.acquire(should_abort=lambda: self._send_halted(job_id)):
+                return False
+            paced.append(True)
+            # Record the intent - if the claim was lost meanwhile, do not send
+            return self.queue_manager.mark_sending(message_id, self.account_id)
+        
         success, error_message = self.sender.send_message(
             phone_number=phone_number,
             message_text=message_text,
-            attachment_path=attachment_path
+            attachment_path=attachment_path,
+            before_send=before_send
         )
         
+        self.session_manager.record_message()
+        
+        if error_message == SEND_ABANDONED:
+            logger.info(f"Message {message_id} not sent (shutdown, pause/stop or lost claim) - returning it to the queue")
+            self.queue_manager.release_message(message_id, self.account_id)
+            return
+        
+        if not paced:
+            # Failed before reaching the send - still consume a slot so
+            # failing numbers are not retried back-to-back
+            self.delay_generator.acquire(should_abort=self._draining)
+        
         if success:
-            # Mark as sent
+            # Mark as sent (completes the job in the same transaction when done)
             self.queue_manager.mark_sent(message_id)
             logger.info(f"Message {message_id} sent successfully")
-            
-            # Check if job is complete
-            self._check_job_completion(job_id)
+            self.health_schedule.record_success()
+            error_class = None
         else:
             # Mark as failed (with retry logic)
             retry_count = self.queue_manager.mark_failed(message_id, error_message)
+            self.health_schedule.record_failure()
             logger.warning(f"Message {message_id} failed: {error_message} (retry {retry_count}/{config.MAX_RETRY_ATTEMPTS})")
+            error_class = classify_error(error_message)
         
-        # Apply delay after sending
-        if self.delay_generator:
-            self.delay_generator.wait()
+        self._record_circuit(error_class)
+        
+        # Adaptive pacing: speed up on success, back off on throttling
+        decision = self.delay_generator.record_outcome(error_class)
+        if decision:
+            self._record_pacing(job_id, decision)
     
-    def _check_job_completion(self, job_id):
+    def _record_pacing(self, job_id, decision):
         """
-        Check if a job is complete (all messages sent or failed)
+        Audit a pacing decision and checkpoint the bucket
         
         Args:
-            job_id: ID of the job
+            job_id: Job of the send that caused the decision
+            decision: Decision dict from DelayGenerator.record_outcome()
         """
-        job = self.queue_manager.get_job_status(job_id)
-        if not job:
-            return
+        self.queue_manager.record_pacing_decision(
+            self.account_id, job_id, decision, self.delay_generator.get_state()
+        )
+    
+    def _circuit_allows_send(self):
+        """
+        Check the circuit breaker before claiming
+        When an open circuit turns half-open, one job it paused is resumed so
+        the next claim becomes the probe send
         
-        # Check if all messages are processed
-        total = job['total_messages']
-        sent = job['sent_count']
-        failed = job['failed_count']
-        
-        if sent + failed >= total:
-            # All messages processed
-            self.queue_manager.update_job_status(
-                job_id, 
-                config.JOB_STATUS_COMPLETED,
-                completed_at=datetime.now()
-            )
-            logger.info(f"Job {job_id} completed: {sent} sent, {failed} failed")
+        Returns:
+            True if the worker may claim and send
+        """
+        was_open = self.circuit_breaker.state == config.CIRCUIT_OPEN
+        if not self.circuit_breaker.allow_send():
+            return False
+        
+        if was_open:
+            self._update_circuit(config.CIRCUIT_HALF_OPEN)
+        return True
+    
+    def _record_circuit(self, error_class):
+        """
+        Feed a send outcome to the circuit breaker and act on state changes
+        
+        Args:
+            error_class: ERROR_CLASS_* of the failure, or None for a success
+        """
+        state = self.circuit_breaker.record(error_class)
+        if state:
+            self._update_circuit(state)
+    
+    def _update_circuit(self, state):
+        """
+        Store a circuit state change; the queue manager pauses or resumes the
+        jobs it affects (see QueueManager.update_account_circuit)
+        
+        Args:
+            state: New CIRCUIT_* state
+        """
+        changed = self.queue_manager.update_account_circuit(
+            self.account_id, state, self.circuit_breaker.reason
+        )
+        for job_id in changed or []:
+            self.job_cache.invalidate(job_id)
+    
+    def _recycle_browser(self):
+        """
+        Restart the browser at a safe point (no send in flight)
+        Falls back to session-loss handling if the new browser is not logged in
+        """
+        if self.watchdog.restart_requested():
+            logger.info(f"Restarting browser for the watchdog: {self.watchdog.restart_reason}")
+        self.watchdog.reset()
+        
+        if self.session_manager.recycle():
+            self.sender = MessageSender(self.session_manager.get_driver())
+            self.health_schedule.checked(True)
+        else:
+            logger.warning("Browser recycle did not come back logged in")
+            self._handle_session_loss()
+    
+    def _draining(self):
+        """
+        True once shutdown was requested (used to abort pacing waits)
+        """
+        return self.shutdown_requested
     
     def _handle_session_loss(self):
         """
@@ -238,6 +555,7 @@ class Worker:
         Pauses active jobs and waits for reconnection
         """
         logger.warning("Session lost - pausing all active jobs")
+        self.queue_manager.update_account_status(self.account_id, config.ACCOUNT_STATUS_WAITING_FOR_LOGIN)
         
         active_jobs = self.queue_manager.get_active_jobs()
         for job in active_jobs:
@@ -250,8 +568,12 @@ class Worker:
         # Try to restart session
         logger.info("Attempting to reconnect...")
         if self.session_manager.restart_session():
+            self.watchdog.reset()
             if self.session_manager.wait_for_login(timeout=30):
                 logger.info("Reconnected successfully - resuming jobs")
+                # The old sender (and its tabs) belonged to the closed driver
+                self.sender = MessageSender(self.session_manager.get_driver())
+                self.queue_manager.update_account_status(self.account_id, config.ACCOUNT_STATUS_ACTIVE)
                 # Resume jobs
                 for job in active_jobs:
                     if job['status'] == config.JOB_STATUS_WAITING_FOR_LOGIN:
@@ -270,6 +592,23 @@ class Worker:
         """
         logger.info("Cleaning up worker resources...")
         
+        self.watchdog.stop()
+        self.clock.stop()
+        if self.listener:
+            self.listener.wake()
+            if self.listener_thread:
+                self.listener_thread.join(timeout=5)
+            self.listener.close()
+        self.job_cache.close()
+        
+        # Status writes are synchronous, so nothing is buffered; checkpoint
+        # pacing and hand anything this account still holds to the rest of
+        # the pool
+        self.queue_manager.save_pacing_state(self.account_id, self.delay_generator.get_state())
+        self.queue_manager.release_claims(account_id=self.account_id)
+        self.queue_manager.update_account_status(self.account_id, config.ACCOUNT_STATUS_STOPPED)
+        self.heartbeat.stop()
+        
         # Close browser session (but keep it open if detach is set)
         # Session manager will handle this
         if self.session_manager:
@@ -288,9 +627,11 @@ def main():
     
     parser = argparse.ArgumentParser(description='WhatsApp Bulk Sender Worker')
     parser.add_argument('--db-path', type=str, help='Path to SQLite database', default=None)
+    parser.add_argument('--account', type=str, help='Account ID this worker sends as', default=None)
+    parser.add_argument('--profile-dir', type=str, help='Chrome profile directory', default=None)
     args = parser.parse_args()
     
-    worker = Worker(db_path=args.db_path)
+    worker = Worker(db_path=args.db_path, account_id=args.account, profile_dir=args.profile_dir)
     
     try:
         worker.start()